@@ -0,0 +1,307 @@
+"""
+Load test of the read API: per-route p50/p99 latency, throughput and DB
+pool saturation under concurrent clients.
+
+Seeds --rows synthetic courses, hackathons and internships through the
+normal save path (`database.upsert.bulk_upsert`, which also fills the
+opportunities table), then drives `main.app` with --concurrency clients for
+--duration seconds, either in-process over an ASGI transport or against a
+local uvicorn (--uvicorn). The JSON report carries the git revision, so
+runs from different commits can be compared with --compare.
+
+    python benchmarks/api_bench.py --rows 20000 --concurrency 64 --output before.json
+    python benchmarks/api_bench.py --rows 20000 --concurrency 64 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WORDS = ("python", "data", "cloud", "design", "security", "ai", "web", "mobile",
+         "finance", "health", "robotics", "climate", "game", "music", "startup")
+
+# name -> (path, params); each client cycles through them in random order
+ROUTES = {
+    "coursera": ("/courses/coursera", {"limit": 50}),
+    "coursera_search": ("/courses/coursera", {"limit": 50, "q": "python"}),
+    "udemy": ("/courses/udemy", {"limit": 50, "sort": "title"}),
+    "course_counts": ("/courses/counts", {}),
+    "devpost_open_by_prize": ("/hackathons/devpost", {"status": "open", "sort": "-prize_usd"}),
+    "lablab": ("/hackathons/lablab", {"limit": 50, "sort": "-end_date"}),
+    "internships_remote": ("/internships/", {"remote": "true", "limit": 50}),
+    "opportunities": ("/opportunities", {"type": "hackathon", "limit": 50, "sort": "deadline"}),
+    "search": ("/search", {"q": "cloud security"}),
+}
+
+
+def _title(rng, n):
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(3)) + f" {n}"
+
+
+def seed(rows: int, seed_value: int = 42):
+    """Insert `rows` synthetic rows into each source table."""
+    from database import models
+    from database.upsert import bulk_upsert
+
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    providers = ["Google", "IBM", "Stanford University", "Meta", "DeepLearning.AI"]
+
+    def period(start, end):
+        return f"{start:%b %d, %Y} - {end:%b %d, %Y}"
+
+    devpost, lablab = [], []
+    for n in range(rows):
+        start = now + timedelta(days=rng.randint(-60, 30))
+        end = start + timedelta(days=rng.randint(2, 45))
+        prize = rng.randint(1, 200) * 500
+        devpost.append({
+            "title": _title(rng, n), "link": f"https://bench.devpost.com/{n}",
+            "status": "open", "location": rng.choice(["Online", "Paris", "Berlin"]),
+            "submission_period": period(start, end), "prize_amount": f"${prize:,}", "prize_usd": float(prize),
+            "participants": rng.randint(0, 5000), "host": rng.choice(providers),
+            "themes": ", ".join(rng.sample(WORDS, 3)), "starts_at": start, "ends_at": end,
+        })
+        lablab.append({
+            "title": _title(rng, n), "link": f"https://lablab.ai/event/bench-{n}",
+            "status": "Register", "location": "HACKATHON", "submission_period": period(start, end),
+            "start_date": start, "end_date": end, "participants": rng.randint(0, 3000),
+            "prize_amount": f"${rng.randint(1, 100) * 1000:,}", "themes": ", ".join(rng.sample(WORDS, 2)),
+        })
+
+    bulk_upsert(models.Course, [
+        {"title": _title(rng, n), "link": f"https://www.coursera.org/learn/bench-{n}",
+         "provider": rng.choice(providers)} for n in range(rows)
+    ])
+    bulk_upsert(models.UdemyCourse, [
+        {"title": _title(rng, n), "link": f"https://www.udemy.com/course/bench-{n}/",
+         "price": rng.choice(["Free", "$19.99", "$84.99"])} for n in range(rows)
+    ])
+    bulk_upsert(models.Hackathon, devpost)
+    bulk_upsert(models.LablabHackathon, lablab)
+    bulk_upsert(models.Internship, [
+        {"title": _title(rng, n) + " Intern", "link": f"https://www.indeed.com/viewjob?jk=bench{n}",
+         "company": rng.choice(providers), "location": rng.choice(["Remote", "New York, NY", "Austin, TX"]),
+         "is_remote": rng.random() < 0.3, "description": " ".join(rng.choices(WORDS, k=40))}
+        for n in range(rows)
+    ])
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def drive(client, duration: float, concurrency: int, pool_probe=None):
+    """Run `concurrency` clients for `duration` seconds; return per-route samples and pool stats."""
+    samples = {name: [] for name in ROUTES}
+    errors = {name: 0 for name in ROUTES}
+    pool = {"max_checked_out": 0, "samples": 0, "saturated_samples": 0, "size": None}
+    deadline = time.perf_counter() + duration
+
+    async def worker(seed_value):
+        rng = random.Random(seed_value)
+        names = list(ROUTES)
+        while time.perf_counter() < deadline:
+            name = rng.choice(names)
+            path, params = ROUTES[name]
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if ok:
+                samples[name].append(elapsed)
+            else:
+                errors[name] += 1
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            checked_out, capacity = pool_probe()
+            pool["size"] = capacity
+            pool["samples"] += 1
+            pool["max_checked_out"] = max(pool["max_checked_out"], checked_out)
+            if capacity and checked_out >= capacity:
+                pool["saturated_samples"] += 1
+            await asyncio.sleep(0.05)
+
+    tasks = [worker(i) for i in range(concurrency)]
+    if pool_probe is not None:
+        tasks.append(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return samples, errors, pool if pool_probe else None, time.perf_counter() - started
+
+
+def summarize(samples, errors, elapsed: float) -> dict:
+    routes = {}
+    for name, values in samples.items():
+        routes[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+            "p90_ms": round(percentile(values, 90) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+            "max_ms": round(max(values) * 1000, 2) if values else None,
+        }
+    every = [v for values in samples.values() for v in values]
+    total = {
+        "requests": len(every),
+        "errors": sum(errors.values()),
+        "rps": round(len(every) / elapsed, 1),
+        "p50_ms": round(percentile(every, 50) * 1000, 2) if every else None,
+        "p99_ms": round(percentile(every, 99) * 1000, 2) if every else None,
+    }
+    return {"routes": routes, "total": total}
+
+
+def git_revision() -> str | None:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_in_process(args):
+    import httpx
+    import main
+    from database.db import get_async_engine
+
+    def pool_probe():
+        pool = get_async_engine().pool
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+        capacity = pool.size() + pool._max_overflow if hasattr(pool, "_max_overflow") else None
+        return checked_out, capacity
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await drive(client, 1.0, min(args.concurrency, 4))  # warm up imports, pool and cache
+        return await drive(client, args.duration, args.concurrency, pool_probe)
+
+
+async def run_against_uvicorn(args, env):
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            await drive(client, 1.0, min(args.concurrency, 4))
+            return await drive(client, args.duration, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def print_report(report: dict, previous: dict | None):
+    print(f"rev {report['git_rev']}  rows {report['config']['rows']}  "
+          f"concurrency {report['config']['concurrency']}  mode {report['config']['mode']}")
+    print(f"{'route':<24}{'req':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}{'Δp99':>9}")
+    for name, route in report["routes"].items():
+        before = ((previous or {}).get("routes") or {}).get(name) or {}
+        delta = ""
+        if before.get("p99_ms") and route["p99_ms"]:
+            delta = f"{(route['p99_ms'] / before['p99_ms'] - 1) * 100:+.0f}%"
+        print(f"{name:<24}{route['requests']:>8}{route['errors']:>6}{route['rps']:>9}"
+              f"{route['p50_ms'] or 0:>9}{route['p99_ms'] or 0:>9}{delta:>9}")
+    total = report["total"]
+    print(f"{'total':<24}{total['requests']:>8}{total['errors']:>6}{total['rps']:>9}"
+          f"{total['p50_ms'] or 0:>9}{total['p99_ms'] or 0:>9}")
+    if report.get("pool"):
+        pool = report["pool"]
+        print(f"pool: max checked out {pool['max_checked_out']}/{pool['size']}, "
+              f"saturated in {pool['saturated_samples']}/{pool['samples']} samples")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000, help="rows seeded per source table")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load")
+    parser.add_argument("--uvicorn", action="store_true", help="drive a local uvicorn instead of the ASGI app")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --uvicorn")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--no-cache", action="store_true", help="run with API_CACHE=0")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="earlier report to show p99 deltas against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="api-bench-") as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        if args.no_cache:
+            os.environ["API_CACHE"] = "0"
+        sys.path.insert(0, str(BACKEND_DIR))
+        from database.db import engine
+        from database.schema import sync_schema
+
+        sync_schema(engine)
+        started = time.perf_counter()
+        seed(args.rows)
+        seed_seconds = time.perf_counter() - started
+
+        if args.uvicorn:
+            samples, errors, pool, elapsed = asyncio.run(run_against_uvicorn(args, dict(os.environ)))
+        else:
+            samples, errors, pool, elapsed = asyncio.run(run_in_process(args))
+
+    report = {
+        "git_rev": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mode": f"uvicorn x{args.workers}" if args.uvicorn else "in-process",
+            "cache": not args.no_cache,
+            "database": (args.database_url or "sqlite").split("://")[0],
+        },
+        "seed_seconds": round(seed_seconds, 2),
+        **summarize(samples, errors, elapsed),
+        "pool": pool,
+    }
+    previous = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, previous)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
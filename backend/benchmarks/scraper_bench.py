@@ -0,0 +1,285 @@
+"""
+Offline benchmark of the scrape -> parse -> save path of every source.
+
+Each source replays a saved page through its extractor and its save step
+against a throwaway SQLite database (or DATABASE_URL / --database-url, e.g.
+a local MySQL), in a fresh process so peak RSS is per source. Pages come
+from --fixtures DIR when it holds `<source>.html` / `<source>.json` (pages
+saved with SCRAPER_FETCH_MODE=record or from `driver.page_source`);
+otherwise they are rendered from the JSON datasets committed next to the
+scrapers, repeated --scale times with distinct links.
+
+Stages: fetch (read the page), parse (extractor), save (first upsert, all
+rows new) and resave (same rows again, all unchanged).
+
+    python benchmarks/scraper_bench.py                  # run, compare to baseline
+    python benchmarks/scraper_bench.py --save-baseline  # run, store as baseline
+    python benchmarks/scraper_bench.py --sources devpost lablab --scale 200
+"""
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCRAPERS_DIR = BACKEND_DIR / "scrapers"
+BASELINE_FILE = Path(__file__).resolve().parent / "scraper_baseline.json"
+SOURCES = ("devpost", "lablab", "udemy", "coursera", "apify")
+DATASETS = {
+    "devpost": SCRAPERS_DIR / "hackathons" / "devpost_hackathons.json",
+    "lablab": SCRAPERS_DIR / "hackathons" / "lablab_hackathons.json",
+    "udemy": SCRAPERS_DIR / "courses" / "udemy_courses22.json",
+    "coursera": SCRAPERS_DIR / "courses" / "coursera_courses.json",
+    "apify": SCRAPERS_DIR / "internships" / "apify_internships.json",
+}
+
+
+# -------- Page rendering --------
+
+def _copy_link(link: str, n: int) -> str:
+    if n == 0:
+        return link
+    path, sep, query = link.partition("?")
+    return f"{path.rstrip('/')}-{n}/{sep}{query}"
+
+
+def _scaled(items, scale: int, link_key: str = "link"):
+    for n in range(scale):
+        for item in items:
+            yield {**item, link_key: _copy_link(item[link_key], n)}
+
+
+def _e(value) -> str:
+    return html.escape(str(value if value is not None else ""), quote=True)
+
+
+def render_devpost(items):
+    tiles = []
+    for h in items:
+        themes = "".join(
+            f'<span class="theme-label" title="{_e(t.strip())}"></span>'
+            for t in (h.get("themes") or "").split(",") if t.strip()
+        )
+        managed = '<div class="managed-by-devpost"></div>' if h.get("managed_by_devpost") == "Yes" else ""
+        tiles.append(
+            f'<div class="hackathon-tile"><a class="tile-anchor" href="{_e(h["link"])}">'
+            f'<h3>{_e(h["title"])}</h3><div class="status-label">{_e(h.get("days_left"))}</div>'
+            f'<div class="info-with-icon"><span>{_e(h.get("location"))}</span></div>'
+            f'<div class="submission-period">{_e(h.get("submission_period"))}</div>'
+            f'<div class="prize"><span class="prize-amount">{_e(h.get("prize_amount"))}</span></div>'
+            f'<div class="participants"><strong>{_e(h.get("participants", 0))}</strong> participants</div>'
+            f'<span class="host-label" title="{_e(h.get("host"))}"></span>{themes}{managed}</a></div>'
+        )
+    return f"<html><body><div class='challenge-results'>{''.join(tiles)}</div></body></html>"
+
+
+def render_lablab(items):
+    cards = []
+    for h in items:
+        cards.append(
+            f'<div class="card-animation card-border"><a href="{_e(h["link"])}">'
+            f'<div class="absolute top-4 -left-8">{_e(h.get("status"))}</div>'
+            f'<img src="{_e(h.get("image_url"))}"/><span title="{_e(h.get("location"))}"></span>'
+            f'<h2 class="line-clamp-1">{_e(h["title"])}</h2><time>{_e(h.get("submission_period"))}</time>'
+            f'<p class="line-clamp-2">{_e(h.get("description"))}</p>'
+            f'<p class="text-xs font-semibold">{_e(h.get("participants", 0))}</p></a></div>'
+        )
+    return f"<html><body><main>{''.join(cards)}</main></body></html>"
+
+
+def render_udemy(items):
+    cards = []
+    for c in items:
+        cards.append(
+            f'<div class="popper--popper--2r2To"><a class="udlite-custom-focus-visible '
+            f'browse-course-card--link--3KIkQ" href="{_e(c["link"])}">'
+            f'<div class="udlite-focus-visible-target udlite-heading-md">{_e(c["title"])}</div>'
+            f'<div class="price-text--price-part--Tu6MH"><span>{_e(c.get("price"))}</span></div></a></div>'
+        )
+    return f"<html><body>{''.join(cards)}</body></html>"
+
+
+def render_coursera(items):
+    cards = []
+    for c in items:
+        cards.append(
+            f'<div data-testid="product-card-cds"><a href="{_e(c["link"])}">'
+            f'<h3 class="cds-CommonCard-title">{_e(c["title"])}</h3></a>'
+            f'<p class="cds-ProductCard-partnerNames">{_e(c.get("provider"))}</p></div>'
+        )
+    return f"<html><body><ul>{''.join(cards)}</ul></body></html>"
+
+
+def render_page(source: str, scale: int) -> tuple[str, str]:
+    """`(suffix, text)` of a synthetic page for `source`."""
+    items = json.loads(DATASETS[source].read_text(encoding="utf-8"))
+    if source == "apify":
+        return "json", json.dumps(list(_scaled(items, scale, "url")))
+    render = {"devpost": render_devpost, "lablab": render_lablab,
+              "udemy": render_udemy, "coursera": render_coursera}[source]
+    return "html", render(list(_scaled(items, scale)))
+
+
+def write_page(source: str, scale: int, fixtures: Path | None, directory: Path) -> Path:
+    """Path of the page to replay: a recorded fixture if there is one, else a rendered page."""
+    if fixtures is not None:
+        for suffix in ("html", "json"):
+            recorded = fixtures / f"{source}.{suffix}"
+            if recorded.exists():
+                return recorded
+    suffix, text = render_page(source, scale)
+    path = directory / f"{source}.{suffix}"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+# -------- Running one source (in its own process) --------
+
+def _parse_and_save(source: str):
+    """`(parse(text) -> items, save(items) -> UpsertResult)` for `source`."""
+    if source == "devpost":
+        from scrapers.hackathons.devpost_scraper import DevpostScraper
+        scraper = DevpostScraper(incremental=False)
+        return scraper.parse_tiles, scraper.save_to_database
+    if source == "lablab":
+        from scrapers.hackathons.lablab_scraper import LablabScraper
+        scraper = LablabScraper(incremental=False)
+        return scraper.parse_cards, scraper.save_to_database
+    if source == "udemy":
+        from scrapers.courses.udemy_scraper import UdemyScraper
+        scraper = UdemyScraper(incremental=False)
+        return scraper.parse_cards, scraper.save_to_database
+    if source == "coursera":
+        from scrapers.courses import coursera_scraper
+        return (coursera_scraper.parse_course_cards,
+                lambda items: coursera_scraper.save_courses_to_db(items, incremental=False))
+    if source == "apify":
+        from scrapers.internships import indeed_scraper
+        return json.loads, lambda items: indeed_scraper.save_to_db(items, incremental=False)
+    raise ValueError(f"Unknown source: {source}")
+
+
+def run_source(source: str, page: str, database_url: str) -> dict:
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, str(BACKEND_DIR))
+    from database.schema import sync_schema
+    from database.db import engine
+
+    sync_schema(engine)
+    stages = {}
+    # The save steps print progress per row; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse, save = _parse_and_save(source)
+
+        start = time.perf_counter()
+        text = Path(page).read_text(encoding="utf-8")
+        stages["fetch"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        items = parse(text)
+        stages["parse"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first = save(items)
+        stages["save"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = save(items)
+        stages["resave"] = time.perf_counter() - start
+
+    busy = stages["parse"] + stages["save"]
+    return {
+        "source": source,
+        "items": len(items),
+        "created": first.created,
+        "unchanged_on_resave": second.unchanged,
+        "stages": {name: round(seconds, 4) for name, seconds in stages.items()},
+        "items_per_sec": round(len(items) / busy, 1) if busy else None,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+# -------- Reporting --------
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of items/sec or peak RSS beyond `tolerance` (0.2 = 20%)."""
+    regressions = []
+    for result in results:
+        before = baseline.get(result["source"])
+        if not before:
+            continue
+        if before.get("items_per_sec") and result["items_per_sec"] is not None:
+            if result["items_per_sec"] < before["items_per_sec"] * (1 - tolerance):
+                regressions.append(
+                    f"{result['source']}: {result['items_per_sec']} items/s "
+                    f"(baseline {before['items_per_sec']})"
+                )
+        if before.get("peak_rss_mb") and result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{result['source']}: peak RSS {result['peak_rss_mb']} MB (baseline {before['peak_rss_mb']})"
+            )
+    return regressions
+
+
+def print_table(results: list[dict], baseline: dict):
+    print(f"{'source':<10}{'items':>8}{'fetch':>9}{'parse':>9}{'save':>9}{'resave':>9}"
+          f"{'items/s':>11}{'base':>11}{'RSS MB':>9}")
+    for r in results:
+        s = r["stages"]
+        base = (baseline.get(r["source"]) or {}).get("items_per_sec", "-")
+        print(f"{r['source']:<10}{r['items']:>8}{s['fetch']:>9.3f}{s['parse']:>9.3f}{s['save']:>9.3f}"
+              f"{s['resave']:>9.3f}{r['items_per_sec'] or 0:>11}{base:>11}{r['peak_rss_mb']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=list(SOURCES))
+    parser.add_argument("--scale", type=int, default=50, help="copies of each dataset item to render")
+    parser.add_argument("--fixtures", type=Path, help="directory of recorded <source>.html/.json pages")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file per source")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = []
+    with tempfile.TemporaryDirectory(prefix="scraper-bench-") as tmp:
+        tmp = Path(tmp)
+        for source in args.sources:
+            page = write_page(source, args.scale, args.fixtures, tmp)
+            database_url = args.database_url or os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tmp / source}.db"
+            # A fresh process per source, so imports and peak RSS do not leak between them
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results.append(pool.submit(run_source, source, str(page), database_url).result())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results, baseline)
+
+    if args.save_baseline:
+        baseline.update({r["source"]: r for r in results})
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"❌ Regression: {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Response cache for the read-only API.
+
+Responses are keyed by path, query string and the `data_versions` of the
+tables they read. A save step that changes a table bumps its version
+(see `database.upsert.bulk_upsert`), so every response built from the old
+data becomes unreachable at once and nothing has to be deleted.
+
+Open/upcoming/ended is worked out from the clock, not stored, so a response
+that filters on or reports it also goes stale with time: those are keyed by
+a STATUS_BUCKET_SECONDS window as well.
+
+Two tiers: an in-process LRU with a TTL, and an optional shared tier on
+REDIS_URL (Redis or any server speaking its protocol) so several API
+workers share hits. Any object with async `get(key)` / `set(key, value,
+ex=ttl)` can stand in for the Redis client.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from database.models import DataVersion
+from metrics import CACHE_REQUESTS
+
+CACHE_ENABLED = os.getenv("API_CACHE", "1") != "0"
+CACHE_TTL = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# How long a process trusts the versions it read before asking the database again
+VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL_SECONDS", "2"))
+# How long a response that depends on open/upcoming/ended may lag the clock
+STATUS_BUCKET = int(os.getenv("CACHE_STATUS_BUCKET_SECONDS", "300"))
+CLIENT_MAX_AGE = int(os.getenv("CACHE_CLIENT_MAX_AGE", "60"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class LRUCache:
+    """Thread-safe LRU map whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        with self._lock:
+            self._items[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RedisCache:
+    """
+    Shared tier. A failing server is treated as a miss so a cache outage
+    never takes the API down with it.
+    """
+
+    def __init__(self, client, prefix: str = "api:", ttl: float = CACHE_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis.asyncio as redis  # optional dependency, only needed with REDIS_URL
+        return cls(redis.from_url(url))
+
+    async def get(self, key):
+        try:
+            return await self.client.get(self.prefix + key)
+        except Exception as e:
+            print(f"⚠️ Cache read failed: {e}")
+            return None
+
+    async def set(self, key, value, ttl: float | None = None):
+        try:
+            await self.client.set(self.prefix + key, value, ex=int(ttl or self.ttl))
+        except Exception as e:
+            print(f"⚠️ Cache write failed: {e}")
+
+
+class ResponseCache:
+    def __init__(self, local: LRUCache, remote: RedisCache | None = None):
+        self.local = local
+        self.remote = remote
+
+    async def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.remote is not None:
+            value = await self.remote.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def set(self, key, value):
+        self.local.set(key, value)
+        if self.remote is not None:
+            await self.remote.set(key, value)
+
+    def clear(self):
+        self.local.clear()
+
+
+response_cache = ResponseCache(LRUCache(), RedisCache.from_url(REDIS_URL) if REDIS_URL else None)
+
+_versions = {"expires": 0.0, "rows": {}}
+
+
+async def table_versions(session, tables) -> dict:
+    """`{table: (version, updated_at)}`; tables never written report `(0, None)`."""
+    if _versions["expires"] < time.monotonic():
+        rows = await session.execute(
+            select(DataVersion.table_name, DataVersion.version, DataVersion.updated_at)
+        )
+        _versions["rows"] = {name: (version, updated_at) for name, version, updated_at in rows}
+        _versions["expires"] = time.monotonic() + VERSION_TTL
+    return {table: _versions["rows"].get(table, (0, None)) for table in sorted(tables)}
+
+
+def invalidate_versions():
+    """Forget the versions read so far; the next request reads them again."""
+    _versions["expires"] = 0.0
+
+
+def _http_date(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _not_modified(request: Request, etag: str, last_modified: str | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def cached_json(request: Request, session, tables, build, time_dependent: bool = False):
+    """
+    Serve `await build()` as JSON through the cache. `tables` are the tables
+    the response reads; the ETag changes exactly when one of their versions does.
+    `time_dependent` responses (and any request with a `status` filter) also
+    change every STATUS_BUCKET seconds.
+    """
+    if not CACHE_ENABLED:
+        return await build()
+
+    time_dependent = time_dependent or "status" in request.query_params
+    versions = await table_versions(session, tables)
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = f"{request.url.path}?{query}|" + ",".join(f"{t}:{v}" for t, (v, _) in versions.items())
+    if time_dependent:
+        key += f"|t:{int(time.time() // STATUS_BUCKET)}"
+    etag = '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CLIENT_MAX_AGE}"}
+    modified = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    # The data may be unchanged while the answer is not, so no Last-Modified
+    last_modified = _http_date(max(modified)) if modified and not time_dependent else None
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+
+    if _not_modified(request, etag, last_modified):
+        CACHE_REQUESTS.inc(result="not_modified")
+        return Response(status_code=304, headers=headers)
+
+    body = await response_cache.get(key)
+    CACHE_REQUESTS.inc(result="miss" if body is None else "hit")
+    if body is None:
+        data = await build()
+        body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+        await response_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
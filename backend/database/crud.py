@@ -1,5 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from . import models
+from .normalize import ENDED, OPEN, UPCOMING, status_label_sql
+
+# Upper bound for any list endpoint, so a response is sized by the page and
+# never by the table.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 def get_course_by_link(db: Session, link: str):
     return db.query(models.Course).filter(models.Course.link == link).first()
@@ -18,4 +27,65 @@ def list_hackathons(db: Session, limit: int = 100):
     return db.query(models.Hackathon).limit(limit).all()
 
 def list_competitions(db: Session, limit: int = 100):
-    return db.query(models.Competition).limit(limit).all()
\ No newline at end of file
+    return db.query(models.Competition).limit(limit).all()
+
+def apply_search(query, q: str | None, *columns):
+    """Keep rows where any of `columns` contains `q` (case-insensitive)."""
+    if not q or not q.strip():
+        return query
+    # `%` and `_` in the search text are literal characters, not wildcards
+    text = q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{text}%"
+    return query.filter(or_(*(column.ilike(pattern, escape="\\") for column in columns)))
+
+def apply_range(query, column, start: datetime | None = None, end: datetime | None = None):
+    """Keep rows where `start <= column < end`; either bound may be omitted."""
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column < end)
+    return query
+
+def apply_status(query, status: str | None, label_column, starts_column, ends_column,
+                 now: datetime | None = None):
+    """
+    Keep rows whose status is `status` ("open", "upcoming" or "ended") as of
+    `now`, decided by the dates where they are known and by the status
+    label otherwise (an "ended" label always wins); the same rules as `normalize.compute_status`, spelled
+    as range conditions so the date indexes can be used.
+    """
+    if not status:
+        return query
+    now = now or datetime.now()
+    label = status_label_sql(label_column)
+    undated = and_(
+        ends_column.is_(None),
+        or_(starts_column.is_(None), starts_column <= now),
+        label == status,
+    )
+    if status == ENDED:
+        condition = or_(ends_column < now, label == ENDED, undated)
+    elif status == UPCOMING:
+        condition = or_(and_(or_(ends_column.is_(None), ends_column >= now), starts_column > now), undated)
+        condition = and_(label != ENDED, condition)
+    elif status == OPEN:
+        condition = or_(and_(ends_column >= now, or_(starts_column.is_(None), starts_column <= now)), undated)
+        condition = and_(label != ENDED, condition)
+    else:
+        condition = label == status
+    return query.filter(condition)
+
+def apply_sort(query, sort: str, options: dict, tiebreaker):
+    """
+    Order by one of the whitelisted `options` ("title", "-scraped_at", ...).
+    A leading "-" sorts descending; `tiebreaker` keeps the order stable.
+    """
+    descending = sort.startswith("-")
+    column = options[sort.lstrip("-")]
+    if descending:
+        return query.order_by(column.desc(), tiebreaker.desc())
+    return query.order_by(column.asc(), tiebreaker.asc())
+
+def sort_pattern(options: dict) -> str:
+    """Regex accepted by a `sort` query parameter for the given options."""
+    return "^-?(" + "|".join(options) + ")$"
@@ -0,0 +1,180 @@
+"""
+Cross-source near-duplicate detection on the opportunities read model.
+
+The same hackathon is often listed on Devpost and LabLab, and the same
+course on Coursera and Udemy, under slightly different titles. Titles are
+reduced to character shingles and MinHash signatures; LSH banding turns
+those into candidate pairs without comparing every title with every other,
+and candidates from different sources whose shingle sets overlap enough
+(and, for hackathons, whose deadlines are close) are grouped, at most one
+row per source to a group. Every member of a group except the oldest row
+gets `duplicate_of` set to that row's id; `/opportunities` hides them
+unless asked not to.
+"""
+import hashlib
+import re
+import struct
+from datetime import timedelta
+from functools import lru_cache
+
+from sqlalchemy import select, update
+
+from . import models
+from .db import SessionLocal
+from .opportunities import COURSE, HACKATHON
+from .upsert import bump_version
+
+NUM_PERM = 100
+# 20 bands of 5 rows: pairs at 0.7 similarity share a band ~97% of the time,
+# pairs at 0.4 ~18%, so candidates are mostly pairs worth checking
+BANDS = 20
+SHINGLE = 4
+# Minimum Jaccard similarity of title shingles, per opportunity type listed
+# by more than one source (internships only come from Indeed)
+THRESHOLDS = {COURSE: 0.8, HACKATHON: 0.7}
+# Hackathons with known deadlines further apart than this are different events
+DEADLINE_WINDOW = timedelta(days=7)
+# Words that say what kind of listing it is, not which one
+NOISE_WORDS = frozenset({
+    "the", "a", "an", "and", "of", "for", "to", "in", "on", "with",
+    "hackathon", "hack", "challenge", "course", "online", "free", "intro", "introduction",
+    "2023", "2024", "2025", "2026", "2027",
+})
+
+
+def normalize_title(title: str) -> str:
+    words = re.findall(r"[a-z0-9]+", (title or "").lower())
+    return " ".join(w for w in words if w not in NOISE_WORDS)
+
+
+def shingles(title: str, k: int = SHINGLE) -> set:
+    text = normalize_title(title)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+@lru_cache(maxsize=65536)
+def _hashes(shingle: str) -> tuple:
+    """NUM_PERM independent 64-bit hashes of one shingle, one per permutation."""
+    return struct.unpack(f"<{NUM_PERM}Q", hashlib.shake_128(shingle.encode()).digest(8 * NUM_PERM))
+
+
+def minhash(shingle_set: set) -> tuple:
+    if not shingle_set:
+        return ()
+    return tuple(map(min, zip(*map(_hashes, shingle_set))))
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def candidate_pairs(signatures: dict, labels: dict | None = None, bands: int = BANDS):
+    """
+    Pairs of keys whose signatures agree on all rows of at least one band;
+    with `labels`, only pairs whose labels differ.
+    """
+    rows = NUM_PERM // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        for key, signature in signatures.items():
+            if signature:
+                buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(key)
+        for keys in buckets.values():
+            for i, first in enumerate(keys):
+                for second in keys[i + 1:]:
+                    if labels is None or labels[first] != labels[second]:
+                        pairs.add((min(first, second), max(first, second)))
+    return pairs
+
+
+def _groups(pairs, sources: dict):
+    """
+    Connected components of `pairs` (union-find), as {member: root}, never
+    joining two groups that both hold a row from the same source: A~B and
+    B~C must not put two rows of one source in a group. `sources` maps every
+    id to its source; pairs are tried in order, so pass the closest first.
+    """
+    parent = {i: i for i in sources}
+    members = {i: {source} for i, source in sources.items()}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra == rb or members[ra] & members[rb]:
+            continue
+        # The oldest row (lowest id) stays canonical
+        root, child = min(ra, rb), max(ra, rb)
+        parent[child] = root
+        members[root] |= members.pop(child)
+    return {i: find(i) for i in sources}
+
+
+def find_duplicates(rows, threshold: float, deadline_window: timedelta | None = None) -> dict:
+    """
+    `rows` are (id, source, title, deadline). Returns {id: canonical id} for
+    every row that duplicates a row from another source.
+    """
+    rows = {row[0]: row for row in rows}
+    shingle_sets = {i: shingles(row[2]) for i, row in rows.items()}
+    signatures = {i: minhash(s) for i, s in shingle_sets.items()}
+    matches = []
+    # The same source never lists one item twice under different links
+    sources = {i: row[1] for i, row in rows.items()}
+    for a, b in candidate_pairs(signatures, sources):
+        if deadline_window is not None and rows[a][3] and rows[b][3]:
+            if abs(rows[a][3] - rows[b][3]) > deadline_window:
+                continue
+        similarity = jaccard(shingle_sets[a], shingle_sets[b])
+        if similarity >= threshold:
+            matches.append((-similarity, a, b))
+    roots = _groups([(a, b) for _, a, b in sorted(matches)], sources)
+    return {i: root for i, root in roots.items() if root != i}
+
+
+def flag_duplicates(session=None, kinds=None) -> int:
+    """Recompute `duplicate_of` for the opportunities of `kinds` (default: all); returns duplicates found."""
+    db = session or SessionLocal()
+    Opportunity = models.Opportunity
+    found = 0
+    changed = False
+    try:
+        for kind in kinds or THRESHOLDS:
+            rows = db.execute(
+                select(Opportunity.id, Opportunity.source, Opportunity.title, Opportunity.deadline)
+                .where(Opportunity.type == kind)
+            ).all()
+            window = DEADLINE_WINDOW if kind == HACKATHON else None
+            duplicates = find_duplicates(rows, THRESHOLDS[kind], window)
+            found += len(duplicates)
+
+            current = dict(db.execute(
+                select(Opportunity.id, Opportunity.duplicate_of)
+                .where(Opportunity.type == kind, Opportunity.duplicate_of.is_not(None))
+            ).all())
+            for opportunity_id in current.keys() - duplicates.keys():
+                db.execute(update(Opportunity).where(Opportunity.id == opportunity_id).values(duplicate_of=None))
+                changed = True
+            for opportunity_id, canonical in duplicates.items():
+                if current.get(opportunity_id) != canonical:
+                    db.execute(
+                        update(Opportunity).where(Opportunity.id == opportunity_id).values(duplicate_of=canonical)
+                    )
+                    changed = True
+        db.commit()
+        if changed:
+            bump_version(db, Opportunity.__tablename__)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if session is None:
+            db.close()
+    return found
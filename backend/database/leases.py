@@ -0,0 +1,119 @@
+"""
+Named leases in the database, so that scrape workers on different hosts
+agree on who runs what.
+
+A lease is a row in `worker_leases` with an owner and an expiry. Taking it
+is one conditional UPDATE (or an INSERT the first time the name is used),
+so of two workers racing for it exactly one wins. The holder renews it
+every `ttl / 3` seconds; a worker that dies stops renewing and its lease
+runs out, after which a standby takes over.
+"""
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from .db import SessionLocal
+from .models import WorkerLease
+
+LEASE_TTL = float(os.getenv("WORKER_LEASE_TTL_SECONDS", "60"))
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease:
+    """The lease `name`, as seen by `owner`."""
+
+    def __init__(self, name: str, owner: str | None = None, ttl: float = LEASE_TTL):
+        self.name = name
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.held = False
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free or expired, or extend it if we hold it."""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        db = SessionLocal()
+        try:
+            taken = db.execute(
+                update(WorkerLease)
+                .where(
+                    WorkerLease.name == self.name,
+                    or_(WorkerLease.owner == self.owner, WorkerLease.expires_at < now),
+                )
+                .values(
+                    owner=self.owner,
+                    expires_at=expires_at,
+                    acquired_at=case((WorkerLease.owner == self.owner, WorkerLease.acquired_at), else_=now),
+                )
+            ).rowcount
+            if not taken:
+                db.execute(insert(WorkerLease).values(
+                    name=self.name, owner=self.owner, acquired_at=now, expires_at=expires_at,
+                ))
+            db.commit()
+            self.held = True
+        except IntegrityError:
+            # Someone else holds it
+            db.rollback()
+            self.held = False
+        finally:
+            db.close()
+        return self.held
+
+    renew = acquire
+
+    def release(self):
+        db = SessionLocal()
+        try:
+            db.execute(delete(WorkerLease).where(WorkerLease.name == self.name, WorkerLease.owner == self.owner))
+            db.commit()
+        finally:
+            db.close()
+        self.held = False
+
+    @contextmanager
+    def hold(self, on_lost=None):
+        """
+        Keep the lease renewed while the block runs; yields False (and runs
+        nothing else) when someone else holds it. `on_lost` is called if a
+        renewal fails, e.g. because the database was unreachable for a TTL.
+        """
+        if not self.acquire():
+            yield False
+            return
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(stop, on_lost), name=f"lease-{self.name}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            yield True
+        finally:
+            stop.set()
+            heartbeat.join()
+            try:
+                self.release()
+            except Exception as e:
+                print(f"⚠️ Could not release lease {self.name}, it expires in {self.ttl:g}s: {e}")
+
+    def _heartbeat(self, stop, on_lost):
+        while not stop.wait(self.ttl / 3):
+            try:
+                renewed = self.renew()
+            except Exception as e:
+                print(f"⚠️ Lease {self.name} renewal failed: {e}")
+                continue  # try again before it runs out
+            if not renewed:
+                print(f"⚠️ Lost lease {self.name}")
+                if on_lost is not None:
+                    on_lost()
+                return
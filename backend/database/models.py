@@ -1,6 +1,16 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text
+from sqlalchemy import Boolean, Column, Float, Integer, String, DateTime, Text, Index
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import synonym
 from sqlalchemy.sql import func
 from .db import Base
+from .normalize import compute_status, status_sql
+
+# prize_usd / starts_at / ends_at are parsed from the display strings at
+# ingest time (database.normalize); current_status is worked out from them
+# whenever it is read, so it never goes stale the way days_left does.
+
+# FULLTEXT indexes back /search on MySQL and must match the columns listed in
+# search.SEARCH_SOURCES; SQLite uses the FTS5 mirror created in search.py.
 
 
 # Coursera Courses (existing)
@@ -13,6 +23,12 @@ class Course(Base):
     provider = Column(String(200))
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_courses_provider_scraped_at", "provider", "scraped_at"),
+        Index("ix_courses_scraped_at", "scraped_at"),
+        Index("ft_courses", "title", "provider", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
 
 # Udemy Courses (existing)
 class UdemyCourse(Base):
@@ -25,6 +41,12 @@ class UdemyCourse(Base):
     price = Column(String(50), default="Free")
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_udemy_courses_price_scraped_at", "price", "scraped_at"),
+        Index("ix_udemy_courses_scraped_at", "scraped_at"),
+        Index("ft_udemy_courses", "title", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
 
 # Devpost Hackathons (existing)
 class Hackathon(Base):
@@ -42,8 +64,30 @@ class Hackathon(Base):
     themes = Column(Text)
     managed_by_devpost = Column(String(10), default="No")
     days_left = Column(String(50))
+    prize_usd = Column(Float)
+    starts_at = Column(DateTime(timezone=True))
+    ends_at = Column(DateTime(timezone=True))
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    @hybrid_property
+    def current_status(self):
+        return compute_status(self.status, self.starts_at, self.ends_at)
+
+    @current_status.inplace.expression
+    @classmethod
+    def _current_status_expression(cls):
+        return status_sql(cls.status, cls.starts_at, cls.ends_at)
+
+    __table_args__ = (
+        Index("ix_hackathons_ends_at_prize_usd", "ends_at", "prize_usd"),
+        Index("ix_hackathons_prize_usd", "prize_usd"),
+        Index("ix_hackathons_starts_at", "starts_at"),
+        Index("ix_hackathons_status_scraped_at", "status", "scraped_at"),
+        Index("ix_hackathons_location_scraped_at", "location", "scraped_at"),
+        Index("ix_hackathons_scraped_at", "scraped_at"),
+        Index("ft_hackathons", "title", "themes", "host", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
 
 # LabLab Hackathons (NEW)
 class LablabHackathon(Base):
@@ -62,6 +106,7 @@ class LablabHackathon(Base):
     start_date = Column(DateTime(timezone=True))
     end_date = Column(DateTime(timezone=True))
     image_url = Column(String(500))
+    prize_usd = Column(Float)
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
@@ -69,6 +114,28 @@ class LablabHackathon(Base):
         onupdate=func.now(),
     )
 
+    # Same names as on Hackathon, so both tables can be queried alike
+    starts_at = synonym("start_date")
+    ends_at = synonym("end_date")
+
+    @hybrid_property
+    def current_status(self):
+        return compute_status(self.status, self.start_date, self.end_date)
+
+    @current_status.inplace.expression
+    @classmethod
+    def _current_status_expression(cls):
+        return status_sql(cls.status, cls.start_date, cls.end_date)
+
+    __table_args__ = (
+        Index("ix_lablab_hackathons_end_date_prize_usd", "end_date", "prize_usd"),
+        Index("ix_lablab_hackathons_prize_usd", "prize_usd"),
+        Index("ix_lablab_hackathons_status_end_date", "status", "end_date"),
+        Index("ix_lablab_hackathons_start_date", "start_date"),
+        Index("ix_lablab_hackathons_scraped_at", "scraped_at"),
+        Index("ft_lablab_hackathons", "title", "themes", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
 
 # Indeed Internships (NEW) – keep ONLY this one
 class Internship(Base):
@@ -83,3 +150,121 @@ class Internship(Base):
     link = Column(String(500), unique=True, nullable=False, index=True)
     student_focus = Column(Boolean, default=True, index=True)
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_student_internships_remote_scraped_at", "is_remote", "scraped_at"),
+        Index("ix_student_internships_company", "company"),
+        Index("ix_student_internships_scraped_at", "scraped_at"),
+        Index(
+            "ft_student_internships", "title", "company", "description", mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
+
+
+
+# Every course, hackathon and internship in one denormalized table, kept in
+# sync by database.opportunities whenever a source table is written
+class Opportunity(Base):
+    __tablename__ = "opportunities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(20), nullable=False)
+    source = Column(String(20), nullable=False)
+    source_id = Column(Integer, nullable=False)
+    title = Column(String(500), nullable=False)
+    link = Column(String(500), nullable=False, unique=True)
+    organizer = Column(String(300))
+    location = Column(String(200))
+    is_remote = Column(Boolean, default=False)
+    status = Column(String(20), default="unknown")
+    starts_at = Column(DateTime(timezone=True))
+    deadline = Column(DateTime(timezone=True))
+    prize_usd = Column(Float)
+    price = Column(String(50))
+    participants = Column(Integer, default=0)
+    themes = Column(Text)
+    # Set by database.dedup when another source lists the same opportunity
+    duplicate_of = Column(Integer)
+    scraped_at = Column(DateTime(timezone=True))
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    # `status` is the one worked out at the last sync; this is the one as of now
+    @hybrid_property
+    def current_status(self):
+        return compute_status(self.status, self.starts_at, self.deadline)
+
+    @current_status.inplace.expression
+    @classmethod
+    def _current_status_expression(cls):
+        return status_sql(cls.status, cls.starts_at, cls.deadline)
+
+    __table_args__ = (
+        Index("ix_opportunities_type_scraped_at", "type", "scraped_at"),
+        Index("ix_opportunities_source_scraped_at", "source", "scraped_at"),
+        Index("ix_opportunities_type_status_deadline", "type", "status", "deadline"),
+        Index("ix_opportunities_type_prize_usd", "type", "prize_usd"),
+        Index("ix_opportunities_deadline", "deadline"),
+        Index("ix_opportunities_source_id", "source", "source_id"),
+        Index("ix_opportunities_organizer", "organizer"),
+        Index("ix_opportunities_duplicate_of", "duplicate_of"),
+    )
+
+# Content fingerprint of every scraped link, used to skip unchanged items
+class ScrapeFingerprint(Base):
+    __tablename__ = "scrape_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(50), nullable=False, index=True)
+    link = Column(String(500), nullable=False, unique=True)
+    content_hash = Column(String(64), nullable=False)
+    change_count = Column(Integer, default=0)
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Bumped by every save step that changes a table; the API cache keys on it
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Named lock shared by the scrape workers (database.leases); whoever owns an
+# unexpired row runs the jobs it covers
+class WorkerLease(Base):
+    __tablename__ = "worker_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(200), nullable=False)
+    acquired_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# One row per scrape of one source, written by worker.py
+class ScrapeRun(Base):
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(50), nullable=False)
+    trigger = Column(String(20), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    ok = Column(Boolean, default=False)
+    timed_out = Column(Boolean, default=False)
+    items = Column(Integer, default=0)
+    new = Column(Integer, default=0)
+    changed = Column(Integer, default=0)
+    unchanged = Column(Integer, default=0)
+    queued = Column(Integer, default=0)
+    error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_scrape_runs_source_started_at", "source", "started_at"),
+    )
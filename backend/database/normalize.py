@@ -0,0 +1,180 @@
+"""
+Parsing of the free-text fields the scrapers store (prizes, submission
+periods, status labels, locations) into typed values.
+
+Shared by the opportunities read model and the ingest step, so every
+consumer agrees on what "$10k in prizes" or "Nov 17 - Dec 31, 2025" means.
+The `*_sql` functions are the SQL twins of the status helpers, for filters
+and hybrid properties that must agree with them.
+"""
+import re
+from datetime import datetime
+
+from sqlalchemy import case, func, or_
+
+# Rough conversion rates; prizes are only compared and bucketed, never paid out
+USD_RATES = {
+    "$": 1.0, "USD": 1.0, "US$": 1.0,
+    "€": 1.08, "EUR": 1.08,
+    "£": 1.27, "GBP": 1.27,
+    "₹": 0.012, "INR": 0.012,
+    "CAD": 0.73, "AUD": 0.66,
+}
+MONTHS = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12,
+}
+ONLINE_LOCATIONS = ("online", "hackathon", "remote", "virtual")
+
+OPEN, UPCOMING, ENDED, UNKNOWN = "open", "upcoming", "ended", "unknown"
+# Status labels as the sources print them
+STATUS_LABELS = {
+    "open": OPEN, "register": OPEN, "ongoing": OPEN, "live": OPEN,
+    "upcoming": UPCOMING, "soon": UPCOMING,
+    "ended": ENDED, "finished": ENDED, "closed": ENDED,
+}
+
+_CURRENCY = "|".join(re.escape(c) for c in sorted(USD_RATES, key=len, reverse=True))
+_PRIZE_PATTERN = re.compile(
+    rf"(?P<pre>{_CURRENCY})?\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<scale>[kKmM](?![a-zA-Z]))?\s*(?P<post>{_CURRENCY})?"
+)
+_PERIOD_PATTERN = re.compile(
+    r"(?P<m1>[A-Za-z]{3})[a-z]*\.?\s+(?P<d1>\d{1,2})(?:,?\s+(?P<y1>\d{4}))?"
+    r"\s*[-–]\s*"
+    r"(?:(?P<m2>[A-Za-z]{3})[a-z]*\.?\s+)?(?P<d2>\d{1,2})(?:,?\s+(?P<y2>\d{4}))?"
+)
+
+
+def parse_prize_usd(text) -> float | None:
+    """
+    The largest amount in `text` converted to USD, e.g. "$10,000 in prizes"
+    -> 10000.0 and "€5k" -> 5400.0. Amounts without a currency count as
+    dollars, but only when they look like money ("1,000", "5k"); text
+    without any amount gives None.
+    """
+    if not text or not isinstance(text, str):
+        return None
+    best = None
+    for match in _PRIZE_PATTERN.finditer(text):
+        currency = match.group("pre") or match.group("post")
+        scale = (match.group("scale") or "").upper()
+        if not currency and not scale and "," not in match.group("amount"):
+            # Lone small numbers ("Top 3 teams") are not prizes
+            continue
+        amount = float(match.group("amount").replace(",", ""))
+        amount *= {"K": 1_000, "M": 1_000_000}.get(scale, 1)
+        amount *= USD_RATES.get(currency or "$", 1.0)
+        if best is None or amount > best:
+            best = amount
+    return round(best, 2) if best is not None else None
+
+
+def parse_period(text, today: datetime | None = None, label=None):
+    """
+    `(start, end)` datetimes for a period such as "FEB 7 - 15",
+    "Nov 17 - Dec 31, 2025" or "Dec 17, 2025 - Feb 09, 2026"; `(None, None)`
+    when it cannot be read. The end is the last second of its day. Without a
+    year, a month already past this year is taken to be next year, unless
+    the status `label` says the event ended: then the period is the latest
+    one that is already over.
+    """
+    if not text or not isinstance(text, str):
+        return None, None
+    match = _PERIOD_PATTERN.search(text)
+    if not match:
+        return None, None
+    start_month = MONTHS.get(match.group("m1").upper())
+    end_month = MONTHS.get((match.group("m2") or match.group("m1")).upper())
+    if not start_month or not end_month:
+        return None, None
+
+    today = today or datetime.now()
+    end_year = match.group("y2") or match.group("y1")
+    if end_year:
+        end_year = int(end_year)
+    elif normalize_status(label) == ENDED:
+        end_year = today.year - (1 if (end_month, int(match.group("d2"))) >= (today.month, today.day) else 0)
+    else:
+        end_year = today.year + (1 if end_month < today.month else 0)
+    if match.group("y1"):
+        start_year = int(match.group("y1"))
+    else:
+        start_year = end_year - (1 if start_month > end_month else 0)
+    try:
+        start = datetime(start_year, start_month, int(match.group("d1")))
+        end = datetime(end_year, end_month, int(match.group("d2")), 23, 59, 59)
+    except ValueError:
+        return None, None
+    return start, end
+
+
+def normalize_status(label) -> str:
+    """Map a source's status label ("Register", "5 days left", ...) to OPEN/UPCOMING/ENDED/UNKNOWN."""
+    if not label or not isinstance(label, str):
+        return UNKNOWN
+    lowered = label.strip().lower()
+    if lowered in STATUS_LABELS:
+        return STATUS_LABELS[lowered]
+    if "left" in lowered:
+        return OPEN
+    for word, status in STATUS_LABELS.items():
+        if word in lowered:
+            return status
+    return UNKNOWN
+
+
+def compute_status(label, starts_at: datetime | None, ends_at: datetime | None,
+                   now: datetime | None = None) -> str:
+    """
+    Status from the dates when they are known, otherwise from the label. A
+    label saying the event ended always wins: dates read without a year can
+    land in the wrong one, and an ended event never reopens.
+    """
+    now = now or datetime.now()
+    if normalize_status(label) == ENDED:
+        return ENDED
+    if ends_at is not None and _naive(ends_at) < now:
+        return ENDED
+    if starts_at is not None and _naive(starts_at) > now:
+        return UPCOMING
+    if ends_at is not None:
+        return OPEN
+    return normalize_status(label)
+
+
+def status_label_sql(label):
+    """SQL twin of `normalize_status` for a label column."""
+    lowered = func.lower(func.trim(label))
+    return case(
+        *((lowered == word, status) for word, status in STATUS_LABELS.items()),
+        (lowered.like("%left%"), OPEN),
+        # The same substring fallback, in the same order
+        *((lowered.like(f"%{word}%"), status) for word, status in STATUS_LABELS.items()),
+        else_=UNKNOWN,
+    )
+
+
+def status_sql(label, starts_at, ends_at, now: datetime | None = None):
+    """SQL twin of `compute_status`."""
+    now = now or datetime.now()
+    return case(
+        (status_label_sql(label) == ENDED, ENDED),
+        (ends_at < now, ENDED),
+        (starts_at > now, UPCOMING),
+        (ends_at.isnot(None), OPEN),
+        else_=status_label_sql(label),
+    )
+
+
+def is_remote_location(location) -> bool:
+    return bool(location) and any(word in location.lower() for word in ONLINE_LOCATIONS)
+
+
+def remote_location_sql(location):
+    """SQL twin of `is_remote_location` for a location column (NULL is not remote)."""
+    lowered = func.lower(location)
+    return or_(*(lowered.like(f"%{word}%") for word in ONLINE_LOCATIONS))
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo else value
@@ -0,0 +1,195 @@
+"""
+The `opportunities` read model: one row per course, hackathon and
+internship with normalized type, source, deadline, prize and remote
+fields, so a page of the frontend is a single indexed query instead of one
+request per source merged in the browser.
+
+`bulk_upsert` calls `sync_opportunities` with the links it just wrote to a
+source table, which keeps the model current as scrapers save;
+`rebuild_opportunities` backfills it from the source tables.
+`database.dedup` marks rows that another source also lists.
+"""
+from sqlalchemy import select
+
+from . import models
+from .db import SessionLocal
+from .normalize import (
+    OPEN,
+    compute_status,
+    is_remote_location,
+    parse_period,
+    parse_prize_usd,
+)
+from .upsert import UpsertResult, bulk_upsert, bump_version
+
+COURSE, HACKATHON, INTERNSHIP = "course", "hackathon", "internship"
+
+
+def _prize_usd(row):
+    return row.prize_usd if row.prize_usd is not None else parse_prize_usd(row.prize_amount)
+
+
+def _coursera(row):
+    return {"type": COURSE, "organizer": row.provider, "is_remote": True, "status": OPEN}
+
+
+def _udemy(row):
+    return {
+        "type": COURSE,
+        "organizer": row.provider or "Udemy",
+        "is_remote": True,
+        "status": OPEN,
+        "price": row.price,
+    }
+
+
+def _devpost(row):
+    starts_at, deadline = row.starts_at, row.ends_at
+    if starts_at is None and deadline is None:
+        starts_at, deadline = parse_period(row.submission_period, label=row.status)
+    return {
+        "type": HACKATHON,
+        "organizer": row.host,
+        "location": row.location,
+        "is_remote": is_remote_location(row.location),
+        "status": compute_status(row.status, starts_at, deadline),
+        "starts_at": starts_at,
+        "deadline": deadline,
+        "prize_usd": _prize_usd(row),
+        "participants": row.participants or 0,
+        "themes": row.themes,
+    }
+
+
+def _lablab(row):
+    starts_at, deadline = row.start_date, row.end_date
+    if starts_at is None or deadline is None:
+        starts_at, deadline = parse_period(row.submission_period, label=row.status)
+    return {
+        "type": HACKATHON,
+        "organizer": "LabLab.ai",
+        "location": row.location,
+        "is_remote": is_remote_location(row.location),
+        "status": compute_status(row.status, starts_at, deadline),
+        "starts_at": starts_at,
+        "deadline": deadline,
+        "prize_usd": _prize_usd(row),
+        "participants": row.participants or 0,
+        "themes": row.themes,
+    }
+
+
+def _internship(row):
+    return {
+        "type": INTERNSHIP,
+        "organizer": row.company,
+        "location": row.location,
+        "is_remote": bool(row.is_remote),
+        "status": OPEN,
+    }
+
+
+# source table -> (model, source name, mapper)
+MAPPERS = {
+    models.Course.__tablename__: (models.Course, "coursera", _coursera),
+    models.UdemyCourse.__tablename__: (models.UdemyCourse, "udemy", _udemy),
+    models.Hackathon.__tablename__: (models.Hackathon, "devpost", _devpost),
+    models.LablabHackathon.__tablename__: (models.LablabHackathon, "lablab", _lablab),
+    models.Internship.__tablename__: (models.Internship, "internships", _internship),
+}
+
+
+def to_opportunity(source: str, row, mapper) -> dict:
+    data = {
+        "source": source,
+        "source_id": row.id,
+        "title": row.title,
+        "link": row.link,
+        "scraped_at": row.scraped_at,
+        "organizer": None,
+        "location": None,
+        "is_remote": False,
+        "starts_at": None,
+        "deadline": None,
+        "prize_usd": None,
+        "price": None,
+        "participants": 0,
+        "themes": None,
+    }
+    data.update(mapper(row))
+    return data
+
+
+def sync_opportunities(db, table_name: str, links, chunk_size: int = 1000):
+    """
+    Refresh the opportunities built from `links` of `table_name` inside
+    `db`'s transaction: nothing is committed here, so they land (or roll
+    back) together with the caller's write, version bump included.
+    """
+    spec = MAPPERS.get(table_name)
+    if spec is None or not links:
+        return None
+    model, source, mapper = spec
+    links = list(links)
+    result = UpsertResult()
+    for start in range(0, len(links), chunk_size):
+        rows = db.scalars(select(model).where(model.link.in_(links[start:start + chunk_size])))
+        opportunities = [to_opportunity(source, row, mapper) for row in rows]
+        result += bulk_upsert(models.Opportunity, opportunities, insert_only=(), session=db, commit=False)
+    if result.created or result.updated:
+        bump_version(db, models.Opportunity.__tablename__, commit=False)
+    return result
+
+
+def backfill_hackathon_columns(session=None) -> int:
+    """Fill prize_usd / starts_at / ends_at on hackathons saved before those columns existed."""
+    db = session or SessionLocal()
+    filled = 0
+    try:
+        for row in db.scalars(select(models.Hackathon).where(models.Hackathon.prize_usd.is_(None))):
+            row.prize_usd = parse_prize_usd(row.prize_amount)
+            if row.ends_at is None:
+                row.starts_at, row.ends_at = parse_period(row.submission_period, label=row.status)
+            filled += 1
+        for row in db.scalars(select(models.LablabHackathon).where(models.LablabHackathon.prize_usd.is_(None))):
+            row.prize_usd = parse_prize_usd(row.prize_amount)
+            filled += 1
+        db.commit()
+    finally:
+        if session is None:
+            db.close()
+    return filled
+
+
+def rebuild_opportunities(session=None, chunk_size: int = 1000) -> UpsertResult:
+    """Build the opportunities of every row in every source table."""
+    db = session or SessionLocal()
+    result = UpsertResult()
+    try:
+        for model, source, mapper in MAPPERS.values():
+            last_id = 0
+            while True:
+                rows = list(db.scalars(
+                    select(model).where(model.id > last_id).order_by(model.id).limit(chunk_size)
+                ))
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                opportunities = [to_opportunity(source, row, mapper) for row in rows]
+                result += bulk_upsert(models.Opportunity, opportunities, insert_only=(), session=db)
+    finally:
+        if session is None:
+            db.close()
+    return result
+
+
+if __name__ == "__main__":
+    from .db import engine
+    from .schema import sync_schema
+
+    sync_schema(engine)
+    print(f"✓ Typed hackathon columns filled: {backfill_hackathon_columns()}")
+    print(f"✓ Opportunities rebuilt: {rebuild_opportunities()}")
+
+    from .dedup import flag_duplicates
+    print(f"✓ Cross-source duplicates flagged: {flag_duplicates()}")
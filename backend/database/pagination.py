@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) pagination for the list routers.
+
+A page is addressed by the sort key and id of its last row instead of an
+OFFSET, so page 500 costs the same index range scan as page 1 and rows
+inserted by a running scrape never shift the pages a client is walking.
+The cursor handed to clients is opaque (urlsafe base64 JSON).
+
+SQLite keeps DateTime columns as text, and not always in one format:
+`server_default=func.now()` stores `2026-10-18 08:49:56` while a bound
+datetime is `2026-10-18 08:49:56.000000`, and the two compare as strings.
+There, DateTime sort keys and cursor values are both passed through
+`strftime` so they compare as times.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, and_, literal, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from .crud import apply_sort
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another sort."""
+
+
+class _SortKey(FunctionElement):
+    """A DateTime expression in the form it is ordered and compared by."""
+    name = "sort_key"
+    inherit_cache = True
+
+
+@compiles(_SortKey)
+def _compile_sort_key(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(_SortKey, "sqlite")
+def _compile_sort_key_sqlite(element, compiler, **kw):
+    return f"strftime('%Y-%m-%d %H:%M:%f', {compiler.process(element.clauses, **kw)})"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise InvalidCursor("Unknown cursor value")
+    return value
+
+
+def encode_cursor(sort: str, value, row_id: int) -> str:
+    payload = json.dumps({"s": sort, "v": _encode_value(value), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    """Return `(value, id)` stored in `cursor`; it must have been issued for `sort`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        return _decode_value(payload["v"]), int(payload["id"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        if isinstance(e, InvalidCursor):
+            raise
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def _after(column, id_column, value, row_id, descending: bool):
+    """
+    Rows strictly after `(value, row_id)` in `ORDER BY column, id`.
+    NULLs sort first ascending and last descending, as in MySQL and SQLite.
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < row_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < row_id),
+            column.is_(None),
+        )
+    if value is None:
+        return or_(and_(column.is_(None), id_column > row_id), column.isnot(None))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+def page_statement(query, sort: str, options: dict, id_column, cursor: str | None, limit: int):
+    """
+    Order `query` by `sort` (see `crud.apply_sort`), start after `cursor` and
+    fetch one row past `limit` to tell whether another page exists. Works on
+    both legacy `Query` objects and 2.0 `select()` statements.
+    """
+    name = sort.lstrip("-")
+    column = options[name]
+    descending = sort.startswith("-")
+    dated = isinstance(column.type, DateTime)
+    key = _SortKey(column) if dated else column
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        if dated and value is not None:
+            value = _SortKey(literal(value, column.type))
+        query = query.filter(_after(key, id_column, value, row_id, descending))
+    return apply_sort(query, sort, {name: key}, id_column).limit(limit + 1)
+
+
+def build_page(rows, sort: str, options: dict, id_column, limit: int):
+    """Turn the rows of a `page_statement` into `{"items", "next_cursor"}`."""
+    column = options[sort.lstrip("-")]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), getattr(last, id_column.key))
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def paginate(query, sort: str, options: dict, id_column, cursor: str | None, limit: int):
+    """Return one page of a sync `Query` as `{"items": [...], "next_cursor": str | None}`."""
+    rows = page_statement(query, sort, options, id_column, cursor, limit).all()
+    return build_page(rows, sort, options, id_column, limit)
+
+
+async def paginate_async(session, stmt, sort: str, options: dict, id_column, cursor: str | None, limit: int):
+    """`paginate` for a `select()` statement run on an `AsyncSession`."""
+    stmt = page_statement(stmt, sort, options, id_column, cursor, limit)
+    rows = list((await session.scalars(stmt)).all())
+    return build_page(rows, sort, options, id_column, limit)
@@ -0,0 +1,43 @@
+"""
+Bring an existing database up to the models.
+
+`Base.metadata.create_all` only creates missing tables; this also adds the
+nullable columns and indexes that were introduced after a table was first
+created. It never drops or alters anything, so it is safe to run at every
+start.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from . import models  # registers every table on Base.metadata
+from .db import Base
+
+
+def sync_schema(engine) -> list[str]:
+    """Create missing tables, columns and indexes; return what was added."""
+    Base.metadata.create_all(bind=engine)
+    added = []
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    print(f"⚠️ {table.name}.{column.name} is NOT NULL without a default; add it by hand")
+                    continue
+                definition = CreateColumn(column).compile(dialect=engine.dialect)
+                table_name = engine.dialect.identifier_preparer.format_table(table)
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {definition}"))
+                added.append(f"{table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                ddl_if = getattr(index, "_ddl_if", None)  # e.g. FULLTEXT indexes are MySQL-only
+                if ddl_if is not None and ddl_if.dialect not in (None, engine.dialect.name):
+                    continue
+                if index.name not in indexes:
+                    index.create(connection, checkfirst=True)
+                    added.append(index.name)
+    return added
@@ -0,0 +1,179 @@
+"""
+Ranked full-text search across every scraped table.
+
+On MySQL the search runs against the FULLTEXT indexes declared in
+`models.py` (MATCH ... AGAINST in natural language mode). On SQLite, used
+for tests and local development, the rows are mirrored into an FTS5 table
+that triggers keep in sync and results are ranked with bm25. Any other
+backend falls back to a LIKE scan so the endpoint still works.
+"""
+import re
+
+from sqlalchemy import event, literal, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import Base
+
+# source -> (model, result type, searchable columns). The MySQL FULLTEXT
+# indexes in models.py must cover exactly these columns.
+SEARCH_SOURCES = {
+    "coursera": (models.Course, "course", ("title", "provider")),
+    "udemy": (models.UdemyCourse, "course", ("title",)),
+    "devpost": (models.Hackathon, "hackathon", ("title", "themes", "host")),
+    "lablab": (models.LablabHackathon, "hackathon", ("title", "themes")),
+    "internships": (models.Internship, "internship", ("title", "company", "description")),
+}
+
+FTS_TABLE = "search_fts"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q: str) -> str | None:
+    """Turn free text into a safe FTS5 query: every term required, last one as a prefix."""
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _branch(source: str, score, where, limit: int):
+    model, kind, _ = SEARCH_SOURCES[source]
+    stmt = (
+        select(
+            literal(source).label("source"),
+            literal(kind).label("type"),
+            model.id.label("id"),
+            model.title.label("title"),
+            model.link.label("link"),
+            score.label("score"),
+        )
+        .where(where)
+        .order_by(score.desc())
+        .limit(limit)
+    )
+    # MySQL only accepts ORDER BY/LIMIT inside a UNION branch when it is a derived table
+    return select(stmt.subquery())
+
+
+def _mysql_statement(q: str, sources, limit: int):
+    from sqlalchemy.dialects.mysql import match
+
+    branches = []
+    for source in sources:
+        model, _, columns = SEARCH_SOURCES[source]
+        score = match(*(getattr(model, c) for c in columns), against=q).in_natural_language_mode()
+        branches.append(_branch(source, score, score > 0, limit))
+    combined = union_all(*branches).subquery()
+    return select(combined).order_by(combined.c.score.desc()).limit(limit)
+
+
+def _like_statement(q: str, sources, limit: int):
+    pattern = f"%{q.strip()}%"
+    branches = []
+    for source in sources:
+        model, _, columns = SEARCH_SOURCES[source]
+        where = or_(*(getattr(model, c).ilike(pattern) for c in columns))
+        branches.append(_branch(source, literal(0.0), where, limit))
+    combined = union_all(*branches).subquery()
+    return select(combined).limit(limit)
+
+
+def _sqlite_statement(q: str, sources, limit: int):
+    fts_query = _fts5_query(q)
+    if fts_query is None:
+        return None
+    placeholders = ", ".join(f":s{i}" for i in range(len(sources)))
+    stmt = text(
+        f"SELECT source, type, item_id AS id, title, link, -bm25({FTS_TABLE}, 0, 0, 0, 0, 10.0, 1.0) AS score "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q AND source IN ({placeholders}) "
+        f"ORDER BY score DESC LIMIT :limit"
+    )
+    params = {"q": fts_query, "limit": limit, **{f"s{i}": s for i, s in enumerate(sources)}}
+    return stmt.bindparams(**params)
+
+
+def search_statement(dialect_name: str, q: str, sources=None, limit: int = 20):
+    """
+    Build the ranked search statement for `dialect_name`. Every row has
+    `source, type, id, title, link, score`; higher scores rank first.
+    Returns None when `q` holds nothing searchable.
+    """
+    sources = [s for s in (sources or SEARCH_SOURCES) if s in SEARCH_SOURCES]
+    if not sources or not q or not q.strip():
+        return None
+    if dialect_name == "mysql":
+        return _mysql_statement(q, sources, limit)
+    if dialect_name == "sqlite":
+        return _sqlite_statement(q, sources, limit)
+    return _like_statement(q, sources, limit)
+
+
+def search(db: Session, q: str, sources=None, limit: int = 20):
+    stmt = search_statement(db.get_bind().dialect.name, q, sources, limit)
+    if stmt is None:
+        return []
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+async def search_async(session, q: str, sources=None, limit: int = 20):
+    """`search` for an `AsyncSession`."""
+    stmt = search_statement(session.bind.dialect.name, q, sources, limit)
+    if stmt is None:
+        return []
+    return [dict(row._mapping) for row in await session.execute(stmt)]
+
+
+# -------- SQLite FTS5 mirror --------
+
+def _fts_select(source: str, prefix: str = "") -> str:
+    """Column values of one FTS row, read from `prefix` (e.g. "new.") or the table itself."""
+    _, kind, columns = SEARCH_SOURCES[source]
+    body = " || ' ' || ".join(f"coalesce({prefix}{c}, '')" for c in columns if c != "title") or "''"
+    return f"'{source}', '{kind}', {prefix}id, {prefix}link, coalesce({prefix}title, ''), {body}"
+
+
+def _create_sqlite_fts(target, connection, **kw):
+    """
+    Create the FTS table, then triggers and a backfill for every searched
+    table that exists, whether `create_all` just made it or it was already
+    there; tables created later get theirs from a later `create_all`.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    existing = {
+        name for (name,) in connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        )
+    }
+    if FTS_TABLE not in existing:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "source UNINDEXED, type UNINDEXED, item_id UNINDEXED, link UNINDEXED, "
+            "title, body, tokenize = 'porter unicode61')"
+        ))
+    columns = "source, type, item_id, link, title, body"
+    for source, (model, _, _) in SEARCH_SOURCES.items():
+        table = model.__tablename__
+        if table not in existing or f"{table}_fts_ai" in existing:
+            continue
+        delete = f"DELETE FROM {FTS_TABLE} WHERE source = '{source}' AND item_id = old.id;"
+        insert = f"INSERT INTO {FTS_TABLE} ({columns}) VALUES ({_fts_select(source, 'new.')});"
+        connection.execute(text(
+            f"CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert} END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete} END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END"
+        ))
+        # Backfill rows that existed before the index did
+        connection.execute(text(
+            f"INSERT INTO {FTS_TABLE} ({columns}) SELECT {_fts_select(source)} FROM {table}"
+        ))
+
+
+event.listen(Base.metadata, "after_create", _create_sqlite_fts)
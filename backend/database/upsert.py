@@ -0,0 +1,175 @@
+"""
+Bulk upsert shared by every scraper's save step.
+
+Rows are written in chunks: one SELECT fetches the current values for the
+chunk's keys, then a single multi-row INSERT ... ON DUPLICATE KEY UPDATE
+(ON CONFLICT DO UPDATE on SQLite) writes only the new and changed rows,
+and the chunk is committed as one transaction, together with the mirror of
+its written rows in `opportunities`. When anything was written the table's
+row in `data_versions` is bumped, which invalidates the API response cache.
+"""
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import String, func, select
+
+from metrics import DB_WRITE_SECONDS, ROWS_UPSERTED
+from .db import SessionLocal
+from .models import DataVersion
+
+
+@dataclass
+class UpsertResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # Rows handed to the ingest queue instead of written (scrapers.ingest_queue)
+    queued: int = 0
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    def __iadd__(self, other):
+        self.created += other.created
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.queued += other.queued
+        return self
+
+    def __str__(self):
+        summary = f"New: {self.created}, Updated: {self.updated}, Unchanged: {self.unchanged}"
+        return f"{summary}, Queued: {self.queued}" if self.queued else summary
+
+
+def _insert(dialect_name: str, table):
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _upsert_statement(dialect_name: str, table, rows, key: str, update_columns):
+    stmt = _insert(dialect_name, table).values(rows)
+    if dialect_name == "mysql":
+        new = stmt.inserted
+    else:
+        new = stmt.excluded
+    values = {c: new[c] for c in update_columns}
+    if "updated_at" in table.c and "updated_at" not in values:
+        values["updated_at"] = func.now()
+    if not values:
+        values = {key: new[key]}
+    if dialect_name == "mysql":
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(index_elements=[key], set_=values)
+
+
+def bump_version(db, *table_names, commit: bool = True):
+    """
+    Advance the data version of `table_names` so cached API responses
+    expire; with `commit=False` the bump is left in `db`'s transaction.
+    """
+    dialect_name = db.get_bind().dialect.name
+    versions = DataVersion.__table__
+    for name in table_names:
+        stmt = _insert(dialect_name, versions).values(table_name=name, version=1)
+        values = {"version": versions.c.version + 1, "updated_at": func.now()}
+        if dialect_name == "mysql":
+            stmt = stmt.on_duplicate_key_update(values)
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=["table_name"], set_=values)
+        db.execute(stmt)
+    if commit:
+        db.commit()
+
+
+def _clean(table, row: dict) -> dict:
+    """Keep only the table's columns and clip strings to the column length."""
+    cleaned = {}
+    for name, value in row.items():
+        if name not in table.c:
+            continue
+        column_type = table.c[name].type
+        if isinstance(value, str) and isinstance(column_type, String) and column_type.length:
+            value = value[:column_type.length]
+        cleaned[name] = value
+    return cleaned
+
+
+def bulk_upsert(model, rows, key: str = "link", chunk_size: int = 1000,
+                insert_only=("scraped_at",), session=None, commit: bool = True) -> UpsertResult:
+    """
+    Insert or update `rows` (dicts) into `model`'s table, matching on `key`.
+
+    Keys that are not columns are ignored, rows without a `key` value are
+    skipped and later duplicates of a key win. Columns in `insert_only` are
+    written for new rows but never overwritten. With `commit=False` the
+    writes stay in `session`'s transaction: nothing is committed or rolled
+    back and the version is not bumped, both being left to the caller.
+    """
+    started = time.perf_counter()
+    table = model.__table__
+    db = session or SessionLocal()
+    dialect_name = db.get_bind().dialect.name
+    result = UpsertResult()
+
+    deduped = {}
+    for row in rows:
+        cleaned = _clean(table, row)
+        if cleaned.get(key):
+            deduped[cleaned[key]] = cleaned
+    items = list(deduped.values())
+
+    try:
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            compared = sorted({c for row in chunk for c in row if c != key and c not in insert_only})
+            existing = {
+                row[0]: row[1:]
+                for row in db.execute(
+                    select(table.c[key], *(table.c[c] for c in compared))
+                    .where(table.c[key].in_([row[key] for row in chunk]))
+                )
+            }
+
+            pending = []
+            for row in chunk:
+                current = existing.get(row[key])
+                if current is None:
+                    result.created += 1
+                elif any(row.get(c, old) != old for c, old in zip(compared, current)):
+                    result.updated += 1
+                else:
+                    result.unchanged += 1
+                    continue
+                pending.append(row)
+
+            # A multi-row VALUES clause needs every row to carry the same columns
+            groups = {}
+            for row in pending:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            for columns, group in groups.items():
+                update_columns = [c for c in columns if c != key and c not in insert_only]
+                db.execute(_upsert_statement(dialect_name, table, group, key, update_columns))
+            if pending and key == "link":
+                from .opportunities import sync_opportunities  # it upserts through this module
+                sync_opportunities(db, table.name, [row[key] for row in pending])
+            if commit:
+                db.commit()
+        if commit and (result.created or result.updated):
+            bump_version(db, table.name)
+    except Exception:
+        if commit:
+            db.rollback()
+        raise
+    finally:
+        if session is None:
+            db.close()
+    DB_WRITE_SECONDS.observe(time.perf_counter() - started, table=table.name)
+    for outcome in ("created", "updated", "unchanged"):
+        ROWS_UPSERTED.inc(getattr(result, outcome), table=table.name, result=outcome)
+    return result
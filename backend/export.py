@@ -0,0 +1,84 @@
+"""
+Streaming exports for the list routers.
+
+Rows are read through a server-side cursor in batches of
+EXPORT_BATCH_SIZE and written out as soon as each batch arrives, either as
+NDJSON (one object per line) or as a single JSON array sent in chunks.
+Only one batch is ever held in memory, whatever the size of the table,
+and the first byte goes out before the query has finished.
+"""
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import StreamingResponse
+
+from database.crud import apply_sort
+from database.db import get_async_sessionmaker
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+}
+EXPORT_FORMAT_PATTERN = "^(" + "|".join(EXPORT_FORMATS) + ")$"
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dump(row) -> str:
+    return json.dumps(dict(row._mapping), default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def export_statement(model, query, sort: str, options: dict, limit: int | None = None,
+                     overrides: dict | None = None):
+    """
+    Select the plain columns of `model` with the filters already applied to
+    `query`; rows come back as tuples, so no ORM objects pile up in the session.
+    `overrides` maps a column name to the expression exported in its place.
+    """
+    overrides = overrides or {}
+    columns = [overrides[c.key].label(c.key) if c.key in overrides else c for c in model.__table__.c]
+    stmt = apply_sort(query.with_only_columns(*columns), sort, options, model.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def stream_rows(stmt, fmt: str = "ndjson", batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Yield the encoded rows of `stmt` one batch at a time. The generator opens
+    its own session, because the request's session is closed once the
+    endpoint returns, before the body has been sent.
+    """
+    if fmt == "json":
+        yield b"["
+    first = True
+    async with get_async_sessionmaker()() as session:
+        result = await session.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            lines = [_dump(row) for row in rows]
+            if fmt == "ndjson":
+                chunk = "\n".join(lines) + "\n"
+            else:
+                chunk = ("" if first else ",") + ",".join(lines)
+                first = False
+            yield chunk.encode()
+    if fmt == "json":
+        yield b"]"
+
+
+def export_response(stmt, fmt: str, filename: str):
+    media_type, extension = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        stream_rows(stmt, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
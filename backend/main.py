@@ -1,14 +1,35 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import courses_router, hackathons_router, internships_router
-from database.db import Base, engine
-from database import models
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routers import (
+    courses_router,
+    hackathons_router,
+    internships_router,
+    opportunities_router,
+    search_router,
+)
+from database.db import engine, dispose_async_engine
+from database import models, search
+from database.pagination import InvalidCursor
+from database.schema import sync_schema
+import metrics
 import uvicorn
 
-# Create tables if they don't exist (optional, since you already did it)
-Base.metadata.create_all(bind=engine)
+# Create missing tables, and columns/indexes added since they were created
+sync_schema(engine)
+metrics.track_queries()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await dispose_async_engine()
+
 
-app = FastAPI(title="Student Opportunities API")
+app = FastAPI(title="Student Opportunities API", lifespan=lifespan)
 
 # CORS - allow the frontend dev server (Vite) and localhost
 origins = [
@@ -26,10 +47,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_timing(request: Request, call_next):
+    started = time.perf_counter()
+    with metrics.request_timing() as timing:
+        response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    # The route template, not the raw path, so ids and typos don't explode the label set
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.HTTP_REQUESTS.inc(route=path, method=request.method, status=response.status_code)
+    metrics.HTTP_REQUEST_SECONDS.observe(elapsed, route=path, method=request.method)
+    if metrics.TIMING_HEADERS:
+        response.headers["Server-Timing"] = metrics.server_timing(elapsed, timing)
+    return response
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Include routers
 app.include_router(courses_router.router)
 app.include_router(hackathons_router.router)
 app.include_router(internships_router.router)
+app.include_router(opportunities_router.router)
+app.include_router(search_router.router)
 
 
 @app.get("/")
@@ -37,6 +80,12 @@ def home():
     return {"message": "Welcome to the Student Opportunities API"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics of this worker plus the scrapes flushed to METRICS_DIR."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     # When running via `python main.py` pass the app object directly.
     # Do NOT enable `reload` here (uvicorn requires an import string for reload).
@@ -0,0 +1,358 @@
+"""
+In-process metrics with a Prometheus text exposition.
+
+Counters, gauges and histograms live in one registry per process. Scrapes
+run in their own processes (see `scrapers.runner`), so those call `flush()`
+when they finish: it adds the process's samples into a shared snapshot
+under METRICS_DIR and resets them. `render()` (served on `/metrics`) adds
+that snapshot to the samples of the current process. Counters and
+histograms sum across processes; for gauges the last write wins.
+
+    with stage("devpost", "page_load"):
+        page = fetch(url)
+    ITEMS_SCRAPED.inc(len(items), source="devpost")
+
+`track_queries()` times every SQL statement; inside `request_timing()` the
+statement count and time are added to the current request's totals, which
+the API reports in a `Server-Timing` header when METRICS_TIMING_HEADERS=1.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot writes are not locked
+    fcntl = None
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+TIMING_HEADERS = os.getenv("METRICS_TIMING_HEADERS", "0") == "1"
+METRICS_DIR = Path(os.getenv(
+    "METRICS_DIR", Path(tempfile.gettempdir()) / "student-opportunities-metrics"
+))
+SNAPSHOT_FILE = "snapshot.json"
+
+# Seconds; API handlers are mostly milliseconds, scrape stages up to minutes
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> dict:
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    @staticmethod
+    def merge(old, new):
+        """Combine a stored sample with a newer one from another process."""
+        return old + new
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @staticmethod
+    def merge(old, new):
+        return new
+
+
+class Histogram(Metric):
+    """Cumulative buckets plus sum and count, as Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample["buckets"][i] += 1
+            sample["sum"] += value
+            sample["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    @staticmethod
+    def _copy(value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+    @staticmethod
+    def merge(old, new):
+        return {
+            "buckets": [a + b for a, b in zip(old["buckets"], new["buckets"])],
+            "sum": old["sum"] + new["sum"],
+            "count": old["count"] + new["count"],
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def collect(self) -> dict:
+        """`{name: {labels: value}}` of this process."""
+        return {name: metric.samples() for name, metric in self.metrics.items()}
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=REQUEST_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# -------- Metrics --------
+
+HTTP_REQUESTS = counter(
+    "http_requests_total", "API requests by route, method and status", ("route", "method", "status")
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "Time to the response headers, by route", ("route", "method")
+)
+CACHE_REQUESTS = counter(
+    "api_cache_requests_total", "Response cache lookups by outcome (hit, miss, not_modified)", ("result",)
+)
+DB_QUERIES = counter("db_queries_total", "SQL statements executed")
+DB_QUERY_SECONDS = histogram("db_query_duration_seconds", "Time per SQL statement")
+
+SCRAPE_STAGE_SECONDS = histogram(
+    "scrape_stage_duration_seconds", "Time per scrape stage (page_load, extract, db_write)",
+    ("source", "stage"), buckets=STAGE_BUCKETS,
+)
+SCRAPE_SECONDS = histogram(
+    "scrape_duration_seconds", "Wall time of a whole source scrape", ("source",), buckets=STAGE_BUCKETS
+)
+ITEMS_SCRAPED = counter("scrape_items_total", "Items returned by a source scrape", ("source",))
+SCRAPE_FAILURES = counter("scrape_failures_total", "Failed source scrapes", ("source", "reason"))
+SCRAPE_LAST_SUCCESS = gauge(
+    "scrape_last_success_timestamp_seconds", "Unix time of the last successful scrape", ("source",)
+)
+ROWS_UPSERTED = counter(
+    "db_rows_upserted_total", "Rows seen by bulk_upsert by outcome (created, updated, unchanged)",
+    ("table", "result"),
+)
+DB_WRITE_SECONDS = histogram(
+    "db_write_duration_seconds", "Time per bulk_upsert call", ("table",), buckets=STAGE_BUCKETS
+)
+
+
+def stage(source: str, name: str):
+    """Time one scrape stage: `with stage("udemy", "page_load"): ...`"""
+    return SCRAPE_STAGE_SECONDS.time(source=source, stage=name)
+
+
+# -------- Per-request timing --------
+
+_request_timing = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def request_timing():
+    """Collect `{"db": seconds, "queries": n}` for the SQL run inside the block."""
+    timing = {"db": 0.0, "queries": 0}
+    token = _request_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _request_timing.reset(token)
+
+
+def server_timing(total: float, timing: dict) -> str:
+    """`Server-Timing` header value; durations in milliseconds."""
+    return (
+        f'db;dur={timing["db"] * 1000:.1f};desc="{timing["queries"]} queries", '
+        f"total;dur={total * 1000:.1f}"
+    )
+
+
+def track_queries():
+    """Time every SQL statement on every engine, sync or async."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.observe(elapsed)
+    timing = _request_timing.get()
+    if timing is not None:
+        timing["db"] += elapsed
+        timing["queries"] += 1
+
+
+# -------- Sharing between processes --------
+
+@contextmanager
+def _locked(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path: Path) -> dict:
+    """`{name: {labels: value}}` stored by flush(); labels are tuples."""
+    try:
+        stored = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return {name: {tuple(labels): value for labels, value in samples} for name, samples in stored.items()}
+
+
+def _merge(into: dict, samples: dict) -> dict:
+    for name, values in samples.items():
+        metric = REGISTRY.metrics.get(name)
+        if metric is None:
+            continue
+        target = into.setdefault(name, {})
+        for labels, value in values.items():
+            target[labels] = metric.merge(target[labels], value) if labels in target else value
+    return into
+
+
+def flush(directory: Path = METRICS_DIR):
+    """Add this process's samples to the shared snapshot and reset them."""
+    if not METRICS_ENABLED:
+        return
+    path = Path(directory) / SNAPSHOT_FILE
+    try:
+        with _locked(path):
+            merged = _merge(_read_snapshot(path), REGISTRY.collect())
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(
+                {name: [[list(labels), value] for labels, value in values.items()]
+                 for name, values in merged.items()}
+            ))
+            os.replace(tmp, path)
+        REGISTRY.reset()
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to {path}: {e}")
+
+
+# -------- Exposition --------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(directory: Path = METRICS_DIR) -> str:
+    """Prometheus text format (version 0.0.4) of this process plus the shared snapshot."""
+    samples = _merge(_read_snapshot(Path(directory) / SNAPSHOT_FILE), REGISTRY.collect())
+    lines = []
+    for name, metric in REGISTRY.metrics.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, value in sorted(samples.get(name, {}).items()):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(value)}")
+                continue
+            for bound, count in zip(metric.buckets, value["buckets"]):
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, [le])} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, [le])} {value['count']}")
+            lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
@@ -1,26 +1,122 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import cached_json
 from database import models, db
+from database.crud import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_range, apply_search, sort_pattern
+from database.pagination import paginate_async
+from export import EXPORT_FORMAT_PATTERN, export_response, export_statement
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
+COURSERA_SORTS = {
+    "title": models.Course.title,
+    "provider": models.Course.provider,
+    "scraped_at": models.Course.scraped_at,
+}
+UDEMY_SORTS = {
+    "title": models.UdemyCourse.title,
+    "price": models.UdemyCourse.price,
+    "scraped_at": models.UdemyCourse.scraped_at,
+}
+
+def filter_coursera(query, q, provider, scraped_after, scraped_before):
+    query = apply_search(query, q, models.Course.title, models.Course.provider)
+    if provider:
+        query = query.filter(models.Course.provider == provider)
+    return apply_range(query, models.Course.scraped_at, scraped_after, scraped_before)
+
+def filter_udemy(query, q, price, scraped_after, scraped_before):
+    query = apply_search(query, q, models.UdemyCourse.title)
+    if price:
+        query = query.filter(models.UdemyCourse.price == price)
+    return apply_range(query, models.UdemyCourse.scraped_at, scraped_after, scraped_before)
+
 @router.get("/coursera")
-def get_coursera_courses(skip: int = 0, limit: int | None = None, database: Session = Depends(db.get_db)):
-    query = database.query(models.Course).offset(skip)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+async def get_coursera_courses(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = None,
+    provider: str | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(COURSERA_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_coursera(select(models.Course), q, provider, scraped_after, scraped_before)
+    return await cached_json(
+        request, database, [models.Course.__tablename__],
+        lambda: paginate_async(database, query, sort, COURSERA_SORTS, models.Course.id, cursor, limit),
+    )
 
 @router.get("/udemy")
-def get_udemy_courses(skip: int = 0, limit: int | None = None, database: Session = Depends(db.get_db)):
-    query = database.query(models.UdemyCourse).offset(skip)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+async def get_udemy_courses(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = None,
+    price: str | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(UDEMY_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_udemy(select(models.UdemyCourse), q, price, scraped_after, scraped_before)
+    return await cached_json(
+        request, database, [models.UdemyCourse.__tablename__],
+        lambda: paginate_async(database, query, sort, UDEMY_SORTS, models.UdemyCourse.id, cursor, limit),
+    )
+
+@router.get("/coursera/export")
+async def export_coursera_courses(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+    provider: str | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(COURSERA_SORTS)),
+):
+    query = filter_coursera(select(models.Course), q, provider, scraped_after, scraped_before)
+    stmt = export_statement(models.Course, query, sort, COURSERA_SORTS, limit)
+    return export_response(stmt, format, "coursera_courses")
+
+@router.get("/udemy/export")
+async def export_udemy_courses(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+    price: str | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(UDEMY_SORTS)),
+):
+    query = filter_udemy(select(models.UdemyCourse), q, price, scraped_after, scraped_before)
+    stmt = export_statement(models.UdemyCourse, query, sort, UDEMY_SORTS, limit)
+    return export_response(stmt, format, "udemy_courses")
+
+
+@router.get("/providers")
+async def get_course_providers(request: Request, database: AsyncSession = Depends(db.get_async_db)):
+    async def build():
+        rows = await database.scalars(
+            select(models.Course.provider)
+            .where(models.Course.provider.isnot(None))
+            .distinct()
+            .order_by(models.Course.provider)
+        )
+        return {"coursera": list(rows), "udemy": ["Udemy"]}
+    return await cached_json(request, database, [models.Course.__tablename__], build)
 
 
 @router.get("/counts")
-def get_course_counts(database: Session = Depends(db.get_db)):
-    coursera_count = database.query(models.Course).count()
-    udemy_count = database.query(models.UdemyCourse).count()
-    return {"coursera": coursera_count, "udemy": udemy_count, "total": coursera_count + udemy_count}
+async def get_course_counts(request: Request, database: AsyncSession = Depends(db.get_async_db)):
+    async def build():
+        coursera_count = await database.scalar(select(func.count()).select_from(models.Course))
+        udemy_count = await database.scalar(select(func.count()).select_from(models.UdemyCourse))
+        return {"coursera": coursera_count, "udemy": udemy_count, "total": coursera_count + udemy_count}
+    tables = [models.Course.__tablename__, models.UdemyCourse.__tablename__]
+    return await cached_json(request, database, tables, build)
@@ -1,19 +1,153 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import cached_json
 from database import models, db
+from database.crud import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    apply_range,
+    apply_search,
+    apply_status,
+    sort_pattern,
+)
+from database.normalize import normalize_status, remote_location_sql
+from database.pagination import paginate_async
+from export import EXPORT_FORMAT_PATTERN, export_response, export_statement
 
 router = APIRouter(prefix="/hackathons", tags=["Hackathons"])
 
+DEVPOST_SORTS = {
+    "title": models.Hackathon.title,
+    "participants": models.Hackathon.participants,
+    "prize_usd": models.Hackathon.prize_usd,
+    "starts_at": models.Hackathon.starts_at,
+    "ends_at": models.Hackathon.ends_at,
+    "scraped_at": models.Hackathon.scraped_at,
+}
+LABLAB_SORTS = {
+    "title": models.LablabHackathon.title,
+    "participants": models.LablabHackathon.participants,
+    "start_date": models.LablabHackathon.start_date,
+    "end_date": models.LablabHackathon.end_date,
+    "prize_usd": models.LablabHackathon.prize_usd,
+    "scraped_at": models.LablabHackathon.scraped_at,
+}
+
+def filter_devpost(query, q, status, remote, min_prize, ends_after, ends_before,
+                   scraped_after, scraped_before):
+    query = apply_search(
+        query, q, models.Hackathon.title, models.Hackathon.themes, models.Hackathon.host
+    )
+    if status:
+        query = apply_status(
+            query, normalize_status(status), models.Hackathon.status,
+            models.Hackathon.starts_at, models.Hackathon.ends_at,
+        )
+    if remote is not None:
+        online = remote_location_sql(models.Hackathon.location)
+        query = query.filter(online if remote else or_(models.Hackathon.location.is_(None), ~online))
+    if min_prize is not None:
+        query = query.filter(models.Hackathon.prize_usd >= min_prize)
+    query = apply_range(query, models.Hackathon.ends_at, ends_after, ends_before)
+    return apply_range(query, models.Hackathon.scraped_at, scraped_after, scraped_before)
+
+def filter_lablab(query, q, status, min_prize, starts_after, ends_after, ends_before):
+    query = apply_search(query, q, models.LablabHackathon.title, models.LablabHackathon.themes)
+    if status:
+        query = apply_status(
+            query, normalize_status(status), models.LablabHackathon.status,
+            models.LablabHackathon.start_date, models.LablabHackathon.end_date,
+        )
+    if min_prize is not None:
+        query = query.filter(models.LablabHackathon.prize_usd >= min_prize)
+    query = apply_range(query, models.LablabHackathon.start_date, start=starts_after)
+    return apply_range(query, models.LablabHackathon.end_date, ends_after, ends_before)
+
 @router.get("/devpost")
-def get_devpost_hackathons(skip: int = 0, limit: int | None = None, database: Session = Depends(db.get_db)):
-    query = database.query(models.Hackathon).offset(skip)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+async def get_devpost_hackathons(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = None,
+    status: str | None = None,
+    remote: bool | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    ends_after: datetime | None = None,
+    ends_before: datetime | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(DEVPOST_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_devpost(
+        select(models.Hackathon), q, status, remote, min_prize, ends_after, ends_before,
+        scraped_after, scraped_before,
+    )
+    return await cached_json(
+        request, database, [models.Hackathon.__tablename__],
+        lambda: paginate_async(database, query, sort, DEVPOST_SORTS, models.Hackathon.id, cursor, limit),
+    )
 
 @router.get("/lablab")
-def get_lablab_hackathons(skip: int = 0, limit: int | None = None, database: Session = Depends(db.get_db)):
-    query = database.query(models.LablabHackathon).offset(skip)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+async def get_lablab_hackathons(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = None,
+    status: str | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    starts_after: datetime | None = None,
+    ends_after: datetime | None = None,
+    ends_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(LABLAB_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_lablab(
+        select(models.LablabHackathon), q, status, min_prize, starts_after, ends_after, ends_before
+    )
+    return await cached_json(
+        request, database, [models.LablabHackathon.__tablename__],
+        lambda: paginate_async(database, query, sort, LABLAB_SORTS, models.LablabHackathon.id, cursor, limit),
+    )
+
+@router.get("/devpost/export")
+async def export_devpost_hackathons(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+    status: str | None = None,
+    remote: bool | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    ends_after: datetime | None = None,
+    ends_before: datetime | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(DEVPOST_SORTS)),
+):
+    query = filter_devpost(
+        select(models.Hackathon), q, status, remote, min_prize, ends_after, ends_before,
+        scraped_after, scraped_before,
+    )
+    stmt = export_statement(models.Hackathon, query, sort, DEVPOST_SORTS, limit)
+    return export_response(stmt, format, "devpost_hackathons")
+
+@router.get("/lablab/export")
+async def export_lablab_hackathons(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+    status: str | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    starts_after: datetime | None = None,
+    ends_after: datetime | None = None,
+    ends_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(LABLAB_SORTS)),
+):
+    query = filter_lablab(
+        select(models.LablabHackathon), q, status, min_prize, starts_after, ends_after, ends_before
+    )
+    stmt = export_statement(models.LablabHackathon, query, sort, LABLAB_SORTS, limit)
+    return export_response(stmt, format, "lablab_hackathons")
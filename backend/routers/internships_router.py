@@ -1,12 +1,70 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import cached_json
 from database import models, db
+from database.crud import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_range, apply_search, sort_pattern
+from database.pagination import paginate_async
+from export import EXPORT_FORMAT_PATTERN, export_response, export_statement
 
 router = APIRouter(prefix="/internships", tags=["Internships"])
 
+INTERNSHIP_SORTS = {
+    "title": models.Internship.title,
+    "company": models.Internship.company,
+    "scraped_at": models.Internship.scraped_at,
+}
+
+def filter_internships(query, q, company, location, remote, scraped_after, scraped_before):
+    query = apply_search(
+        query, q, models.Internship.title, models.Internship.company, models.Internship.description
+    )
+    if company:
+        query = query.filter(models.Internship.company == company)
+    if location:
+        query = query.filter(models.Internship.location.ilike(f"{location}%"))
+    if remote is not None:
+        query = query.filter(models.Internship.is_remote == remote)
+    return apply_range(query, models.Internship.scraped_at, scraped_after, scraped_before)
+
 @router.get("/")
-def get_internships(skip: int = 0, limit: int | None = None, database: Session = Depends(db.get_db)):
-    query = database.query(models.Internship).offset(skip)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+async def get_internships(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    q: str | None = None,
+    company: str | None = None,
+    location: str | None = None,
+    remote: bool | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(INTERNSHIP_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_internships(
+        select(models.Internship), q, company, location, remote, scraped_after, scraped_before
+    )
+    return await cached_json(
+        request, database, [models.Internship.__tablename__],
+        lambda: paginate_async(database, query, sort, INTERNSHIP_SORTS, models.Internship.id, cursor, limit),
+    )
+
+@router.get("/export")
+async def export_internships(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    q: str | None = None,
+    company: str | None = None,
+    location: str | None = None,
+    remote: bool | None = None,
+    scraped_after: datetime | None = None,
+    scraped_before: datetime | None = None,
+    sort: str = Query("-scraped_at", pattern=sort_pattern(INTERNSHIP_SORTS)),
+):
+    query = filter_internships(
+        select(models.Internship), q, company, location, remote, scraped_after, scraped_before
+    )
+    stmt = export_statement(models.Internship, query, sort, INTERNSHIP_SORTS, limit)
+    return export_response(stmt, format, "internships")
@@ -0,0 +1,133 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import cached_json
+from database import models, db
+from database.crud import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    apply_range,
+    apply_search,
+    apply_status,
+    sort_pattern,
+)
+from database.pagination import paginate_async
+from export import EXPORT_FORMAT_PATTERN, export_response, export_statement
+
+router = APIRouter(prefix="/opportunities", tags=["Opportunities"])
+
+OPPORTUNITY_SORTS = {
+    "title": models.Opportunity.title,
+    "deadline": models.Opportunity.deadline,
+    "prize_usd": models.Opportunity.prize_usd,
+    "participants": models.Opportunity.participants,
+    "scraped_at": models.Opportunity.scraped_at,
+}
+
+def with_current_status(page):
+    """Report each item's status as of now rather than the one stored at the last sync."""
+    page["items"] = [
+        {**jsonable_encoder(item), "status": item.current_status} for item in page["items"]
+    ]
+    return page
+
+def filter_opportunities(query, kind, source, organizer, q, status, remote, min_prize, max_prize,
+                         deadline_after, deadline_before, include_duplicates=False):
+    if not include_duplicates:
+        query = query.filter(models.Opportunity.duplicate_of.is_(None))
+    if kind:
+        query = query.filter(models.Opportunity.type == kind)
+    if source:
+        query = query.filter(models.Opportunity.source.in_([s.strip() for s in source.split(",")]))
+    if organizer:
+        query = query.filter(models.Opportunity.organizer == organizer)
+    query = apply_search(
+        query, q, models.Opportunity.title, models.Opportunity.organizer, models.Opportunity.themes
+    )
+    query = apply_status(
+        query, status, models.Opportunity.status,
+        models.Opportunity.starts_at, models.Opportunity.deadline,
+    )
+    if remote is not None:
+        query = query.filter(models.Opportunity.is_remote == remote)
+    if min_prize is not None:
+        query = query.filter(models.Opportunity.prize_usd >= min_prize)
+    if max_prize is not None:
+        query = query.filter(models.Opportunity.prize_usd < max_prize)
+    return apply_range(query, models.Opportunity.deadline, deadline_after, deadline_before)
+
+@router.get("")
+async def get_opportunities(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    kind: str | None = Query(None, alias="type", pattern="^(course|hackathon|internship)$"),
+    source: str | None = Query(None, description="Comma-separated, e.g. coursera,udemy"),
+    organizer: str | None = None,
+    q: str | None = None,
+    status: str | None = Query(None, pattern="^(open|upcoming|ended)$"),
+    remote: bool | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    max_prize: float | None = Query(None, ge=0),
+    deadline_after: datetime | None = None,
+    deadline_before: datetime | None = None,
+    include_duplicates: bool = Query(False, description="Also list copies of an opportunity found on other sites"),
+    sort: str = Query("-scraped_at", pattern=sort_pattern(OPPORTUNITY_SORTS)),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    query = filter_opportunities(
+        select(models.Opportunity), kind, source, organizer, q, status, remote, min_prize, max_prize,
+        deadline_after, deadline_before, include_duplicates,
+    )
+    async def build():
+        return with_current_status(await paginate_async(
+            database, query, sort, OPPORTUNITY_SORTS, models.Opportunity.id, cursor, limit
+        ))
+    return await cached_json(
+        request, database, [models.Opportunity.__tablename__],
+        build, time_dependent=True,
+    )
+
+@router.get("/export")
+async def export_opportunities(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    limit: int | None = Query(None, ge=1),
+    kind: str | None = Query(None, alias="type", pattern="^(course|hackathon|internship)$"),
+    source: str | None = None,
+    organizer: str | None = None,
+    q: str | None = None,
+    status: str | None = Query(None, pattern="^(open|upcoming|ended)$"),
+    remote: bool | None = None,
+    min_prize: float | None = Query(None, ge=0),
+    max_prize: float | None = Query(None, ge=0),
+    deadline_after: datetime | None = None,
+    deadline_before: datetime | None = None,
+    include_duplicates: bool = Query(False, description="Also list copies of an opportunity found on other sites"),
+    sort: str = Query("-scraped_at", pattern=sort_pattern(OPPORTUNITY_SORTS)),
+):
+    query = filter_opportunities(
+        select(models.Opportunity), kind, source, organizer, q, status, remote, min_prize, max_prize,
+        deadline_after, deadline_before, include_duplicates,
+    )
+    stmt = export_statement(
+        models.Opportunity, query, sort, OPPORTUNITY_SORTS, limit,
+        overrides={"status": models.Opportunity.current_status},
+    )
+    return export_response(stmt, format, "opportunities")
+
+@router.get("/counts")
+async def get_opportunity_counts(request: Request, database: AsyncSession = Depends(db.get_async_db)):
+    """Number of opportunities per type and source, for the page headers."""
+    async def build():
+        rows = await database.execute(
+            select(models.Opportunity.type, models.Opportunity.source, func.count())
+            .group_by(models.Opportunity.type, models.Opportunity.source)
+        )
+        counts = {}
+        for kind, source, count in rows:
+            counts.setdefault(kind, {})[source] = count
+        return counts
+    return await cached_json(request, database, [models.Opportunity.__tablename__], build)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import cached_json
+from database import db
+from database.crud import MAX_PAGE_SIZE
+from database.search import SEARCH_SOURCES, search_async
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+@router.get("")
+async def search_all(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    sources: str | None = Query(None, description="Comma-separated subset of: " + ", ".join(SEARCH_SOURCES)),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    wanted = [s.strip() for s in sources.split(",")] if sources else None
+    tables = [model.__tablename__ for name, (model, _, _) in SEARCH_SOURCES.items()
+              if wanted is None or name in wanted]
+
+    async def build():
+        return {"items": await search_async(database, q, wanted, limit)}
+    return await cached_json(request, database, tables, build)
@@ -0,0 +1,86 @@
+"""
+Resumable progress for paginated scrapes.
+
+A checkpoint records, per source, the next page to fetch (and the URL of
+that page, for scrapers that follow "next" links) plus how many items were
+saved so far. The scrapers write their rows to the database page by page
+and advance the checkpoint after each page, so a run that dies on page 7
+of 10 is rerun from page 7. A finished run clears its checkpoint; one older
+than SCRAPE_CHECKPOINT_MAX_AGE is ignored, so yesterday's failure does not
+make tonight's run skip the first pages.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+CHECKPOINT_DIR = Path(os.getenv("SCRAPE_CHECKPOINT_DIR", Path(__file__).parent / ".checkpoints"))
+MAX_AGE = float(os.getenv("SCRAPE_CHECKPOINT_MAX_AGE", str(6 * 3600)))
+RESUME = os.getenv("SCRAPE_RESUME", "1") != "0"
+
+
+class Checkpoint:
+    """
+    Progress of one scrape of `source`. `params` (category, filters, ...)
+    are part of the key, so differently configured runs keep separate
+    checkpoints.
+    """
+
+    def __init__(self, source: str, directory: Path = CHECKPOINT_DIR, max_age: float = MAX_AGE, **params):
+        self.source = source
+        self.params = params
+        name = source
+        if params:
+            digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:10]
+            name = f"{source}_{digest}"
+        self.path = Path(directory) / f"{name}.json"
+        self.max_age = max_age
+        self.page = 1
+        self.cursor = None
+        self.items = 0
+        self.load()
+
+    @property
+    def resumed(self) -> bool:
+        return self.page > 1
+
+    def load(self):
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self
+        if time.time() - state.get("updated_at", 0) > self.max_age:
+            return self
+        self.page = state.get("page", 1)
+        self.cursor = state.get("cursor")
+        self.items = state.get("items", 0)
+        return self
+
+    def advance(self, page: int, items: int = 0, cursor: str | None = None):
+        """Record that every page before `page` is saved, `items` of them in the last one."""
+        self.page = page
+        self.cursor = cursor
+        self.items += items
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "source": self.source,
+            "params": self.params,
+            "page": self.page,
+            "cursor": self.cursor,
+            "items": self.items,
+            "updated_at": time.time(),
+        }, default=str), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        """The run finished; the next one starts from page 1."""
+        self.page, self.cursor, self.items = 1, None, 0
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __str__(self):
+        return f"page {self.page}, {self.items} items saved"
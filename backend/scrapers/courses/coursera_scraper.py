@@ -1,113 +1,126 @@
 import json
 import sys
 import os
-import time
 from pathlib import Path
+from urllib.parse import quote_plus
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Add database folder to path
-sys.path.append(str(Path(__file__).parent.parent.parent / 'database'))
-from db import Base, SessionLocal, engine
-from models import Course
-from sqlalchemy.orm import Session
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from database.db import Base, engine
+from database.models import Course
+from metrics import stage
+from scrapers import dom
+from scrapers.driver_pool import get_pool
+from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+from scrapers.ingest_queue import save_rows
+from scrapers.links import dedupe, normalize_link
+from scrapers.rate_limit import browser_get, scroll_and_wait
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
 
 # -------- Selenium driver setup --------
-def get_driver():
-    options = Options()
-    # options.add_argument("--headless")  # DISABLED for debugging
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
+def get_driver(headless=True):
+    """Borrow a session from the shared pool; hand it back with release_driver()."""
+    return get_pool(headless=headless).acquire()
+
+def release_driver(driver, headless=True):
+    get_pool(headless=headless).release(driver)
+
+# -------- Extraction --------
+# Multiple selectors for robustness; the first one that matches any card wins
+CARD_SELECTORS = [
+    "div[data-testid='product-card-cds']",
+    "[data-testid*='product-card']",
+    "li[class*='cds-ProductCard']",
+    ".cds-ProductCard-base",
+    "[data-e2e='CourseCard']"
+]
+TITLE_SELECTORS = ["h3.cds-CommonCard-title", "h2.cds-CommonCard-title", ".cds-CommonCard-title"]
+PROVIDER_SELECTORS = [".cds-ProductCard-partnerNames", ".partner-name", "[class*='partner'] p"]
+CARDS_CSS = ", ".join(CARD_SELECTORS)
+LINK_XPATH = ".//a[contains(@href,'/learn') or contains(@to,'/learn')] | .//h3//ancestor::a[1]"
+
+def extract_course_card(card):
+    """Extract title, link and provider from one parsed course card"""
+    title = next(filter(None, (dom.text(card, ts) for ts in TITLE_SELECTORS)), None)
+    if not title:
+        return None
+
+    link_elems = card.xpath(LINK_XPATH)
+    if not link_elems:
+        return None
+    link_attr = link_elems[0].get("href") or link_elems[0].get("to") or ""
+    link = link_attr if link_attr.startswith("http") else f"https://www.coursera.org{link_attr}"
+
+    provider = "Coursera"
+    for ps in PROVIDER_SELECTORS:
+        provider_elem = dom.first(card, ps)
+        if provider_elem is not None:
+            provider = dom.node_text(provider_elem)
+            break
+
+    return {"title": title[:250], "link": normalize_link(link), "provider": provider[:100]}
+
+def parse_course_cards(page_source, selector=None):
+    """Extract every course card from an HTML snapshot of a search page (or of just the `selector` cards)"""
+    with stage("coursera", "extract"):
+        doc = dom.parse(page_source)
+        for selector in [selector] if selector else CARD_SELECTORS:
+            cards = dom.select(doc, selector)
+            if cards:
+                print(f"✅ Found {len(cards)} cards with selector: {selector}")
+                return [course for course in map(extract_course_card, cards) if course]
+        return []
+
+# Markup of the cards from index `start` on, matched by the first selector
+# that matches anything, so each scroll only ships and parses the new cards
+NEW_CARDS_JS = """
+const [selectors, start] = arguments;
+for (const css of selectors) {
+    const cards = document.querySelectorAll(css);
+    if (cards.length) {
+        return [css, cards.length, Array.from(cards).slice(start).map(card => card.outerHTML)];
+    }
+}
+return [null, 0, []];
+"""
+
+def new_cards(driver, start=0):
+    """`(total cards on the page, courses parsed from the cards after index start)`"""
+    selector, total, markup = driver.execute_script(NEW_CARDS_JS, CARD_SELECTORS, start)
+    if not markup:
+        return total, []
+    return total, parse_course_cards(f"<div>{''.join(markup)}</div>", selector)
 
 # -------- Scraper --------
-def scrape_coursera_selenium(query="free", max_courses=50):
-    print(f"🚀 Starting scrape for '{query}' (max {max_courses})")
-    url = f"https://www.coursera.org/search?query={query}"
-    driver = get_driver()
-    driver.get(url)
-    
+def scrape_search_page(driver, query="free", page=1, max_courses=50):
+    """Scroll one search results page in `driver` until it stops growing or has `max_courses`."""
+    print(f"🚀 Starting scrape for '{query}' page {page} (max {max_courses})")
+    url = f"https://www.coursera.org/search?query={quote_plus(query)}"
+    if page > 1:
+        url += f"&page={page}"
     print("⏳ Waiting for page to load...")
-    time.sleep(3)
+    with stage("coursera", "page_load"):
+        browser_get(driver, url, CARDS_CSS)
     
     courses = []
-    SCROLL_PAUSE_TIME = 2
+    seen = set()
+    processed = 0
     scroll_count = 0
     max_scrolls = 15
 
     while len(courses) < max_courses and scroll_count < max_scrolls:
         print(f"\n📜 Scroll #{scroll_count + 1} - Found {len(courses)} courses so far")
         
-        # Multiple selectors for robustness
-        selectors = [
-            "div[data-testid='product-card-cds']",
-            "[data-testid*='product-card']",
-            "li[class*='cds-ProductCard']",
-            ".cds-ProductCard-base",
-            "[data-e2e='CourseCard']"
-        ]
-        
-        course_cards = []
-        for selector in selectors:
-            course_cards = driver.find_elements(By.CSS_SELECTOR, selector)
-            if course_cards:
-                print(f"✅ Found {len(course_cards)} cards with selector: {selector}")
-                break
+        # Only the cards appended since the last scroll are read and parsed
+        processed, page_courses = new_cards(driver, processed)
         
         new_courses_this_scroll = 0
-        for card in course_cards:
-            try:
-                # Title
-                title_selectors = ["h3.cds-CommonCard-title", "h2.cds-CommonCard-title", ".cds-CommonCard-title"]
-                title = None
-                for ts in title_selectors:
-                    try:
-                        title = card.find_element(By.CSS_SELECTOR, ts).text.strip()
-                        if title:
-                            break
-                    except:
-                        continue
-                
-                if not title:
-                    continue
-                
-                # Link
-                link_elem = card.find_element(By.XPATH, ".//a[contains(@href,'/learn') or contains(@to,'/learn')] | .//h3//ancestor::a[1]")
-                link_attr = link_elem.get_attribute("href") or link_elem.get_attribute("to")
-                link = link_attr if link_attr and link_attr.startswith("http") else f"https://www.coursera.org{link_attr}"
-                
-                # Provider
-                provider_selectors = [".cds-ProductCard-partnerNames", ".partner-name", "[class*='partner'] p"]
-                provider = "Coursera"
-                for ps in provider_selectors:
-                    provider_elems = card.find_elements(By.CSS_SELECTOR, ps)
-                    if provider_elems:
-                        provider = provider_elems[0].text.strip()
-                        break
-                
-                course_data = {"title": title[:250], "link": link, "provider": provider[:100]}
-                
-                if course_data not in courses:
-                    courses.append(course_data)
-                    new_courses_this_scroll += 1
-                    print(f"   ➕ {title[:60]}... ({provider})")
-                    
-            except Exception as e:
-                continue
+        for course_data in dedupe(page_courses, seen=seen):
+            courses.append(course_data)
+            new_courses_this_scroll += 1
+            print(f"   ➕ {course_data['title'][:60]}... ({course_data['provider']})")
         
         print(f"   📈 New courses this scroll: {new_courses_this_scroll}")
         
@@ -115,30 +128,54 @@ def scrape_coursera_selenium(query="free", max_courses=50):
             print("🏁 No new courses, stopping")
             break
             
-        # Scroll
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_PAUSE_TIME)
+        # Scroll and wait for more cards
+        with stage("coursera", "page_load"):
+            scroll_and_wait(driver, CARDS_CSS)
         scroll_count += 1
     
-    driver.quit()
-    print(f"\n🎉 Scraping complete! Total courses: {len(courses)}")
     return courses[:max_courses]
 
+def scrape_coursera_selenium(query="free", max_courses=50, queries=None, pages=1, workers=None):
+    """
+    Scrape every query in `queries` (default: just `query`) x result pages
+    1..`pages`, up to `max_courses` per page. The pages run in parallel on
+    up to `workers` browser sessions (default: the pool size); courses
+    found by several queries are kept once.
+    """
+    queries = list(queries) if queries is not None else [query]
+    tasks = [(q, page) for q in queries for page in range(1, pages + 1)]
+    courses = []
+    seen = set()
+    errors = []
+    for (q, page), result in get_pool().map(
+        lambda driver, task: scrape_search_page(driver, *task, max_courses=max_courses), tasks, workers
+    ):
+        if isinstance(result, Exception):
+            print(f"❌ '{q}' page {page} failed: {result}")
+            errors.append(result)
+            continue
+        courses.extend(dedupe(result, seen=seen))
+    if errors and len(errors) == len(tasks):
+        # Nothing succeeded; let the runner report the source as failed
+        raise errors[0]
+    print(f"\n🎉 Scraping complete! Total courses: {len(courses)}")
+    return courses
+
 # -------- Save to DB --------
-def save_courses_to_db(courses):
+def save_courses_to_db(courses, incremental=INCREMENTAL):
     if not courses:
         print("No courses to save to DB.")
         return
-    db: Session = SessionLocal()
-    saved = 0
-    for c in courses:
-        # Skip duplicates
-        if not db.query(Course).filter(Course.link == c["link"]).first():
-            db.add(Course(title=c["title"], link=c["link"], provider=c["provider"]))
-            saved += 1
-    db.commit()
-    db.close()
-    print(f"✅ Saved {saved} NEW courses to MySQL!")
+    tracker = FingerprintTracker("coursera") if incremental else None
+    if tracker is not None:
+        courses = tracker.filter_changed(courses)
+    with stage("coursera", "db_write"):
+        result = save_rows(Course, courses)
+    if tracker is not None:
+        tracker.save()
+        print(f"🔎 Change detection: {tracker.summary()}")
+    print(f"✅ Saved courses to MySQL! {result}")
+    return result
 
 # -------- Save to JSON --------
 def save_courses_to_json(courses, filename="coursera_courses.json"):
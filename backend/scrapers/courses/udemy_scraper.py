@@ -1,145 +1,174 @@
 import sys
 import os
 import json
-import time
 from datetime import datetime
 
 # Add the backend directory to Python path
 backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, backend_path)
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
-from database.db import SessionLocal, engine, Base
+from database.db import engine, Base
 from database.models import UdemyCourse
+from database.upsert import UpsertResult
+from metrics import stage
+from scrapers import dom
+from scrapers.checkpoints import RESUME, Checkpoint
+from scrapers.driver_pool import get_pool
+from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+from scrapers.ingest_queue import save_rows
+from scrapers.links import dedupe, normalize_link
+from scrapers.rate_limit import browser_get
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
 
 class UdemyScraper:
-    def __init__(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        )
-
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    def __init__(self, pool=None, incremental=INCREMENTAL, resume=RESUME):
+        """
+        incremental: stop at the first page with nothing new and only write changes.
+        resume: continue an interrupted run from its checkpoint.
+        """
+        self.pool = pool or get_pool(headless=True)
+        self.tracker = FingerprintTracker("udemy") if incremental else None
+        self.resume = resume
+        self.saved = UpsertResult()
 
-    def scrape_courses(self, category="", max_pages=3, free_only=False):
+    def scrape_courses(self, category="", max_pages=3, free_only=False, categories=None, workers=None):
         """
         Scrape Udemy courses.
         category: string (e.g., "development/")
-        max_pages: number of pages to scrape
+        max_pages: number of pages to scrape per category
         free_only: if True, scrape only free courses
+        categories: several categories at once (overrides `category`)
+        workers: browser sessions loading pages in parallel (default: the pool size)
+
+        Every category x page is a task for the driver pool, so coverage
+        grows with the number of workers. Pages are saved to the database
+        in order as they come back, courses already seen under another URL
+        are dropped, and each category's checkpoint moves past its saved
+        pages; a rerun after a failure starts at the first unsaved page of
+        each category. Returns the courses scraped by this run.
         """
-        all_courses = []
+        categories = list(categories) if categories is not None else [category]
+        checkpoints = {}
+        tasks = []
+        for name in categories:
+            checkpoint = Checkpoint("udemy", category=name, free_only=free_only) if self.resume else None
+            first = 1
+            if checkpoint is not None and checkpoint.resumed:
+                print(f"Resuming {name or 'all courses'} from checkpoint ({checkpoint})")
+                first = checkpoint.page
+            checkpoints[name] = checkpoint
+            tasks.extend((name, page, free_only) for page in range(first, max_pages + 1))
 
-        for page in range(1, max_pages + 1):
-            if free_only:
-                url = f"https://www.udemy.com/courses/{category}free/?p={page}"
-            else:
-                url = f"https://www.udemy.com/courses/{category}?p={page}"
-
-            print(f"\nScraping page {page}: {url}")
-            self.driver.get(url)
-
-            # Wait for course cards to load
-            try:
-                self.wait.until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.popper--popper--2r2To"))
-                )
-            except:
+        all_courses = []
+        seen = set()
+        # Categories that stopped early: caught up (incremental) or failed
+        stopped = set()
+        failed = {}
+        for (name, page, _), courses in self.pool.map(
+            self.scrape_page, tasks, workers, skip=lambda task: task[0] in stopped
+        ):
+            if name in stopped:
+                continue
+            checkpoint = checkpoints[name]
+            if isinstance(courses, Exception):
+                print(f"Error on {name or 'all courses'} page {page}: {courses}")
+                stopped.add(name)
+                failed[name] = courses
+                continue
+            if courses is None:
                 print(f"Warning: Courses did not load on page {page}")
+                if checkpoint is not None:
+                    checkpoint.advance(page + 1)
                 continue
 
-            # Get course cards
-            cards = self.driver.find_elements(By.CSS_SELECTOR, "div.popper--popper--2r2To a.udlite-custom-focus-visible.browse-course-card--link--3KIkQ")
+            print(f"Found {len(courses)} course cards on page {page}")
+            new_courses = dedupe(courses, seen=seen)
+            all_courses.extend(new_courses)
+            self.saved += self.write(new_courses)
+            if checkpoint is not None:
+                checkpoint.advance(page + 1, len(new_courses))
+
+            if self.tracker is not None and self.tracker.page_is_known(courses):
+                print(f"Nothing new on page {page}, stopping")
+                stopped.add(name)
+
+        for name, checkpoint in checkpoints.items():
+            if checkpoint is not None and name not in failed:
+                checkpoint.clear()
+        if failed and len(failed) == len(categories):
+            # Nothing succeeded; let the runner report the source as failed
+            raise next(iter(failed.values()))
+        return all_courses
 
-            print(f"Found {len(cards)} course cards on page {page}")
+    def scrape_page(self, driver, task):
+        """Load one listing page in `driver`; its courses, or None if it did not load."""
+        category, page, free_only = task
+        if free_only:
+            url = f"https://www.udemy.com/courses/{category}free/?p={page}"
+        else:
+            url = f"https://www.udemy.com/courses/{category}?p={page}"
 
-            for card in cards:
-                course = self.extract_course_data(card)
-                if course:
-                    all_courses.append(course)
+        print(f"\nScraping page {page}: {url}")
+        # Wait for course cards to load; the domain's rate limit spaces the pages out
+        with stage("udemy", "page_load"):
+            loaded = browser_get(driver, url, "div.popper--popper--2r2To")
+        if not loaded:
+            return None
 
-            # Optional: small delay to avoid detection
-            time.sleep(2)
+        # Parse every course card from one snapshot of the page
+        return self.parse_cards(driver.page_source, url)
 
-        return all_courses
+    def parse_cards(self, page_source, base_url="https://www.udemy.com/courses/"):
+        """Extract every course card from an HTML snapshot of a listing page"""
+        with stage("udemy", "extract"):
+            doc = dom.parse(page_source, base_url)
+            cards = dom.select(
+                doc, "div.popper--popper--2r2To a.udlite-custom-focus-visible.browse-course-card--link--3KIkQ"
+            )
+            return [course for course in map(self.extract_course_data, cards) if course]
 
     def extract_course_data(self, card):
-        try:
-            link = card.get_attribute("href")
-            if not link:
-                return None
-
-            # Extract title
-            try:
-                title = card.find_element(By.CSS_SELECTOR, "div.udlite-focus-visible-target.udlite-heading-md").text.strip()
-            except:
-                title = "No title available"
-
-            # Extract price
-            try:
-                price = card.find_element(By.CSS_SELECTOR, "div.price-text--price-part--Tu6MH span").text.strip()
-            except:
-                price = "Unknown"
-
-            return {
-                "title": title,
-                "link": link.split("?")[0],
-                "price": price,
-                "provider": "Udemy"
-            }
-
-        except Exception as e:
-            print(f"Extraction error: {e}")
+        link = card.get("href")
+        if not link:
             return None
 
+        return {
+            "title": dom.text(card, "div.udlite-focus-visible-target.udlite-heading-md", "No title available"),
+            "link": normalize_link(link.split("?")[0]),
+            "price": dom.text(card, "div.price-text--price-part--Tu6MH span", "Unknown"),
+            "provider": "Udemy"
+        }
+
     def save_to_json(self, courses, filename="udemy_courses.json"):
         path = os.path.join(os.path.dirname(__file__), filename)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(courses, f, indent=2, ensure_ascii=False)
         print(f"Saved {len(courses)} courses to {filename}")
 
-    def save_to_database(self, courses):
-        db: Session = SessionLocal()
-        try:
-            for c in courses:
-                if not c.get("link"):
-                    continue
-
-                existing = db.query(UdemyCourse).filter_by(link=c["link"]).first()
-                if existing:
-                    existing.title = c["title"]
-                    existing.price = c["price"]
-                else:
-                    db.add(UdemyCourse(**c))
-
-                db.commit()
-        except IntegrityError:
-            db.rollback()
-        finally:
-            db.close()
+    def write(self, courses):
+        if self.tracker is not None:
+            courses = self.tracker.filter_changed(courses)
+        with stage("udemy", "db_write"):
+            return save_rows(UdemyCourse, courses)
+
+    def save_to_database(self, courses=None):
+        """
+        Upsert `courses`, or, by default, wrap up the scrape: its pages were
+        saved as they came in, so only the fingerprints are left.
+        """
+        result = self.saved if courses is None else self.write(courses)
+        if self.tracker is not None:
+            self.tracker.save()
+            print(f"Change detection: {self.tracker.summary()}")
+        print(f"Database saved. {result}")
+        return result
 
     def close(self):
-        self.driver.quit()
+        # Sessions are borrowed per page and handed back by DriverPool.map
+        pass
 
 
 def main():
@@ -153,7 +182,7 @@ def main():
 
         if courses:
             scraper.save_to_json(courses)
-            scraper.save_to_database(courses)
+            scraper.save_to_database()
             print(f"\nSUCCESS: Scraped {len(courses)} courses")
         else:
             print("No courses found")
@@ -0,0 +1,55 @@
+"""
+In-process DOM helpers for the scrapers' extractors.
+
+Extractors take one HTML snapshot (`driver.page_source` or a container's
+outerHTML) and read it with lxml instead of issuing a WebDriver round trip
+per field. Selectors are plain CSS, compiled once and cached.
+"""
+from functools import lru_cache
+
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+
+def parse(markup: str, base_url: str | None = None):
+    """Parse an HTML snapshot; with `base_url`, relative links become absolute."""
+    doc = lxml_html.fromstring(markup or "<html></html>", base_url=base_url)
+    if base_url:
+        doc.make_links_absolute(base_url, resolve_base_href=True)
+    return doc
+
+
+@lru_cache(maxsize=256)
+def _compile(css: str) -> CSSSelector:
+    return CSSSelector(css)
+
+
+def select(node, css: str) -> list:
+    return _compile(css)(node)
+
+
+def first(node, css: str):
+    matches = select(node, css)
+    return matches[0] if matches else None
+
+
+def node_text(node) -> str:
+    """Visible-ish text of a node, with whitespace collapsed like WebElement.text."""
+    return " ".join(node.text_content().split())
+
+
+def text(node, css: str, default=None):
+    """Text of the first match of `css`, or `default` when absent or empty."""
+    match = first(node, css)
+    if match is None:
+        return default
+    return node_text(match) or default
+
+
+def attr(node, css: str, name: str, default=None):
+    """Attribute `name` of the first match of `css`, or `default`."""
+    match = first(node, css)
+    if match is None:
+        return default
+    value = match.get(name)
+    return value if value is not None else default
@@ -0,0 +1,223 @@
+"""
+Shared pool of warm headless Chrome sessions for the Selenium scrapers.
+
+Starting Chrome (and asking webdriver_manager which driver binary to use)
+dominates a short scrape, so sessions are created once per process and
+handed back to the pool instead of being quit. Images, fonts and
+stylesheets are blocked by default; none of the scrapers read them.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+POOL_SIZE = int(os.getenv("SCRAPER_DRIVER_POOL_SIZE", "1"))
+BLOCK_ASSETS = os.getenv("SCRAPER_BLOCK_ASSETS", "1") != "0"
+
+# webdriver_manager checks the latest driver version online on every
+# install(); remember the resolved path on disk for a day instead.
+DRIVER_PATH_CACHE = Path.home() / ".cache" / "student-opportunities" / "chromedriver_path"
+DRIVER_PATH_TTL = 24 * 60 * 60
+
+
+@lru_cache(maxsize=1)
+def driver_path() -> str:
+    """Path to the chromedriver binary, resolved at most once per process (and day)."""
+    configured = os.getenv("CHROMEDRIVER_PATH")
+    if configured:
+        return configured
+    try:
+        if time.time() - DRIVER_PATH_CACHE.stat().st_mtime < DRIVER_PATH_TTL:
+            cached = DRIVER_PATH_CACHE.read_text().strip()
+            if cached and os.path.exists(cached):
+                return cached
+    except OSError:
+        pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    try:
+        DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_PATH_CACHE.write_text(path)
+    except OSError:
+        pass
+    return path
+
+
+def build_options(headless=True, block_assets=BLOCK_ASSETS, user_agent=USER_AGENT):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument(f"user-agent={user_agent}")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    if block_assets:
+        # Images are blocked by preference; fonts and CSS via CDP in new_driver()
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    return options
+
+
+def new_driver(headless=True, block_assets=BLOCK_ASSETS, user_agent=USER_AGENT):
+    """Start one Chrome session configured like every scraper expects."""
+    driver = webdriver.Chrome(
+        service=Service(driver_path()),
+        options=build_options(headless, block_assets, user_agent),
+    )
+    if block_assets:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    driver.execute_cdp_cmd(
+        "Page.addScriptToEvaluateOnNewDocument",
+        {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"},
+    )
+    return driver
+
+
+class DriverPool:
+    """
+    Up to `size` Chrome sessions shared by the scrapers in this process.
+    Sessions are started lazily, reused after `release()` and only quit on
+    `close()` (or at interpreter exit).
+    """
+
+    def __init__(self, size=POOL_SIZE, **driver_options):
+        self.size = max(1, size)
+        self.driver_options = driver_options
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    driver = new_driver(**self.driver_options)
+                except Exception:
+                    self._created -= 1
+                    raise
+                self._all.append(driver)
+                return driver
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver):
+        """Return a session to the pool, dropping it if the browser died."""
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except WebDriverException:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+                self._created -= 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    @contextmanager
+    def session(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def map(self, fn, tasks, workers=None, skip=None):
+        """
+        Run `fn(driver, task)` for every task on up to `workers` sessions at
+        once (default: the pool size, which grows to fit). Yields
+        `(task, result)` in task order; `result` is the exception when `fn`
+        raised, and None when `skip(task)` was true by the time a worker
+        reached the task.
+        """
+        tasks = list(tasks)
+        workers = max(1, workers or self.size)
+        self.size = max(self.size, workers)
+
+        def run(task):
+            if skip is not None and skip(task):
+                return None
+            try:
+                with self.session() as driver:
+                    return fn(driver, task)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks) or 1), thread_name_prefix="scrape") as executor:
+            yield from zip(tasks, executor.map(run, tasks))
+
+    def warm(self, n=None):
+        """Start `n` sessions (default: the pool size) ahead of the first scrape."""
+        drivers = [self.acquire() for _ in range(min(n or self.size, self.size))]
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+            self._created = 0
+        self._idle = queue.LifoQueue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(headless=True, block_assets=BLOCK_ASSETS, size=POOL_SIZE) -> DriverPool:
+    """Process-wide pool for the given browser settings."""
+    key = (headless, block_assets)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = DriverPool(size, headless=headless, block_assets=block_assets)
+        elif size > pool.size:
+            pool.size = size
+        return pool
+
+
+@atexit.register
+def close_all():
+    for pool in list(_pools.values()):
+        pool.close()
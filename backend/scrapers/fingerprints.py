@@ -0,0 +1,138 @@
+"""
+Change detection for incremental scrapes.
+
+Each scraped item is reduced to a content hash over its stable fields
+(volatile ones such as `days_left` or `scraped_at` are left out) and
+compared with the hash stored for its link on the previous run. Only new
+and changed items are written; a listing page made only of unchanged items
+tells the paginating scrapers they have caught up.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from database.db import SessionLocal
+from database.models import ScrapeFingerprint
+from scrapers import ingest_queue
+
+VOLATILE_FIELDS = frozenset({"scraped_at", "updated_at", "days_left"})
+INCREMENTAL = os.getenv("SCRAPE_INCREMENTAL", "1") != "0"
+
+NEW, CHANGED, UNCHANGED = "new", "changed", "unchanged"
+
+
+def content_hash(item: dict, exclude=VOLATILE_FIELDS) -> str:
+    stable = {k: v for k, v in item.items() if k not in exclude}
+    payload = json.dumps(stable, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FingerprintTracker:
+    """
+    Fingerprints of one source, loaded with a single query. `classify()`
+    labels items against the previous run; `save()` records this run's
+    hashes once the items themselves have been written.
+
+    A `batched` tracker is for sources streamed in batches: `filter_changed`
+    looks up only the fingerprints of the batch it is given, and `save()`
+    after each batch write forgets that batch, so memory stays flat however
+    long the stream is.
+    """
+
+    def __init__(self, source: str, exclude=VOLATILE_FIELDS, batched: bool = False):
+        self.source = source
+        self.exclude = exclude
+        self.batched = batched
+        self.previous = None
+        self.unknown = False
+        self.seen = {}
+        self.stats = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+
+    def load(self, links=None):
+        """The source's fingerprints, or with `links` only theirs, added to those already loaded."""
+        query = select(
+            ScrapeFingerprint.link, ScrapeFingerprint.content_hash, ScrapeFingerprint.change_count
+        ).where(ScrapeFingerprint.source == self.source)
+        if links is not None:
+            query = query.where(ScrapeFingerprint.link.in_(links))
+        db = SessionLocal()
+        try:
+            rows = db.execute(query)
+            loaded = {link: (digest, count or 0) for link, digest, count in rows}
+            self.previous = loaded if links is None else {**(self.previous or {}), **loaded}
+            self.unknown = False
+        except OperationalError as e:
+            if ingest_queue.MODE != "queue":
+                raise
+            # The database is down but the queue can hold the scrape: treat
+            # everything as new and leave change counts alone on save
+            print(f"⚠️ Fingerprints unavailable, saving every {self.source} item: {str(e).splitlines()[0]}")
+            self.previous = self.previous or {}
+            self.unknown = True
+        finally:
+            db.close()
+        return self
+
+    def classify(self, item: dict) -> str:
+        link = item.get("link")
+        if link in self.seen:
+            return self.seen[link][1]
+        if self.previous is None:
+            self.load()
+        digest = content_hash(item, self.exclude)
+        previous = self.previous.get(link)
+        if previous is None:
+            status = NEW
+        elif previous[0] != digest:
+            status = CHANGED
+        else:
+            status = UNCHANGED
+        self.seen[link] = (digest, status)
+        self.stats[status] += 1
+        return status
+
+    def filter_changed(self, items):
+        """Items that are new or changed since the last run."""
+        if self.batched:
+            links = {item.get("link") for item in items} - self.seen.keys() - {None, ""}
+            if links:
+                self.load(sorted(links))
+        return [item for item in items if item.get("link") and self.classify(item) != UNCHANGED]
+
+    def page_is_known(self, items) -> bool:
+        """True when every item on a listing page is unchanged."""
+        items = [item for item in items if item.get("link")]
+        return bool(items) and all(self.classify(item) == UNCHANGED for item in items)
+
+    def forget(self, items):
+        """
+        Drop the fingerprints of `items` from this run, e.g. because writing
+        them failed, so the next run sees them as new or changed again.
+        """
+        for item in items:
+            entry = self.seen.pop(item.get("link"), None)
+            if entry is not None:
+                self.stats[entry[1]] -= 1
+
+    def save(self):
+        now = datetime.utcnow()
+        rows = []
+        for link, (digest, status) in self.seen.items():
+            row = {"source": self.source, "link": link, "content_hash": digest, "last_seen_at": now}
+            if status != UNCHANGED and not self.unknown:
+                row["last_changed_at"] = now
+                row["change_count"] = (self.previous.get(link, (None, -1))[1] + 1)
+            rows.append(row)
+        result = ingest_queue.save_rows(ScrapeFingerprint, rows, insert_only=("first_seen_at",))
+        if self.batched:
+            for link in self.seen:
+                self.previous.pop(link, None)
+            self.seen.clear()
+        return result
+
+    def summary(self) -> str:
+        return f"new: {self.stats[NEW]}, changed: {self.stats[CHANGED]}, unchanged: {self.stats[UNCHANGED]}"
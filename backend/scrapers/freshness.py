@@ -0,0 +1,254 @@
+"""
+Freshness planner: decides which sources to scrape now, within a budget of
+browser time, from how fast their items have been changing.
+
+Every item gets a change rate (changes per hour): its fingerprint's
+`change_count`, plus half a change so items never seen to change still
+count a little, over the hours it has been tracked. Items that changed in
+the last RECENT_HOURS are at least 1 / RECENT_HOURS, and hackathons whose
+deadline is within HOT_HOURS are at least one change per hour left before
+the deadline (`days_left` and the status flip to "ended" are what users
+notice most). `t` hours after a run, a source's expected number of stale
+items is the sum of `1 - exp(-rate * t)`, plus the new items it usually
+gains in `t` hours (from `scrape_runs`, which also stand in for the
+fingerprints when change detection is off).
+
+Each source is due again once its expected stale items per second of
+browser time (the median of its recent runs) reach a common level. The
+level is set so that a day of runs at those intervals costs the daily
+budget, SCRAPE_BUDGET_SECONDS (by default what running every source once a
+day costs). So hot sources come round more often and cold ones less,
+without more browser time in total. Intervals stay between
+MIN_INTERVAL_HOURS and MAX_INTERVAL_HOURS, and a run that would take the
+last 24 hours over budget waits unless the source is at its maximum.
+"""
+import math
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from statistics import median
+
+# add backend/ to sys.path
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from sqlalchemy import select
+
+from database.db import SessionLocal
+from database.models import Opportunity, ScrapeFingerprint, ScrapeRun
+
+BUDGET_SECONDS = os.getenv("SCRAPE_BUDGET_SECONDS")
+MIN_INTERVAL_HOURS = float(os.getenv("SCRAPE_MIN_INTERVAL_HOURS", "1"))
+MAX_INTERVAL_HOURS = float(os.getenv("SCRAPE_MAX_INTERVAL_HOURS", "48"))
+HOT_HOURS = float(os.getenv("SCRAPE_HOT_HOURS", "72"))
+RECENT_HOURS = 48.0
+# Every item starts with half a change over a day of "pseudo-history"
+PRIOR_CHANGES = 0.5
+PRIOR_HOURS = 24.0
+# Browser seconds assumed for a source that has no finished runs yet
+DEFAULT_COST = 600.0
+HISTORY_RUNS = 10
+
+
+@dataclass
+class Decision:
+    source: str
+    hours_since: float | None
+    stale: float
+    cost: float
+    interval: float = MAX_INTERVAL_HOURS
+    run: bool = False
+    reason: str = ""
+
+    @property
+    def due(self) -> bool:
+        return self.hours_since is None or self.hours_since >= self.interval
+
+    @property
+    def overdue(self) -> float:
+        return float("inf") if self.hours_since is None else self.hours_since / self.interval
+
+
+def _hours(delta: timedelta) -> float:
+    return delta.total_seconds() / 3600
+
+
+def _naive(value: datetime | None) -> datetime | None:
+    """Compare in naive UTC whatever the driver hands back."""
+    if value is not None and value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return value
+
+
+def item_rates(fingerprints, deadlines: dict, now: datetime) -> list:
+    """
+    Change rate (per hour) of each fingerprint `(link, change_count,
+    first_seen_at, last_changed_at)`; `deadlines` maps links to deadlines.
+    """
+    rates = []
+    for link, count, first_seen, last_changed in fingerprints:
+        age = max(0.0, _hours(now - (_naive(first_seen) or now)))
+        rate = ((count or 0) + PRIOR_CHANGES) / (age + PRIOR_HOURS)
+        last_changed = _naive(last_changed)
+        if count and last_changed is not None and _hours(now - last_changed) < RECENT_HOURS:
+            rate = max(rate, 1 / RECENT_HOURS)
+        deadline = _naive(deadlines.get(link))
+        if deadline is not None and now < deadline <= now + timedelta(hours=HOT_HOURS):
+            rate = max(rate, 1 / max(1.0, _hours(deadline - now)))
+        rates.append(rate)
+    return rates
+
+
+def expected_stale(rates, arrivals_per_hour: float, hours: float) -> float:
+    return sum(n * (1 - math.exp(-rate * hours)) for rate, n in rates.items()) + arrivals_per_hour * hours
+
+
+def _staleness(fingerprints, deadlines, now, arrivals, changes, items):
+    """`stale_at(hours)` for one source."""
+    if not fingerprints:
+        # Change detection off: only the run totals say how fast it moves
+        return lambda hours: min(items, changes * hours) + arrivals * hours
+    # Most items share a rate; summing per distinct rate keeps this cheap
+    rates = Counter(round(rate, 9) for rate in item_rates(fingerprints, deadlines, now))
+    return lambda hours: expected_stale(rates, arrivals, hours)
+
+
+def target_interval(stale_at, cost: float, level: float) -> float:
+    """Hours until `stale_at` reaches `level` stale items per second of `cost`."""
+    goal = level * cost
+    if stale_at(MIN_INTERVAL_HOURS) >= goal:
+        return MIN_INTERVAL_HOURS
+    if stale_at(MAX_INTERVAL_HOURS) < goal:
+        return MAX_INTERVAL_HOURS
+    low, high = MIN_INTERVAL_HOURS, MAX_INTERVAL_HOURS
+    for _ in range(30):
+        middle = (low + high) / 2
+        if stale_at(middle) >= goal:
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+def intervals(sources: dict, budget: float) -> dict:
+    """
+    `{source: hours between runs}` for `sources` = `{source: (stale_at,
+    cost)}`, at the level where a day of runs costs `budget` seconds.
+    """
+    def spend(level):
+        return sum(cost * 24 / target_interval(f, cost, level) for f, cost in sources.values())
+
+    level = 0.0
+    if spend(0.0) > budget:
+        low, high = 1e-9, 1.0
+        while spend(high) > budget and high < 1e9:
+            high *= 10
+        for _ in range(40):
+            middle = math.sqrt(low * high)
+            if spend(middle) > budget:
+                low = middle
+            else:
+                high = middle
+        level = high
+    return {name: target_interval(f, cost, level) for name, (f, cost) in sources.items()}
+
+
+def _run_stats(runs):
+    """
+    `(last start, typical cost in seconds, new and changed items per hour)`
+    from runs, newest first.
+    """
+    last = _naive(runs[0].started_at) if runs else None
+    durations = [
+        (_naive(r.finished_at) - _naive(r.started_at)).total_seconds() for r in runs if r.ok and r.finished_at
+    ]
+    cost = median(durations) if durations else DEFAULT_COST
+    new = changed = spans = 0.0
+    for newer, older in zip(runs, runs[1:]):
+        if newer.ok:
+            new += newer.new or 0
+            changed += newer.changed or 0
+            spans += _hours(_naive(newer.started_at) - _naive(older.started_at))
+    if not spans:
+        return last, cost, 0.0, 0.0
+    return last, cost, new / spans, changed / spans
+
+
+def plan(sources, now: datetime | None = None, budget: float | None = None, session=None) -> list:
+    """One Decision per source in `sources`, with `run` set on those to start now."""
+    now = now or datetime.utcnow()
+    db = session or SessionLocal()
+    try:
+        decisions = {}
+        curves = {}
+        for source in sources:
+            runs = list(db.scalars(
+                select(ScrapeRun).where(ScrapeRun.source == source)
+                .order_by(ScrapeRun.started_at.desc()).limit(HISTORY_RUNS)
+            ))
+            last, cost, arrivals, changes = _run_stats(runs)
+            fingerprints = db.execute(
+                select(ScrapeFingerprint.link, ScrapeFingerprint.change_count,
+                       ScrapeFingerprint.first_seen_at, ScrapeFingerprint.last_changed_at)
+                .where(
+                    ScrapeFingerprint.source == source,
+                    # Items gone from the listings no longer need refreshing
+                    ScrapeFingerprint.last_seen_at >= now - timedelta(hours=2 * MAX_INTERVAL_HOURS),
+                )
+            ).all()
+            deadlines = dict(db.execute(
+                select(Opportunity.link, Opportunity.deadline).where(
+                    Opportunity.source == source,
+                    Opportunity.deadline > now,
+                    Opportunity.deadline <= now + timedelta(hours=HOT_HOURS),
+                )
+            ).all())
+            items = (runs[0].items or 0) if runs else 0
+            stale_at = _staleness(fingerprints, deadlines, now, arrivals, changes, items)
+            hours = None if last is None else _hours(now - last)
+            curves[source] = (stale_at, cost)
+            decisions[source] = Decision(source, hours, float("inf") if hours is None else stale_at(hours), cost)
+
+        if budget is None:
+            budget = float(BUDGET_SECONDS) if BUDGET_SECONDS else sum(d.cost for d in decisions.values())
+        spent = sum(
+            (_naive(r.finished_at or now) - _naive(r.started_at)).total_seconds()
+            for r in db.scalars(select(ScrapeRun).where(ScrapeRun.started_at >= now - timedelta(hours=24)))
+        )
+    finally:
+        if session is None:
+            db.close()
+
+    for source, interval in intervals(curves, budget).items():
+        decisions[source].interval = interval
+    for decision in sorted(decisions.values(), key=lambda d: -d.overdue):
+        at_max = decision.hours_since is None or decision.hours_since >= MAX_INTERVAL_HOURS
+        if not decision.due:
+            decision.reason = f"due in {decision.interval - decision.hours_since:.1f}h"
+        elif spent + decision.cost > budget and not at_max:
+            decision.reason = f"budget: {spent:.0f}s of {budget:.0f}s used in 24h"
+        else:
+            decision.run = True
+            decision.reason = "never run" if decision.hours_since is None else f"every {decision.interval:.1f}h"
+            spent += decision.cost
+    return list(decisions.values())
+
+
+def describe(decisions) -> str:
+    lines = [f"{'source':10} {'last run':>9} {'stale':>8} {'cost':>7} {'every':>7}  decision"]
+    for d in decisions:
+        since = "never" if d.hours_since is None else f"{d.hours_since:.1f}h"
+        lines.append(
+            f"{d.source:10} {since:>9} {d.stale:8.1f} {d.cost:6.0f}s {d.interval:6.1f}h  "
+            f"{'run' if d.run else 'wait'} ({d.reason})"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from scrapers.runner import SOURCES
+
+    print(describe(plan(list(SOURCES))))
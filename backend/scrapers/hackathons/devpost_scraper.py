@@ -5,82 +5,204 @@ import os
 backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, backend_path)
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from sqlalchemy.exc import SQLAlchemyError
+import asyncio
+import re
 import json
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
 
 # Import from database folder
-from database.db import SessionLocal
 from database.models import Hackathon
+from database.normalize import parse_period, parse_prize_usd
+from database.upsert import UpsertResult
+from metrics import stage
+from scrapers import dom
+from scrapers.checkpoints import RESUME, Checkpoint
+from scrapers.driver_pool import get_pool
+from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+from scrapers.http_fetch import FetchError, get_fetcher
+from scrapers.links import normalize_link
+from scrapers.ingest_queue import save_rows
+from scrapers.rate_limit import browser_get, click_and_wait, scroll_and_wait
+
+API_URL = "https://devpost.com/api/hackathons"
 
 class DevpostScraper:
-    def __init__(self, headless=True):
-        """Initialize the Selenium WebDriver"""
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
-        self.wait = WebDriverWait(self.driver, 10)
+    def __init__(self, headless=True, pool=None, backend=None, fetcher=None, incremental=INCREMENTAL,
+                 resume=RESUME):
+        """
+        backend: "auto" tries Devpost's JSON API and falls back to the
+        browser, "http" never starts a browser, "browser" always does.
+        incremental: stop paginating at the first page with nothing new
+        and only write new or changed hackathons.
+        resume: continue an interrupted run from its checkpoint.
+        """
+        self.pool = pool or get_pool(headless=headless)
+        self.tracker = FingerprintTracker("devpost") if incremental else None
+        self.backend = backend or os.getenv("SCRAPER_BACKEND", "auto")
+        self.fetcher = fetcher
+        self.resume = resume
+        self.checkpoint = None
+        self._driver = None
         self.hackathons = []
+        self.saved = UpsertResult()
+
+    @property
+    def driver(self):
+        """Browser session, borrowed from the pool on first use"""
+        if self._driver is None:
+            self._driver = self.pool.acquire()
+        return self._driver
     
     def scrape_hackathons(self, url="https://devpost.com/hackathons", max_pages=1):
-        """Scrape hackathons from Devpost"""
+        """
+        Scrape hackathons from Devpost, over HTTP when possible. Every page
+        is saved to the database as soon as it is scraped; an interrupted
+        run keeps what it saved and its checkpoint, and the next run starts
+        at the first unsaved page.
+        """
+        self.checkpoint = Checkpoint("devpost") if self.resume else None
+        if self.checkpoint is not None and self.checkpoint.resumed:
+            print(f"↻  Resuming from checkpoint ({self.checkpoint})")
+            if self.checkpoint.page > max_pages:
+                self.checkpoint.clear()
+                return self.hackathons
+
+        if self.backend in ("auto", "http"):
+            try:
+                hackathons = asyncio.run(self.scrape_api(max_pages))
+                if hackathons or self.backend == "http":
+                    print(f"\n🎉 Total hackathons fetched from the API: {len(self.hackathons)}")
+                    self.finish()
+                    return self.hackathons
+            except FetchError as e:
+                if self.backend == "http":
+                    print(f"❌ Error fetching from the API: {e}")
+                    print(f"💾 Kept {len(self.hackathons)} saved hackathons and the checkpoint")
+                    return self.hackathons
+                print(f"⚠️  API fetch failed ({e}), falling back to the browser")
+        return self.scrape_with_browser(url, max_pages)
+
+    def first_page(self):
+        return self.checkpoint.page if self.checkpoint is not None else 1
+
+    def save_page(self, hackathons, next_page, cursor=None):
+        """Write one scraped page and move the checkpoint past it"""
+        self.hackathons.extend(hackathons)
+        self.saved += self.write(hackathons)
+        if self.checkpoint is not None:
+            self.checkpoint.advance(next_page, len(hackathons), cursor)
+
+    def finish(self):
+        """The run completed; the next one starts from page 1"""
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    async def scrape_api(self, max_pages=1):
+        """
+        Fetch listing pages from Devpost's JSON API. Pages are fetched
+        concurrently, or one by one in incremental mode so the walk can stop
+        at the first page that holds nothing new.
+        """
+        fetcher = self.fetcher or get_fetcher()
+        numbers = range(self.first_page(), max_pages + 1)
+        hackathons = []
+        try:
+            if self.tracker is None:
+                with stage("devpost", "page_load"):
+                    pages = await asyncio.gather(
+                        *(fetcher.get_json(f"{API_URL}?page={number}") for number in numbers),
+                        return_exceptions=True,
+                    )
+                # Saved in page order, up to the first page that failed
+                for number, page in zip(numbers, pages):
+                    if isinstance(page, Exception):
+                        raise page
+                    with stage("devpost", "extract"):
+                        page_hackathons = [self.map_api_hackathon(h) for h in page.get("hackathons", [])]
+                    self.save_page(page_hackathons, number + 1)
+                    hackathons.extend(page_hackathons)
+                return hackathons
+
+            for number in numbers:
+                with stage("devpost", "page_load"):
+                    page = await fetcher.get_json(f"{API_URL}?page={number}")
+                with stage("devpost", "extract"):
+                    page_hackathons = [self.map_api_hackathon(h) for h in page.get("hackathons", [])]
+                self.save_page(page_hackathons, number + 1)
+                hackathons.extend(page_hackathons)
+                if not page_hackathons or self.tracker.page_is_known(page_hackathons):
+                    print(f"⏹️  Page {number} has nothing new, stopping")
+                    break
+        finally:
+            if fetcher is not self.fetcher:
+                await fetcher.aclose()
+        return hackathons
+
+    @staticmethod
+    def map_api_hackathon(item):
+        """Map one API hackathon to the same fields the tile extractor produces"""
+        days_left = item.get("time_left_to_submission") or "N/A"
+        status = item.get("open_state") or "unknown"
+        prize = re.sub(r"<[^>]+>", "", item.get("prize_amount") or "").strip()
+        location = (item.get("displayed_location") or {}).get("location") or "N/A"
+        themes = ", ".join(t.get("name", "") for t in item.get("themes") or [])
+        return {
+            "title": (item.get("title") or "").strip(),
+            "link": normalize_link(item.get("url")),
+            "status": status,
+            "location": location,
+            "submission_period": item.get("submission_period_dates") or "N/A",
+            "prize_amount": prize or "N/A",
+            "participants": int(item.get("registrations_count") or 0),
+            "host": item.get("organization_name") or "N/A",
+            "themes": themes or "N/A",
+            "managed_by_devpost": "Yes" if item.get("managed_by_devpost_badge") else "No",
+            "days_left": days_left,
+            "scraped_at": datetime.now().isoformat()
+        }
+
+    def scrape_with_browser(self, url="https://devpost.com/hackathons", max_pages=1):
+        """Scrape hackathon tiles from the rendered Devpost page"""
+        first = self.first_page()
+        if first > 1:
+            url = self.checkpoint.cursor or f"{url}?page={first}"
         try:
             print(f"🚀 Navigating to {url}...")
-            self.driver.get(url)
+            with stage("devpost", "page_load"):
+                # Wait for the hackathon tiles, not a fixed delay
+                if not browser_get(self.driver, url, ".hackathon-tile"):
+                    print("⚠️  Hackathons did not load in time")
             
-            # Wait for hackathons to load
-            time.sleep(5)
-            
-            for page in range(max_pages):
-                print(f"\n📄 Scraping page {page + 1}...")
+            for page in range(first, max_pages + 1):
+                print(f"\n📄 Scraping page {page}...")
                 
                 # Scroll to load all content
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                with stage("devpost", "page_load"):
+                    scroll_and_wait(self.driver, ".hackathon-tile")
                 
-                # Find all hackathon tiles
-                hackathon_tiles = self.driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    ".hackathon-tile"
-                )
+                # Parse every tile from one snapshot of the page
+                page_hackathons = self.parse_tiles(self.driver.page_source, self.driver.current_url)
+                print(f"Found {len(page_hackathons)} hackathons on this page")
                 
-                print(f"Found {len(hackathon_tiles)} hackathons on this page")
+                for hackathon_data in page_hackathons:
+                    print(f"✅ Scraped: {hackathon_data['title'][:50]}...")
+                self.save_page(page_hackathons, page + 1)
                 
-                for tile in hackathon_tiles:
-                    try:
-                        hackathon_data = self.extract_hackathon_data(tile)
-                        if hackathon_data:
-                            self.hackathons.append(hackathon_data)
-                            print(f"✅ Scraped: {hackathon_data['title'][:50]}...")
-                    except Exception as e:
-                        print(f"❌ Error scraping tile: {e}")
-                        continue
+                if self.tracker is not None and self.tracker.page_is_known(page_hackathons):
+                    print("⏹️  Nothing new on this page, stopping")
+                    break
                 
                 # Try to go to next page
-                if page < max_pages - 1:
+                if page < max_pages:
                     try:
                         next_button = self.driver.find_element(By.CSS_SELECTOR, "a.next_page")
                         if "disabled" not in next_button.get_attribute("class"):
-                            next_button.click()
-                            time.sleep(3)
+                            with stage("devpost", "page_load"):
+                                click_and_wait(self.driver, next_button, ".hackathon-tile", ".hackathon-tile")
+                            if self.checkpoint is not None:
+                                self.checkpoint.advance(page + 1, cursor=self.driver.current_url)
                         else:
                             print("No more pages available")
                             break
@@ -89,106 +211,73 @@ class DevpostScraper:
                         break
             
             print(f"\n🎉 Total hackathons scraped: {len(self.hackathons)}")
+            self.finish()
             return self.hackathons
             
+        except SQLAlchemyError:
+            # A failed write fails the run; it is not a page that can be skipped
+            raise
         except Exception as e:
+            # Pages scraped so far are already saved; the checkpoint lets a rerun continue
             print(f"❌ Error during scraping: {e}")
-            return []
+            print(f"💾 Kept {len(self.hackathons)} saved hackathons and the checkpoint")
+            return self.hackathons
         
+    def parse_tiles(self, page_source, base_url="https://devpost.com/hackathons"):
+        """Extract every hackathon tile from an HTML snapshot of a listing page"""
+        with stage("devpost", "extract"):
+            doc = dom.parse(page_source, base_url)
+            hackathons = []
+            for tile in dom.select(doc, ".hackathon-tile"):
+                hackathon_data = self.extract_hackathon_data(tile)
+                if hackathon_data:
+                    hackathons.append(hackathon_data)
+        return hackathons
+
     def extract_hackathon_data(self, tile):
-        """Extract data from a single hackathon tile"""
-        try:
-            # Title
-            title_elem = tile.find_element(By.CSS_SELECTOR, "h3")
-            title = title_elem.text.strip()
-            
-            # Link
-            link_elem = tile.find_element(By.CSS_SELECTOR, "a.tile-anchor")
-            link = link_elem.get_attribute("href")
-            
-            # Status and days left
-            try:
-                status_elem = tile.find_element(By.CSS_SELECTOR, ".status-label")
-                days_left = status_elem.text.strip()
-                
-                if "left" in days_left.lower():
-                    status = "open"
-                elif "upcoming" in days_left.lower():
-                    status = "upcoming"
-                else:
-                    status = "ended"
-            except:
-                status = "unknown"
-                days_left = "N/A"
-            
-            # Location
-            try:
-                location_elem = tile.find_element(By.CSS_SELECTOR, ".info-with-icon span")
-                location = location_elem.text.strip()
-            except:
-                location = "N/A"
-            
-            # Submission period
-            try:
-                period_elem = tile.find_element(By.CSS_SELECTOR, ".submission-period")
-                submission_period = period_elem.text.strip()
-            except:
-                submission_period = "N/A"
-            
-            # Prize amount
-            try:
-                prize_elem = tile.find_element(By.CSS_SELECTOR, ".prize-amount")
-                prize_amount = prize_elem.text.strip()
-            except:
-                prize_amount = "N/A"
-            
-            # Participants
-            try:
-                participants_elem = tile.find_element(By.CSS_SELECTOR, ".participants strong")
-                participants = int(participants_elem.text.strip().replace(",", ""))
-            except:
-                participants = 0
-            
-            # Host
-            try:
-                host_elem = tile.find_element(By.CSS_SELECTOR, ".host-label")
-                host = host_elem.get_attribute("title")
-            except:
-                host = "N/A"
-            
-            # Themes
-            try:
-                theme_elems = tile.find_elements(By.CSS_SELECTOR, ".theme-label")
-                themes = ", ".join([theme.get_attribute("title") for theme in theme_elems])
-            except:
-                themes = "N/A"
-            
-            # Managed by Devpost
-            try:
-                managed_elem = tile.find_element(By.CSS_SELECTOR, ".managed-by-devpost")
-                managed_by_devpost = "Yes"
-            except:
-                managed_by_devpost = "No"
-            
-            return {
-                "title": title,
-                "link": link,
-                "status": status,
-                "location": location,
-                "submission_period": submission_period,
-                "prize_amount": prize_amount,
-                "participants": participants,
-                "host": host,
-                "themes": themes,
-                "managed_by_devpost": managed_by_devpost,
-                "days_left": days_left,
-                "scraped_at": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            print(f"Error extracting hackathon data: {e}")
+        """Extract data from a single parsed hackathon tile"""
+        title = dom.text(tile, "h3")
+        link = dom.attr(tile, "a.tile-anchor", "href")
+        if not title or not link:
             return None
+
+        # Status and days left
+        days_left = dom.text(tile, ".status-label")
+        if days_left is None:
+            status = "unknown"
+            days_left = "N/A"
+        elif "left" in days_left.lower():
+            status = "open"
+        elif "upcoming" in days_left.lower():
+            status = "upcoming"
+        else:
+            status = "ended"
+
+        participants = dom.text(tile, ".participants strong", "0").replace(",", "")
+        themes = [theme.get("title") or "" for theme in dom.select(tile, ".theme-label")]
+
+        return {
+            "title": title,
+            "link": normalize_link(link),
+            "status": status,
+            "location": dom.text(tile, ".info-with-icon span", "N/A"),
+            "submission_period": dom.text(tile, ".submission-period", "N/A"),
+            "prize_amount": dom.text(tile, ".prize-amount", "N/A"),
+            "participants": int(participants) if participants.isdigit() else 0,
+            "host": dom.attr(tile, ".host-label", "title", "N/A"),
+            "themes": ", ".join(themes),
+            "managed_by_devpost": "Yes" if dom.first(tile, ".managed-by-devpost") is not None else "No",
+            "days_left": days_left,
+            "scraped_at": datetime.now().isoformat()
+        }
     
+    @staticmethod
+    def with_typed_fields(data):
+        """Add the dates and prize parsed from the display strings, for the indexed columns"""
+        data["starts_at"], data["ends_at"] = parse_period(data.get("submission_period"), label=data.get("status"))
+        data["prize_usd"] = parse_prize_usd(data.get("prize_amount"))
+        return data
+
     def save_to_json(self, filename="devpost_hackathons.json"):
         """Save scraped data to JSON file"""
         try:
@@ -200,51 +289,44 @@ class DevpostScraper:
             print(f"❌ Error saving to JSON: {e}")
             return False
     
-    def save_to_database(self):
-        """Save scraped data to MySQL database"""
-        db = SessionLocal()
-        saved_count = 0
-        skipped_count = 0
-        
+    def write(self, hackathons):
+        """Upsert `hackathons` into the hackathons table"""
+        # scraped_at in the JSON export is a string; the column keeps its server default
+        rows = [
+            self.with_typed_fields({k: v for k, v in h.items() if k != "scraped_at"})
+            for h in hackathons
+        ]
+        if self.tracker is not None:
+            rows = self.tracker.filter_changed(rows)
         try:
-            for hackathon_data in self.hackathons:
-                try:
-                    hackathon = Hackathon(
-                        title=hackathon_data["title"],
-                        link=hackathon_data["link"],
-                        status=hackathon_data["status"],
-                        location=hackathon_data["location"],
-                        submission_period=hackathon_data["submission_period"],
-                        prize_amount=hackathon_data["prize_amount"],
-                        participants=hackathon_data["participants"],
-                        host=hackathon_data["host"],
-                        themes=hackathon_data["themes"],
-                        managed_by_devpost=hackathon_data["managed_by_devpost"],
-                        days_left=hackathon_data["days_left"]
-                    )
-                    
-                    db.add(hackathon)
-                    db.commit()
-                    saved_count += 1
-                    
-                except IntegrityError:
-                    db.rollback()
-                    skipped_count += 1
-                    print(f"⚠️  Skipped duplicate: {hackathon_data['title'][:50]}...")
-                except Exception as e:
-                    db.rollback()
-                    print(f"❌ Error saving {hackathon_data['title'][:50]}: {e}")
-            
-            print(f"\n✅ Database saved: {saved_count} new hackathons")
-            print(f"⚠️  Skipped: {skipped_count} duplicates")
-            
-        finally:
-            db.close()
+            with stage("devpost", "db_write"):
+                return save_rows(Hackathon, rows)
+        except Exception:
+            # Unwritten rows must not be fingerprinted, or the next run skips them
+            if self.tracker is not None:
+                self.tracker.forget(rows)
+            raise
+
+    def save_to_database(self, hackathons=None):
+        """
+        Upsert `hackathons`, or, by default, wrap up the scrape: its pages
+        were saved as they came in, so only the fingerprints are left.
+        """
+        result = self.saved if hackathons is None else self.write(hackathons)
+        if self.tracker is not None:
+            self.tracker.save()
+            print(f"\n🔎 Change detection: {self.tracker.summary()}")
+
+        print(f"\n✅ Database saved: {result.created} new hackathons")
+        print(f"↻  Updated: {result.updated}, unchanged: {result.unchanged}")
+        return result
     
     def close(self):
-        """Close the browser"""
-        self.driver.quit()
-        print("\n🔒 Browser closed")
+        """Hand the browser back to the pool, if one was used"""
+        if self._driver is not None:
+            self.pool.release(self._driver)
+            self._driver = None
+            print("\n🔒 Browser released")
 
 
 def main():
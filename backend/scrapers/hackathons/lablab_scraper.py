@@ -1,7 +1,7 @@
 import sys
 import os
+import asyncio
 import json
-import time
 import re
 from datetime import datetime
 
@@ -9,181 +9,239 @@ from datetime import datetime
 backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, backend_path)
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
 # Import from database folder
-from database.db import SessionLocal, engine, Base
+from database.db import engine, Base
 from database.models import LablabHackathon
+from database.normalize import parse_period, parse_prize_usd
+from metrics import stage
+from scrapers import dom
+from scrapers.driver_pool import get_pool
+from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+from scrapers.http_fetch import FetchError, get_fetcher
+from scrapers.links import normalize_link
+from scrapers.ingest_queue import save_rows
+from scrapers.rate_limit import browser_get
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
 
 
 class LablabScraper:
-    def __init__(self):
-        """Initialize the scraper with Chrome options"""
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        # Use webdriver_manager to handle ChromeDriver automatically
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
-        
+    EVENTS_URL = "https://lablab.ai/event"
+
+    def __init__(self, pool=None, backend=None, fetcher=None, incremental=INCREMENTAL):
+        """
+        backend: "auto" reads the event data embedded in the page over HTTP
+        and falls back to the browser, "http" never starts a browser,
+        "browser" always does.
+        incremental: only write hackathons that are new or changed.
+        """
+        self.pool = pool or get_pool(headless=True)
+        self.tracker = FingerprintTracker("lablab") if incremental else None
+        self.backend = backend or os.getenv("SCRAPER_BACKEND", "auto")
+        self.fetcher = fetcher
+        self._driver = None
+
+    @property
+    def driver(self):
+        """Headless browser session, borrowed from the pool on first use"""
+        if self._driver is None:
+            self._driver = self.pool.acquire()
+        return self._driver
+
     def scrape_hackathons(self):
-        """Scrape hackathon data from lablab.ai"""
-        url = "https://lablab.ai/event"
+        """Scrape hackathon data from lablab.ai, over HTTP when possible"""
+        if self.backend in ("auto", "http"):
+            try:
+                hackathons = asyncio.run(self.scrape_embedded_data())
+                if hackathons or self.backend == "http":
+                    print(f"Found {len(hackathons)} hackathons in the page data")
+                    return hackathons
+                print("No embedded event data found, falling back to the browser")
+            except FetchError as e:
+                if self.backend == "http":
+                    print(f"Error fetching page: {str(e)}")
+                    return []
+                print(f"HTTP fetch failed ({str(e)}), falling back to the browser")
+        return self.scrape_with_browser()
+
+    async def scrape_embedded_data(self):
+        """Read events from the Next.js data blob embedded in the listing page"""
+        fetcher = self.fetcher or get_fetcher()
+        try:
+            with stage("lablab", "page_load"):
+                html = await fetcher.get_text(self.EVENTS_URL)
+        finally:
+            if fetcher is not self.fetcher:
+                await fetcher.aclose()
+
+        with stage("lablab", "extract"):
+            match = re.search(
+                r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(.*?)</script>', html, re.DOTALL
+            )
+            if not match:
+                return []
+            try:
+                data = json.loads(match.group(1))
+            except ValueError:
+                return []
+            return [self.map_embedded_event(event) for event in self.find_events(data)]
+
+    @staticmethod
+    def find_events(node):
+        """Yield every dict in the page data that looks like an event (slug + dates)"""
+        seen = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, dict):
+                slug = current.get("slug")
+                has_dates = any(k in current for k in ("startAt", "startDate", "start_date"))
+                if isinstance(slug, str) and has_dates and slug not in seen:
+                    seen.add(slug)
+                    yield current
+                    continue
+                stack.extend(current.values())
+            elif isinstance(current, list):
+                stack.extend(reversed(current))
+
+    @staticmethod
+    def _parse_iso(value):
+        if not isinstance(value, str):
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+
+    def map_embedded_event(self, event):
+        """Map one embedded event to the same fields the card extractor produces"""
+        start = self._parse_iso(event.get("startAt") or event.get("startDate") or event.get("start_date"))
+        end = self._parse_iso(event.get("endAt") or event.get("endDate") or event.get("end_date"))
+        if start and end:
+            if (start.year, start.month) == (end.year, end.month):
+                period = f"{start.strftime('%b').upper()} {start.day} - {end.day}"
+            else:
+                period = f"{start.strftime('%b').upper()} {start.day} - {end.strftime('%b').upper()} {end.day}"
+        else:
+            period = "TBA"
+
+        status = "Finished" if end and end < datetime.now() else "Register"
+        description = event.get("shortDescription") or event.get("description") or ""
+        participants = event.get("participantsCount") or event.get("participants") or 0
+        if isinstance(participants, list):
+            participants = len(participants)
+        image = event.get("imageUrl") or event.get("image") or event.get("coverImage")
+        if isinstance(image, dict):
+            image = image.get("url") or image.get("src")
+
+        data = {
+            'title': (event.get("name") or event.get("title") or "").strip(),
+            'link': normalize_link(f"{self.EVENTS_URL}/{event['slug']}"),
+            'status': status,
+            'location': event.get("type") or "Online",
+            'submission_period': period,
+            'start_date': start,
+            'end_date': end,
+            'participants': int(participants) if str(participants).isdigit() else 0,
+            'description': description.strip() if isinstance(description, str) else "",
+            'image_url': image if isinstance(image, str) else None,
+        }
+        data['prize_amount'] = self.extract_prize(data['description'])
+        data['prize_usd'] = parse_prize_usd(data['prize_amount'])
+        data['themes'] = self.extract_themes(data['description'])
+        data['days_left'] = self.calculate_days_left(data['status'], data['end_date'])
+        return data
+
+    def scrape_with_browser(self):
+        """Scrape hackathon cards from the rendered lablab.ai page"""
+        url = self.EVENTS_URL
         print(f"Accessing {url}...")
         
-        self.driver.get(url)
-        time.sleep(3)
+        with stage("lablab", "page_load"):
+            loaded = browser_get(self.driver, url, ".card-animation")
+        if not loaded:
+            print("Error loading page: no event cards before the timeout")
+            return []
         
         hackathons = []
         
         try:
-            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "card-animation")))
-            cards = self.driver.find_elements(By.CSS_SELECTOR, ".card-animation.card-border")
-            
-            print(f"Found {len(cards)} hackathons")
+            hackathons = self.parse_cards(self.driver.page_source)
             
-            for index, card in enumerate(cards, 1):
-                try:
-                    hackathon_data = self.extract_hackathon_data(card)
-                    if hackathon_data:
-                        hackathons.append(hackathon_data)
-                        print(f"✓ Scraped: {hackathon_data['title']}")
-                except Exception as e:
-                    print(f"✗ Error scraping card {index}: {str(e)}")
-                    continue
+            print(f"Found {len(hackathons)} hackathons")
+            for hackathon_data in hackathons:
+                print(f"✓ Scraped: {hackathon_data['title']}")
                     
         except Exception as e:
             print(f"Error loading page: {str(e)}")
         
         return hackathons
     
+    def parse_cards(self, page_source):
+        """Extract every hackathon card from an HTML snapshot of the listing page"""
+        with stage("lablab", "extract"):
+            doc = dom.parse(page_source, self.EVENTS_URL)
+            hackathons = []
+            for card in dom.select(doc, ".card-animation.card-border"):
+                hackathon_data = self.extract_hackathon_data(card)
+                if hackathon_data:
+                    hackathons.append(hackathon_data)
+        return hackathons
+
     def extract_hackathon_data(self, card):
-        """Extract data from a single hackathon card"""
-        data = {}
-        
-        try:
-            # Title
-            title_elem = card.find_element(By.CSS_SELECTOR, "h2.line-clamp-1")
-            data['title'] = title_elem.text.strip()
-            
-            # Link
-            link_elem = card.find_element(By.CSS_SELECTOR, "a")
-            data['link'] = link_elem.get_attribute('href')
-            
-            # Status (Register/Finished)
-            try:
-                status_elem = card.find_element(By.CSS_SELECTOR, ".absolute.top-4.-left-8")
-                data['status'] = status_elem.text.strip()
-            except:
-                data['status'] = "Unknown"
-            
-            # Location (HACKATHON type badge)
-            try:
-                location_elem = card.find_element(By.CSS_SELECTOR, "span[title]")
-                data['location'] = location_elem.get_attribute('title')
-            except:
-                data['location'] = "Online"
-            
-            # Dates
-            try:
-                date_elem = card.find_element(By.CSS_SELECTOR, "time")
-                date_text = date_elem.text.strip()
-                data['submission_period'] = date_text
-                
-                # Parse dates
-                parsed_dates = self.parse_dates(date_text)
-                data['start_date'] = parsed_dates['start']
-                data['end_date'] = parsed_dates['end']
-            except:
-                data['submission_period'] = "TBA"
-                data['start_date'] = None
-                data['end_date'] = None
-            
-            # Participants count
-            try:
-                participants_elem = card.find_element(By.CSS_SELECTOR, "p.text-xs.font-semibold")
-                data['participants'] = int(participants_elem.text.strip())
-            except:
-                data['participants'] = 0
-            
-            # Description (includes prize info)
-            try:
-                desc_elem = card.find_element(By.CSS_SELECTOR, "p.line-clamp-2")
-                data['description'] = desc_elem.text.strip()
-            except:
-                data['description'] = ""
-            
-            # Image URL
-            try:
-                img_elem = card.find_element(By.CSS_SELECTOR, "img")
-                data['image_url'] = img_elem.get_attribute('src')
-            except:
-                data['image_url'] = None
-            
-            # Extract prize amount from description
-            data['prize_amount'] = self.extract_prize(data.get('description', ''))
-            
-            # Extract themes from description
-            data['themes'] = self.extract_themes(data.get('description', ''))
-            
-            # Calculate days left
-            data['days_left'] = self.calculate_days_left(data['status'], data['end_date'])
-            
-            return data
-            
-        except Exception as e:
-            print(f"Error extracting data: {str(e)}")
+        """Extract data from a single parsed hackathon card"""
+        data = {
+            'title': dom.text(card, "h2.line-clamp-1"),
+            'link': normalize_link(dom.attr(card, "a", "href")),
+        }
+        if not data['title'] or not data['link']:
             return None
+
+        # Status (Register/Finished)
+        data['status'] = dom.text(card, ".absolute.top-4.-left-8", "Unknown")
+
+        # Location (HACKATHON type badge)
+        data['location'] = dom.attr(card, "span[title]", "title", "Online")
+
+        # Dates
+        date_text = dom.text(card, "time")
+        if date_text:
+            data['submission_period'] = date_text
+            parsed_dates = self.parse_dates(date_text, data['status'])
+            data['start_date'] = parsed_dates['start']
+            data['end_date'] = parsed_dates['end']
+        else:
+            data['submission_period'] = "TBA"
+            data['start_date'] = None
+            data['end_date'] = None
+
+        # Participants count
+        participants = dom.text(card, "p.text-xs.font-semibold", "")
+        data['participants'] = int(participants) if participants.isdigit() else 0
+
+        # Description (includes prize info)
+        data['description'] = dom.text(card, "p.line-clamp-2", "")
+
+        # Image URL
+        data['image_url'] = dom.attr(card, "img", "src")
+
+        # Extract prize amount from description, and its value in USD
+        data['prize_amount'] = self.extract_prize(data['description'])
+        data['prize_usd'] = parse_prize_usd(data['prize_amount'])
+
+        # Extract themes from description
+        data['themes'] = self.extract_themes(data['description'])
+
+        # Calculate days left
+        data['days_left'] = self.calculate_days_left(data['status'], data['end_date'])
+
+        return data
     
-    def parse_dates(self, date_string):
-        """Parse date string like 'NOV 14 - 19' to datetime objects"""
-        result = {'start': None, 'end': None}
-        
-        try:
-            # Pattern: "NOV 14 - 19" or "DEC 5 - 7"
-            pattern = r'([A-Z]{3})\s+(\d{1,2})\s*-\s*(\d{1,2})'
-            match = re.search(pattern, date_string.upper())
-            
-            if match:
-                month_str = match.group(1)
-                start_day = int(match.group(2))
-                end_day = int(match.group(3))
-                
-                # Convert month abbreviation to number
-                months = {
-                    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-                    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-                }
-                month = months.get(month_str)
-                
-                if month:
-                    current_year = datetime.now().year
-                    # If month has passed, assume next year
-                    if month < datetime.now().month:
-                        current_year += 1
-                    
-                    result['start'] = datetime(current_year, month, start_day)
-                    result['end'] = datetime(current_year, month, end_day)
-        except Exception as e:
-            print(f"Date parsing error: {str(e)}")
-        
-        return result
+    def parse_dates(self, date_string, status=None):
+        """Parse date string like 'NOV 14 - 19' or 'JAN 30 - FEB 2' to datetime objects"""
+        start, end = parse_period(date_string, label=status)
+        return {'start': start, 'end': end}
     
     def extract_prize(self, description):
         """Extract prize amount from description"""
@@ -259,77 +317,26 @@ class LablabScraper:
         print(f"\n✓ Saved {len(hackathons)} hackathons to {filename}")
     
     def save_to_database(self, hackathons):
-        """Save hackathons to MySQL database"""
-        db: Session = SessionLocal()
-        saved_count = 0
-        updated_count = 0
-        
-        try:
-            for hack_data in hackathons:
-                try:
-                    # Check if hackathon already exists
-                    existing = db.query(LablabHackathon).filter(
-                        LablabHackathon.link == hack_data['link']
-                    ).first()
-                    
-                    if existing:
-                        # Update existing record
-                        existing.title = hack_data.get('title', '')[:500]
-                        existing.status = hack_data.get('status', '')[:50]
-                        existing.location = hack_data.get('location', '')[:200]
-                        existing.submission_period = hack_data.get('submission_period', '')[:200]
-                        existing.prize_amount = hack_data.get('prize_amount', '')[:100] if hack_data.get('prize_amount') else None
-                        existing.participants = hack_data.get('participants', 0)
-                        existing.themes = hack_data.get('themes', '')
-                        existing.days_left = hack_data.get('days_left', '')[:50]
-                        existing.start_date = hack_data.get('start_date')
-                        existing.end_date = hack_data.get('end_date')
-                        existing.image_url = hack_data.get('image_url', '')[:500] if hack_data.get('image_url') else None
-                        
-                        db.commit()
-                        updated_count += 1
-                        print(f"↻ Updated: {hack_data['title']}")
-                    else:
-                        # Create new hackathon entry
-                        hackathon = LablabHackathon(
-                            title=hack_data.get('title', '')[:500],
-                            link=hack_data.get('link', '')[:500],
-                            status=hack_data.get('status', '')[:50],
-                            location=hack_data.get('location', '')[:200],
-                            submission_period=hack_data.get('submission_period', '')[:200],
-                            prize_amount=hack_data.get('prize_amount', '')[:100] if hack_data.get('prize_amount') else None,
-                            participants=hack_data.get('participants', 0),
-                            themes=hack_data.get('themes', ''),
-                            days_left=hack_data.get('days_left', '')[:50],
-                            start_date=hack_data.get('start_date'),
-                            end_date=hack_data.get('end_date'),
-                            image_url=hack_data.get('image_url', '')[:500] if hack_data.get('image_url') else None
-                        )
-                        
-                        db.add(hackathon)
-                        db.commit()
-                        saved_count += 1
-                        print(f"✓ Saved to DB: {hack_data['title']}")
-                    
-                except IntegrityError as e:
-                    db.rollback()
-                    print(f"⚠ Duplicate entry skipped: {hack_data['title']}")
-                except Exception as e:
-                    db.rollback()
-                    print(f"✗ Error saving to DB: {str(e)}")
-                    continue
-            
-            print(f"\n✓ Database Summary:")
-            print(f"  • New records: {saved_count}")
-            print(f"  • Updated records: {updated_count}")
-            print(f"  • Total processed: {saved_count + updated_count}")
-            
-        finally:
-            db.close()
+        """Upsert hackathons into the lablab_hackathons table"""
+        if self.tracker is not None:
+            hackathons = self.tracker.filter_changed(hackathons)
+        with stage("lablab", "db_write"):
+            result = save_rows(LablabHackathon, hackathons)
+        if self.tracker is not None:
+            self.tracker.save()
+            print(f"\n✓ Change detection: {self.tracker.summary()}")
+
+        print(f"\n✓ Database Summary:")
+        print(f"  • New records: {result.created}")
+        print(f"  • Updated records: {result.updated}")
+        print(f"  • Unchanged records: {result.unchanged}")
+        return result
     
     def close(self):
-        """Close the browser"""
-        self.driver.quit()
+        """Hand the browser back to the pool, if one was used"""
+        if self._driver is not None:
+            self.pool.release(self._driver)
+            self._driver = None
 
 
 def main():
@@ -0,0 +1,155 @@
+"""
+HTTP fetch backends for scrapers that can skip the browser.
+
+`HttpFetcher` is an async client with connection pooling, HTTP/2 (when the
+`h2` package is installed) and gzip/brotli decoding. `RecordingFetcher`
+also writes every response under a fixtures directory, and `FixtureFetcher`
+replays those files without touching the network, so a scrape can be
+reproduced offline. `get_fetcher()` picks one from SCRAPER_FETCH_MODE
+(live, record or replay) and SCRAPER_FIXTURES_DIR.
+
+Live requests go through the per-domain scheduler in `scrapers.rate_limit`:
+they wait for their domain's token bucket and retry 429/5xx responses and
+transport errors with jittered exponential backoff.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+from scrapers.driver_pool import USER_AGENT
+from scrapers.rate_limit import MAX_RETRIES, RETRY_STATUSES, parse_retry_after, scheduler
+
+FIXTURES_DIR = Path(os.getenv(
+    "SCRAPER_FIXTURES_DIR", Path(__file__).parent / "fixtures"
+))
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class FetchError(Exception):
+    """The page could not be fetched over HTTP; callers fall back to the browser."""
+
+
+def _full_url(url: str, params=None) -> str:
+    if not params:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{urlencode(params, doseq=True)}"
+
+
+def fixture_path(url: str, params=None, directory: Path = FIXTURES_DIR) -> Path:
+    """File a response for `url` is recorded to / replayed from."""
+    full = _full_url(url, params)
+    parts = urlsplit(full)
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", f"{parts.netloc}{parts.path}").strip("_")[:80]
+    digest = hashlib.sha1(full.encode()).hexdigest()[:10]
+    return Path(directory) / f"{slug}_{digest}.txt"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpFetcher:
+    def __init__(self, timeout=20.0, max_connections=10, headers=None, retries=MAX_RETRIES, scheduler=scheduler):
+        self.retries = retries
+        self.scheduler = scheduler
+        self.client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=timeout,
+            follow_redirects=True,
+            headers={**DEFAULT_HEADERS, **(headers or {})},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def get_text(self, url: str, params=None) -> str:
+        for attempt in range(self.retries + 1):
+            await self.scheduler.acquire_async(url)
+            started = time.monotonic()
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TransportError as e:
+                self.scheduler.record(url, "error", time.monotonic() - started, attempt=attempt)
+                if attempt == self.retries:
+                    raise FetchError(f"GET {url} failed: {e}") from e
+                continue
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.scheduler.record(url, response.status_code, time.monotonic() - started, retry_after, attempt)
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                # record() paused the domain for the backoff; acquire_async() waits it out
+                continue
+            try:
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise FetchError(f"GET {url} failed: {e}") from e
+            return response.text
+
+    async def get_json(self, url: str, params=None):
+        text = await self.get_text(url, params)
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            raise FetchError(f"GET {url} did not return JSON") from e
+
+    async def get_many(self, urls, params=None, as_json=False):
+        """Fetch several URLs concurrently over the shared connection pool."""
+        getter = self.get_json if as_json else self.get_text
+        return await asyncio.gather(*(getter(url, params) for url in urls))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class RecordingFetcher(HttpFetcher):
+    def __init__(self, directory: Path = FIXTURES_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+
+    async def get_text(self, url: str, params=None) -> str:
+        text = await super().get_text(url, params)
+        path = fixture_path(url, params, self.directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return text
+
+
+class FixtureFetcher:
+    """Replays responses saved by RecordingFetcher; never opens a connection."""
+
+    def __init__(self, directory: Path = FIXTURES_DIR):
+        self.directory = Path(directory)
+
+    async def get_text(self, url: str, params=None) -> str:
+        path = fixture_path(url, params, self.directory)
+        if not path.exists():
+            raise FetchError(f"No recorded response for {_full_url(url, params)} ({path.name})")
+        return path.read_text(encoding="utf-8")
+
+    get_json = HttpFetcher.get_json
+    get_many = HttpFetcher.get_many
+
+    async def aclose(self):
+        pass
+
+
+def get_fetcher(mode: str | None = None):
+    mode = mode or os.getenv("SCRAPER_FETCH_MODE", "live")
+    if mode == "replay":
+        return FixtureFetcher()
+    if mode == "record":
+        return RecordingFetcher()
+    return HttpFetcher()
@@ -0,0 +1,354 @@
+"""
+Write-behind queue between the scrapers and the database.
+
+With INGEST_MODE=queue, `save_rows` appends rows to a local SQLite file
+(WAL, synchronous=FULL) and returns at once; a writer thread drains the
+file into the database in batches of INGEST_BATCH_SIZE through
+`bulk_upsert`, so the browser never waits on MySQL. A batch that fails
+stays in the file and is retried with exponential backoff, so a database
+outage delays rows instead of losing them. Rows for one item are written
+in the order they were queued: while an earlier row for the same link is
+backing off or being written, later ones wait for it. Whatever a scrape leaves behind
+is drained by the runner when all sources are done, by the next scrape, or
+by `python -m scrapers.ingest_queue`.
+
+The default INGEST_MODE=direct writes synchronously, as before.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+# add backend/ to sys.path
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from database.upsert import UpsertResult, bulk_upsert
+from metrics import counter, gauge
+
+MODE = os.getenv("INGEST_MODE", "direct")
+QUEUE_PATH = Path(os.getenv("INGEST_QUEUE_PATH", Path(__file__).parent / ".ingest_queue.sqlite3"))
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "2000"))
+# How often the writer looks for new rows when the queue is empty
+POLL_INTERVAL = float(os.getenv("INGEST_POLL_SECONDS", "1"))
+RETRY_BASE = float(os.getenv("INGEST_RETRY_BASE", "2"))
+RETRY_CAP = float(os.getenv("INGEST_RETRY_CAP", "300"))
+# A claimed batch whose writer died is handed out again after this long
+LEASE_SECONDS = 600
+# How long a finishing scrape waits for the writer before leaving rows queued
+FLUSH_TIMEOUT = float(os.getenv("INGEST_FLUSH_TIMEOUT", "60"))
+
+ENQUEUED = counter("ingest_queue_enqueued_total", "Rows appended to the ingest queue", ("table",))
+WRITTEN = counter("ingest_queue_written_total", "Queued rows written to the database", ("table",))
+FAILED_BATCHES = counter("ingest_queue_failed_batches_total", "Queue batches whose write failed", ("table",))
+PENDING = gauge("ingest_queue_pending", "Rows waiting in the ingest queue")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    item_key TEXT,
+    insert_only TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+ITEM_KEY_INDEX = "CREATE INDEX IF NOT EXISTS records_item_key ON records (table_name, item_key, id)"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot queue {type(value).__name__}")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def retry_delay(attempts: int, base: float = RETRY_BASE, cap: float = RETRY_CAP) -> float:
+    return min(cap, base * 2 ** max(0, attempts - 1))
+
+
+def _models() -> dict:
+    from database.db import Base
+
+    return {mapper.class_.__tablename__: mapper.class_ for mapper in Base.registry.mappers}
+
+
+class IngestQueue:
+    """The queue file; safe to share between threads and processes."""
+
+    def __init__(self, path: Path = QUEUE_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if "item_key" not in columns:
+                # Queue files from before per-item ordering; their rows are not ordered
+                conn.execute("ALTER TABLE records ADD COLUMN item_key TEXT")
+            conn.execute(ITEM_KEY_INDEX)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction; the queue connection itself is in autocommit mode."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def put(self, table_name: str, rows, key: str = "link", insert_only=("scraped_at",)) -> int:
+        """Append `rows` (dicts) for `table_name`; durable once this returns."""
+        now = time.time()
+        options = json.dumps(list(insert_only))
+        records = [
+            (table_name, key, None if row.get(key) is None else str(row[key]), options,
+             json.dumps(row, default=_encode, ensure_ascii=False), now)
+            for row in rows
+        ]
+        if not records:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO records (table_name, key, item_key, insert_only, payload, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+        ENQUEUED.inc(len(records), table=table_name)
+        return len(records)
+
+    def claim(self, limit: int = BATCH_SIZE, lease: float = LEASE_SECONDS) -> list:
+        """
+        Take the oldest due rows for one writer: `[(id, table, key,
+        insert_only, row, attempts)]`. A row waits while an earlier row for
+        the same item is backing off or claimed, so it cannot overtake it.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, table_name, key, insert_only, payload, attempts FROM records AS r"
+                " WHERE next_attempt_at <= ? AND claimed_until <= ?"
+                " AND NOT EXISTS (SELECT 1 FROM records AS e"
+                "  WHERE e.table_name = r.table_name AND e.item_key = r.item_key AND e.id < r.id"
+                "  AND (e.next_attempt_at > ? OR e.claimed_until > ?))"
+                " ORDER BY id LIMIT ?",
+                (now, now, now, now, limit),
+            ).fetchall()
+            conn.executemany("UPDATE records SET claimed_until = ? WHERE id = ?", [(now + lease, r[0]) for r in rows])
+        return [
+            (id_, table, key, tuple(json.loads(options)), json.loads(payload, object_hook=_decode), attempts)
+            for id_, table, key, options, payload, attempts in rows
+        ]
+
+    def ack(self, ids):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM records WHERE id = ?", [(i,) for i in ids])
+
+    def fail(self, ids, attempts: int, error: str):
+        """Give a failed batch back, due again after a backoff."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE records SET attempts = ?, next_attempt_at = ?, claimed_until = 0, last_error = ? WHERE id = ?",
+                [(attempts, time.time() + retry_delay(attempts), error[:500], i) for i in ids],
+            )
+
+    def pending(self) -> int:
+        count = self._connect().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        PENDING.set(count)
+        return count
+
+    def stats(self) -> dict:
+        rows = self._connect().execute(
+            "SELECT table_name, COUNT(*), MAX(attempts), MIN(enqueued_at) FROM records GROUP BY table_name"
+        ).fetchall()
+        now = time.time()
+        return {
+            table: {"pending": count, "max_attempts": attempts, "oldest_seconds": round(now - oldest, 1)}
+            for table, count, attempts, oldest in rows
+        }
+
+    def drain(self, batch_size: int = BATCH_SIZE, max_batches: int | None = None) -> UpsertResult:
+        """
+        Write due rows to the database, one batch at a time, until the queue
+        has nothing due or a batch fails (the database is probably down, so
+        the rest waits for the retry).
+        """
+        result = UpsertResult()
+        models = None
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed = self.claim(batch_size)
+            if not claimed:
+                break
+            batches += 1
+            models = models or _models()
+            groups = {}
+            for id_, table, key, insert_only, row, attempts in claimed:
+                groups.setdefault((table, key, insert_only), []).append((id_, row, attempts))
+            for (table, key, insert_only), records in groups.items():
+                ids = [r[0] for r in records]
+                try:
+                    result += bulk_upsert(models[table], [r[1] for r in records], key=key, insert_only=insert_only)
+                except Exception as e:
+                    attempts = max(r[2] for r in records) + 1
+                    self.fail(ids, attempts, f"{type(e).__name__}: {e}")
+                    FAILED_BATCHES.inc(table=table)
+                    print(f"⚠️ Ingest batch of {len(ids)} {table} rows failed (attempt {attempts}), "
+                          f"retrying in {retry_delay(attempts):.0f}s: {str(e).splitlines()[0]}")
+                    # Give back the rest of the batch so it is not held for the lease
+                    failed = set(ids)
+                    with self._transaction() as conn:
+                        conn.executemany(
+                            "UPDATE records SET claimed_until = 0 WHERE id = ?",
+                            [(c[0],) for c in claimed if c[0] not in failed],
+                        )
+                    self.pending()
+                    return result
+                self.ack(ids)
+                WRITTEN.inc(len(ids), table=table)
+        self.pending()
+        return result
+
+
+class Writer(threading.Thread):
+    """Background thread draining the queue while a scrape runs."""
+
+    def __init__(self, queue: IngestQueue, interval: float = POLL_INTERVAL):
+        super().__init__(name="ingest-writer", daemon=True)
+        self.queue = queue
+        self.interval = interval
+        self.written = UpsertResult()
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                self.written += self.queue.drain()
+            except Exception as e:
+                print(f"⚠️ Ingest writer error: {e}")
+            if self._stopping.is_set():
+                return
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = FLUSH_TIMEOUT):
+        """Drain what is due one last time, waiting at most `timeout` seconds."""
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+
+_queue = None
+_writer = None
+_lock = threading.Lock()
+
+
+def get_queue() -> IngestQueue:
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = IngestQueue()
+        return _queue
+
+
+def _ensure_writer():
+    global _writer
+    with _lock:
+        if _writer is None or not _writer.is_alive():
+            if _writer is None:
+                atexit.register(close)
+            _writer = Writer(_queue)
+            _writer.start()
+        return _writer
+
+
+def save_rows(model, rows, key: str = "link", insert_only=("scraped_at",), mode: str | None = None) -> UpsertResult:
+    """
+    The scrapers' save step. In direct mode this is `bulk_upsert`; in queue
+    mode the rows are queued and the result only counts them as `queued`.
+    """
+    if (mode or MODE) != "queue":
+        return bulk_upsert(model, rows, key=key, insert_only=insert_only)
+    queued = get_queue().put(model.__tablename__, rows, key=key, insert_only=insert_only)
+    _ensure_writer().notify()
+    return UpsertResult(queued=queued)
+
+
+def close(timeout: float = FLUSH_TIMEOUT) -> int:
+    """Stop this process's writer after a last drain; returns the rows still queued."""
+    global _writer
+    with _lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return 0
+    writer.stop(timeout)
+    left = writer.queue.pending()
+    if left:
+        print(f"📦 {left} rows left in the ingest queue ({writer.queue.path}); they are written on the next drain")
+    return left
+
+
+def drain(batch_size: int = BATCH_SIZE) -> UpsertResult:
+    """Write everything due in the queue file, if there is one."""
+    if not QUEUE_PATH.exists():
+        return UpsertResult()
+    return get_queue().drain(batch_size)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Drain the scrapers' ingest queue into the database")
+    parser.add_argument("--watch", action="store_true", help="keep draining until interrupted")
+    parser.add_argument("--stats", action="store_true", help="show what is queued and exit")
+    args = parser.parse_args()
+
+    queue = get_queue()
+    if args.stats:
+        print(json.dumps(queue.stats(), indent=2))
+        sys.exit(0)
+    while True:
+        result = queue.drain()
+        if result.total:
+            print(f"✅ Drained: {result}")
+        if not args.watch:
+            print(f"{queue.pending()} rows still queued")
+            break
+        time.sleep(POLL_INTERVAL)
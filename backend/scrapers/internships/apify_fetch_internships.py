@@ -1,34 +1,178 @@
+"""
+Stream the Apify internships dataset into the database.
+
+A fetch thread pages through the dataset and appends every page to an
+NDJSON file; the main thread maps and upserts each page as it arrives, so
+ingest overlaps fetch and at most QUEUE_PAGES pages are held in memory
+whatever the dataset size. After a page is saved, its end offset and the
+NDJSON size are written to a checkpoint, and the next run resumes there
+(the file is cut back to that size first), so a nightly run only fetches
+what was appended to the dataset since. `--reset` starts over from item 0;
+`--fetch-only` writes the NDJSON without touching the database.
+"""
 import os
+import sys
 import json
-from apify_client import ApifyClient
+import queue
+import threading
+
+# add backend/ to sys.path
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from metrics import stage
 
 APIFY_TOKEN = os.getenv("APIFY_TOKEN")
 DATASET_ID = "Nv22CcCkUeJsMA4Kr"  # your dataset id
-OUTPUT_FILE = "apify_internships.json"
+OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "apify_internships.ndjson")
+CHECKPOINT_FILE = OUTPUT_FILE + ".checkpoint"
+PAGE_SIZE = int(os.getenv("APIFY_PAGE_SIZE", "1000"))
+QUEUE_PAGES = 4
 
 
-def fetch_internships():
+def get_dataset():
+    from apify_client import ApifyClient
+
     if not APIFY_TOKEN:
         raise RuntimeError(
             "APIFY_TOKEN is not set. In PowerShell run:\n"
             '$env:APIFY_TOKEN = "apify_api_...your_token..."'
         )
+    return ApifyClient(APIFY_TOKEN).dataset(DATASET_ID)
+
+
+def iter_pages(dataset, offset=0, page_size=PAGE_SIZE):
+    """Yield `(end_offset, items)` for each page of the dataset from `offset`."""
+    while True:
+        with stage("internships", "page_load"):
+            page = dataset.list_items(offset=offset, limit=page_size)
+        if not page.items:
+            return
+        offset += len(page.items)
+        yield offset, page.items
+
+
+# -------- Checkpoint --------
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """`{"offset": items saved, "bytes": NDJSON size at that point}` of the last run."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return {"offset": 0, "bytes": 0}
+    if checkpoint.get("dataset_id") != DATASET_ID:
+        return {"offset": 0, "bytes": 0}
+    return checkpoint
+
+
+def save_checkpoint(offset, size, path=CHECKPOINT_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"dataset_id": DATASET_ID, "offset": offset, "bytes": size}, f)
+    os.replace(tmp, path)
 
-    client = ApifyClient(APIFY_TOKEN)
-    dataset = client.dataset(DATASET_ID)
 
-    items = list(dataset.iterate_items())
-    print(f"Fetched {len(items)} items from dataset {DATASET_ID}")
-    return items
+def reset(output=OUTPUT_FILE, checkpoint=CHECKPOINT_FILE):
+    """Forget the previous run; the next one starts at offset 0."""
+    for path in (output, checkpoint):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# -------- Pipeline --------
+
+def _put(pages, item, stop) -> bool:
+    """Block while the consumer is QUEUE_PAGES behind; False once it has stopped."""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch(dataset, offset, output, pages, stop):
+    """Producer: append each page to `output` and hand it to the consumer."""
+    try:
+        for end, items in iter_pages(dataset, offset):
+            output.write(b"".join(json.dumps(item, ensure_ascii=False).encode() + b"\n" for item in items))
+            output.flush()
+            if not _put(pages, (end, output.tell(), items), stop):
+                return
+        _put(pages, None, stop)
+    except Exception as e:
+        _put(pages, e, stop)
+
+
+def stream_dataset(save_page=None, dataset=None, output_path=OUTPUT_FILE, checkpoint_path=CHECKPOINT_FILE):
+    """
+    Fetch the dataset from the last checkpoint into `output_path`, calling
+    `save_page(items)` for every page while the next ones download. Returns
+    the number of items handled in this run.
+    """
+    dataset = dataset or get_dataset()
+    start = load_checkpoint(checkpoint_path)
+    size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+    if size < start["bytes"]:
+        # Cutting the file "back" past its end would pad it with NULs
+        print(f"⚠️  {output_path} is shorter than the checkpoint says, starting over")
+        start = {"offset": 0, "bytes": 0}
+    if start["offset"]:
+        print(f"↻  Resuming at item {start['offset']}")
+
+    handled = 0
+    with open(output_path, "ab+") as output:
+        # Drop lines written after the last checkpoint; they are fetched again
+        output.truncate(start["bytes"])
+        output.seek(start["bytes"])
+
+        pages = queue.Queue(maxsize=QUEUE_PAGES)
+        stop = threading.Event()
+        fetcher = threading.Thread(
+            target=_fetch, args=(dataset, start["offset"], output, pages, stop),
+            name="apify-fetch", daemon=True,
+        )
+        fetcher.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is None:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                end, size, items = page
+                if save_page is not None:
+                    save_page(items)
+                save_checkpoint(end, size, checkpoint_path)
+                handled += len(items)
+                print(f"📥 {end} items ingested")
+        finally:
+            stop.set()
+            fetcher.join()
+    return handled
+
 
+def ingest(incremental=None):
+    """Stream the dataset into student_internships."""
+    from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+    from scrapers.internships.indeed_scraper import save_to_db
 
-def save_to_json(items):
-    """Save list of dicts to a local JSON file."""
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-    print(f"Saved {len(items)} items to {OUTPUT_FILE}")
+    incremental = INCREMENTAL if incremental is None else incremental
+    tracker = FingerprintTracker("indeed", batched=True) if incremental else None
+    total = stream_dataset(save_page=lambda items: save_to_db(items, incremental, tracker))
+    if tracker is not None:
+        print(f"Change detection: {tracker.summary()}")
+    print(f"✅ Ingested {total} items from dataset {DATASET_ID}")
+    return total
 
 
 if __name__ == "__main__":
-    data = fetch_internships()
-    save_to_json(data)
+    if "--reset" in sys.argv:
+        reset()
+    if "--fetch-only" in sys.argv:
+        print(f"Fetched {stream_dataset()} items to {OUTPUT_FILE}")
+    else:
+        ingest()
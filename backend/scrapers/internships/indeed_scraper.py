@@ -10,19 +10,40 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from database.db import SessionLocal
 from database.models import Internship
+from database.upsert import UpsertResult
+from metrics import stage
+from scrapers.fingerprints import INCREMENTAL, FingerprintTracker
+from scrapers.ingest_queue import save_rows
+from scrapers.links import normalize_link
 
 
+NDJSON_FILE = "apify_internships.ndjson"
 JSON_FILE = "apify_internships.json"
+BATCH_SIZE = 1000
 
 
-def load_items():
-    """Load all items from the local JSON file."""
+def iter_items():
+    """
+    Yield items one at a time from the NDJSON written by
+    apify_fetch_internships, or from the older JSON array file.
+    """
+    path = os.path.join(os.path.dirname(__file__), NDJSON_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
     path = os.path.join(os.path.dirname(__file__), JSON_FILE)
     with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    print(f"Loaded {len(data)} items from {JSON_FILE}")
+        yield from json.load(f)
+
+
+def load_items():
+    """Load all items from the local NDJSON / JSON file."""
+    data = list(iter_items())
+    print(f"Loaded {len(data)} items")
     return data
 
 
@@ -51,71 +72,61 @@ def map_item(item: dict) -> dict:
         "company": company.strip(),
         "location": location.strip(),
         "description": description.strip(),
-        "link": link.strip(),
+        "link": normalize_link(link),
         "is_remote": is_remote,
     }
 
 
-def save_to_db(raw_items):
-    """Insert/update rows in student_internships."""
-    from sqlalchemy.orm import Session
-    from sqlalchemy.exc import IntegrityError
+def _batches(raw_items, size):
+    batch = []
+    for raw in raw_items:
+        batch.append(raw)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-    db: Session = SessionLocal()
-    created, updated = 0, 0
 
-    try:
-        for raw in raw_items:
+def save_to_db(raw_items, incremental=INCREMENTAL, tracker=None, batch_size=BATCH_SIZE):
+    """
+    Upsert rows into student_internships in bulk, keyed on link.
+
+    `raw_items` may be any iterable; it is mapped and written `batch_size`
+    items at a time, and the fingerprints of each batch are looked up
+    before and saved after its write. Pass a batched `tracker` to share one
+    across several calls; its summary is then the caller's to print.
+    """
+    owns_tracker = tracker is None and incremental
+    if owns_tracker:
+        tracker = FingerprintTracker("indeed", batched=True)
+    now = datetime.utcnow()
+    result = UpsertResult()
+    for batch in _batches(raw_items, batch_size):
+        rows = []
+        for raw in batch:
             data = map_item(raw)
 
             # skip if no title or link
             if not data["title"] or not data["link"]:
                 continue
 
-            try:
-                existing = db.query(Internship).filter_by(link=data["link"]).first()
-
-                if existing:
-                    # update existing row
-                    existing.title = data["title"][:500]
-                    existing.company = data["company"][:300]
-                    existing.location = data["location"][:200]
-                    existing.description = data["description"]
-                    existing.is_remote = data["is_remote"]
-                    existing.student_focus = True
-                    updated += 1
-                else:
-                    # create new row
-                    obj = Internship(
-                        title=data["title"][:500],
-                        company=data["company"][:300],
-                        location=data["location"][:200],
-                        is_remote=data["is_remote"],
-                        description=data["description"],
-                        link=data["link"][:500],
-                        student_focus=True,
-                        scraped_at=datetime.utcnow(),
-                    )
-                    db.add(obj)
-                    created += 1
-
-                db.commit()
-            except IntegrityError:
-                db.rollback()
-                continue
-            except Exception as e:
-                db.rollback()
-                print("Row error:", e)
-                continue
-    finally:
-        db.close()
+            rows.append({**data, "student_focus": True, "scraped_at": now})
 
-    print(f"DB saved. New: {created}, Updated: {updated}")
+        if tracker is not None:
+            rows = tracker.filter_changed(rows)
+        with stage("internships", "db_write"):
+            result += save_rows(Internship, rows)
+        if tracker is not None:
+            tracker.save()
+    if owns_tracker:
+        print(f"Change detection: {tracker.summary()}")
+    print(f"DB saved. {result}")
+    return result
 
 
 def main():
-    items = load_items()
-    save_to_db(items)
+    save_to_db(iter_items())
 
 
 if __name__ == "__main__":
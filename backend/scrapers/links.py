@@ -0,0 +1,56 @@
+"""
+Link normalization for deduplicating scraped items.
+
+The same course or hackathon is often reachable under several URLs: with
+and without `www.`, a trailing slash, a fragment or tracking parameters.
+`normalize_link` maps those to one key, and the scrapers store that key as
+the item's `link`, so the variants are one row (and one fingerprint) in the
+database too. `dedupe` keeps the first item per key, checking a set so the
+cost per item does not grow with the number already seen.
+"""
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({
+    "ref", "ref_", "referrer", "src", "source", "fbclid", "gclid", "mc_cid", "mc_eid",
+    "couponcode", "referralcode", "trk", "trackingid",
+})
+# Devpost adds ref_feature / ref_medium / ref_content to its listing links
+TRACKING_PREFIXES = ("utm_", "ref_")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_link(url: str) -> str:
+    """Comparison key for `url`: lower-case host without www, no fragment, tracking or trailing slash."""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    # One spelling of percent-escapes: %7E and ~, %c3%a9 and %C3%A9 are the same path
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=-._~").rstrip("/") or "/"
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(name)
+    ))
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, query, ""))
+
+
+def dedupe(items, key: str = "link", seen: set | None = None) -> list:
+    """Items whose normalized `key` is not in `seen` (which is updated), first one wins."""
+    seen = set() if seen is None else seen
+    unique = []
+    for item in items:
+        link = normalize_link(item.get(key))
+        if not link or link in seen:
+            continue
+        seen.add(link)
+        unique.append(item)
+    return unique
@@ -0,0 +1,240 @@
+"""
+Per-domain request scheduling shared by the HTTP fetchers and the browser.
+
+Every request to a domain first takes a token from that domain's bucket.
+Buckets adapt: each successful response raises the rate a little, up to
+the domain's ceiling, and a 429 or 5xx halves it and pauses the domain
+(for Retry-After when the site sends one), so a scrape settles near the
+fastest rate a site tolerates. Retries back off exponentially with full
+jitter. Latency and status of every request are recorded per domain in
+`metrics`.
+
+Limits are `rate:max_rate` requests per second; defaults come from
+SCRAPE_RATE / SCRAPE_MAX_RATE and SCRAPE_RATE_LIMITS overrides them per
+domain, e.g. "devpost.com=2:8,udemy.com=0.5:2".
+
+Browser pages wait on readiness conditions (an element, the old page going
+stale, more cards after a scroll) instead of fixed sleeps: see
+`browser_get`, `click_and_wait` and `scroll_and_wait`.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from metrics import counter, gauge, histogram
+
+DEFAULT_RATE = float(os.getenv("SCRAPE_RATE", "1"))
+DEFAULT_MAX_RATE = float(os.getenv("SCRAPE_MAX_RATE", "4"))
+MIN_RATE = 0.05
+# Additive increase per successful request, as a share of the ceiling
+RATE_STEP = 0.05
+BACKOFF_BASE = float(os.getenv("SCRAPE_BACKOFF_BASE", "1"))
+BACKOFF_CAP = float(os.getenv("SCRAPE_BACKOFF_CAP", "60"))
+MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", "4"))
+PAGE_TIMEOUT = float(os.getenv("SCRAPE_PAGE_TIMEOUT", "15"))
+# How long a scroll waits for more cards before deciding the list has ended
+SCROLL_TIMEOUT = float(os.getenv("SCRAPE_SCROLL_TIMEOUT", "3"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Outcomes that slow a domain down: the retryable statuses, plus pages that
+# never became ready and connections that failed
+PUSHBACK = RETRY_STATUSES | {"timeout", "error"}
+
+REQUEST_SECONDS = histogram(
+    "scrape_request_duration_seconds", "Latency of scraper requests and page loads, by domain", ("domain",)
+)
+REQUESTS = counter("scrape_requests_total", "Scraper requests by domain and status", ("domain", "status"))
+RATE = gauge("scrape_rate_limit", "Current request rate allowed per domain (requests/second)", ("domain",))
+
+
+def _parse_limits(spec: str) -> dict:
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        domain, _, values = part.partition("=")
+        rate, _, max_rate = values.partition(":")
+        limits[domain.strip()] = (float(rate), float(max_rate or rate))
+    return limits
+
+
+DOMAIN_LIMITS = _parse_limits(os.getenv("SCRAPE_RATE_LIMITS", ""))
+
+
+def domain_of(url: str) -> str:
+    host = urlsplit(url).hostname or url
+    return host[4:] if host.startswith("www.") else host
+
+
+def retry_delay(attempt: int, retry_after: float | None = None,
+                base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Seconds before retry number `attempt` (0-based): Retry-After, else full-jitter backoff."""
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value) -> float | None:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket whose rate follows additive-increase / multiplicative-
+    decrease. `reserve()` hands out a slot and says how long to wait for
+    it, so concurrent callers queue up instead of racing.
+    """
+
+    def __init__(self, rate: float, max_rate: float, burst: float = 1.0, min_rate: float = MIN_RATE):
+        self.rate = rate
+        self.max_rate = max(max_rate, rate)
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_STEP)
+
+    def throttled(self, pause: float):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+
+class RequestScheduler:
+    """One adaptive bucket per domain; shared by everything in the process."""
+
+    def __init__(self, limits=None, rate: float = DEFAULT_RATE, max_rate: float = DEFAULT_MAX_RATE):
+        self.limits = DOMAIN_LIMITS if limits is None else limits
+        self.rate = rate
+        self.max_rate = max_rate
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        domain = domain_of(url)
+        with self._lock:
+            if domain not in self.buckets:
+                rate, max_rate = self.limits.get(domain, (self.rate, self.max_rate))
+                self.buckets[domain] = TokenBucket(rate, max_rate)
+            return self.buckets[domain]
+
+    def acquire(self, url: str):
+        """Block until a request to `url`'s domain is allowed."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, url: str, status, latency: float, retry_after: float | None = None, attempt: int = 0):
+        """
+        Feed one response back into the domain's rate. Returns the pause
+        before a retry when the site pushed back, else None.
+        """
+        domain = domain_of(url)
+        bucket = self.bucket(url)
+        REQUEST_SECONDS.observe(latency, domain=domain)
+        REQUESTS.inc(domain=domain, status=status)
+        if status in PUSHBACK:
+            pause = retry_delay(attempt, retry_after)
+            bucket.throttled(pause)
+            RATE.set(bucket.rate, domain=domain)
+            return pause
+        bucket.succeeded()
+        RATE.set(bucket.rate, domain=domain)
+        return None
+
+
+scheduler = RequestScheduler()
+
+
+# -------- Browser pages --------
+
+def _wait(driver, timeout):
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait(driver, timeout, poll_frequency=0.2)
+
+
+def browser_get(driver, url: str, ready_css: str | None = None, timeout: float = PAGE_TIMEOUT) -> bool:
+    """
+    Load `url` once its domain allows it and wait until `ready_css` matches
+    (or the document is complete). Returns False if the page never became
+    ready; that counts as a timeout and slows the domain down.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    scheduler.acquire(url)
+    started = time.monotonic()
+    driver.get(url)
+    try:
+        if ready_css:
+            _wait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, ready_css)))
+        else:
+            _wait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    except TimeoutException:
+        scheduler.record(url, "timeout", time.monotonic() - started)
+        return False
+    scheduler.record(url, 200, time.monotonic() - started)
+    return True
+
+
+def click_and_wait(driver, element, stale_css: str, ready_css: str, timeout: float = PAGE_TIMEOUT) -> bool:
+    """Click `element` (e.g. a "next" link) and wait for the new page's `ready_css`."""
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    url = driver.current_url
+    try:
+        old = driver.find_element(By.CSS_SELECTOR, stale_css)
+    except NoSuchElementException:
+        old = None
+    scheduler.acquire(url)
+    started = time.monotonic()
+    element.click()
+    try:
+        if old is not None:
+            _wait(driver, timeout).until(EC.staleness_of(old))
+        _wait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, ready_css)))
+    except TimeoutException:
+        scheduler.record(url, "timeout", time.monotonic() - started)
+        return False
+    scheduler.record(url, 200, time.monotonic() - started)
+    return True
+
+
+def scroll_and_wait(driver, css: str, timeout: float = SCROLL_TIMEOUT) -> bool:
+    """Scroll to the bottom and wait until more `css` elements load; False if none did."""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+
+    count = len(driver.find_elements(By.CSS_SELECTOR, css))
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    try:
+        _wait(driver, timeout).until(lambda d: len(d.find_elements(By.CSS_SELECTOR, css)) > count)
+    except TimeoutException:
+        return False
+    return True
@@ -0,0 +1,281 @@
+"""
+Concurrent scrape orchestrator.
+
+Every source runs in its own process so a hung browser can be killed
+without taking the others down. At most `max_workers` sources run at once;
+the default cap depends on CPU count and free memory, because each source
+drives its own Chrome.
+"""
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+# Add the backend directory to Python path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+import metrics
+
+# Rough resident size of one headless Chrome plus its scraper process
+MEMORY_PER_SOURCE_MB = int(os.getenv("SCRAPE_MEMORY_PER_SOURCE_MB", "600"))
+DEFAULT_TIMEOUT = int(os.getenv("SCRAPE_TIMEOUT_SECONDS", "900"))
+# What each source covers; its pages fan out over SCRAPER_DRIVER_POOL_SIZE browsers
+UDEMY_CATEGORIES = os.getenv("SCRAPE_UDEMY_CATEGORIES", ",development/,it-and-software/").split(",")
+UDEMY_PAGES = int(os.getenv("SCRAPE_UDEMY_PAGES", "2"))
+COURSERA_QUERIES = os.getenv("SCRAPE_COURSERA_QUERIES", "free,computer science,data science").split(",")
+COURSERA_PAGES = int(os.getenv("SCRAPE_COURSERA_PAGES", "1"))
+
+
+@dataclass
+class ScrapeResult:
+    source: str
+    ok: bool = False
+    items: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    queued: int = 0
+    duration: float = 0.0
+    errors: list = field(default_factory=list)
+    timed_out: bool = False
+
+    def as_dict(self):
+        return asdict(self)
+
+
+# -------- Sources --------
+# Each source is a top-level function (picklable for the process pool) that
+# imports its scraper lazily, so the parent process never loads Selenium.
+# It returns the number of items scraped and the UpsertResult of the save.
+
+def scrape_udemy():
+    from scrapers.courses.udemy_scraper import UdemyScraper
+    scraper = UdemyScraper()
+    try:
+        courses = scraper.scrape_courses(categories=UDEMY_CATEGORIES, max_pages=UDEMY_PAGES, free_only=False)
+        return len(courses), scraper.save_to_database()
+    finally:
+        scraper.close()
+
+
+def scrape_coursera():
+    from scrapers.courses.coursera_scraper import scrape_coursera_selenium, save_courses_to_db
+    courses = scrape_coursera_selenium(queries=COURSERA_QUERIES, pages=COURSERA_PAGES, max_courses=50)
+    return len(courses), save_courses_to_db(courses)
+
+
+def scrape_devpost():
+    from scrapers.hackathons.devpost_scraper import DevpostScraper
+    scraper = DevpostScraper(headless=True)
+    try:
+        hackathons = scraper.scrape_hackathons(max_pages=2)
+        scraper.save_to_json()
+        return len(hackathons), scraper.save_to_database()
+    finally:
+        scraper.close()
+
+
+def scrape_lablab():
+    from scrapers.hackathons.lablab_scraper import LablabScraper
+    scraper = LablabScraper()
+    try:
+        hackathons = scraper.scrape_hackathons()
+        scraper.save_to_json(hackathons)
+        return len(hackathons), scraper.save_to_database(hackathons)
+    finally:
+        scraper.close()
+
+
+SOURCES = {
+    "udemy": scrape_udemy,
+    "coursera": scrape_coursera,
+    "devpost": scrape_devpost,
+    "lablab": scrape_lablab,
+}
+
+
+# -------- Runner --------
+
+def _available_memory_mb():
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_max_workers(n_sources: int) -> int:
+    """Concurrency cap: SCRAPE_MAX_WORKERS if set, else bounded by CPUs and free memory."""
+    configured = os.getenv("SCRAPE_MAX_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    limit = os.cpu_count() or 1
+    memory = _available_memory_mb()
+    if memory is not None:
+        limit = min(limit, memory // MEMORY_PER_SOURCE_MB)
+    return max(1, min(limit, n_sources))
+
+
+def _run_source(name, func, results):
+    started = time.monotonic()
+    try:
+        items, saved = func()
+        counts = {"items": items}
+        if saved is not None:
+            # Items the change detection skipped never reach the upsert
+            counts.update(new=saved.created, changed=saved.updated, queued=saved.queued,
+                          unchanged=items - saved.created - saved.updated - saved.queued)
+        results.put((name, True, counts, time.monotonic() - started, []))
+    except Exception as e:
+        traceback.print_exc()
+        results.put((name, False, {}, time.monotonic() - started, [f"{type(e).__name__}: {e}"]))
+    finally:
+        # Rows still queued stay in the queue file for the parent's drain
+        from scrapers import ingest_queue
+        ingest_queue.close()
+        # Stage timings and upsert counts of this process, for the API's /metrics
+        metrics.flush()
+
+
+def _record(result: ScrapeResult):
+    metrics.SCRAPE_SECONDS.observe(result.duration, source=result.source)
+    if result.ok:
+        metrics.ITEMS_SCRAPED.inc(result.items, source=result.source)
+        metrics.SCRAPE_LAST_SUCCESS.set(time.time(), source=result.source)
+    else:
+        reason = "timeout" if result.timed_out else "error"
+        metrics.SCRAPE_FAILURES.inc(source=result.source, reason=reason)
+
+
+def _drain(results_queue, results, wait_for=None, wait_seconds=1.0):
+    """Move finished results off the queue, optionally waiting briefly for `wait_for`."""
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        try:
+            name, ok, counts, duration, errors = results_queue.get(
+                timeout=max(0.0, deadline - time.monotonic()) if wait_for else None,
+                block=bool(wait_for),
+            )
+        except queue.Empty:
+            return
+        results[name] = ScrapeResult(name, ok, duration=round(duration, 2), errors=errors, **counts)
+        if wait_for and wait_for in results:
+            return
+
+
+def source_timeout(name: str, timeout=DEFAULT_TIMEOUT) -> float:
+    """Per-source limit: SCRAPE_TIMEOUT_<SOURCE> overrides `timeout` (a number or a dict by source)."""
+    configured = os.getenv(f"SCRAPE_TIMEOUT_{name.upper()}")
+    if configured:
+        return float(configured)
+    if isinstance(timeout, dict):
+        return float(timeout.get(name, DEFAULT_TIMEOUT))
+    return float(timeout)
+
+
+def run_sources(sources=None, max_workers=None, timeout=DEFAULT_TIMEOUT, poll_interval=0.5):
+    """
+    Run `sources` (names from SOURCES, default all) in parallel processes and
+    return one ScrapeResult per source, in the order requested. A source
+    that exceeds its timeout (see `source_timeout`) is terminated and
+    reported as timed out.
+    """
+    names = list(sources or SOURCES)
+    max_workers = max_workers or default_max_workers(len(names))
+    ctx = mp.get_context("spawn")
+    results_queue = ctx.Queue()
+    pending = list(names)
+    running = {}
+    results = {}
+
+    print(f"🚀 Scraping {len(names)} sources with up to {max_workers} workers at {datetime.now()}")
+    while pending or running:
+        while pending and len(running) < max_workers:
+            name = pending.pop(0)
+            process = ctx.Process(
+                target=_run_source, args=(name, SOURCES[name], results_queue), name=f"scrape-{name}"
+            )
+            process.start()
+            running[name] = (process, time.monotonic())
+
+        _drain(results_queue, results)
+
+        for name, (process, started) in list(running.items()):
+            elapsed = time.monotonic() - started
+            if not process.is_alive():
+                process.join()
+                # The result may still be in flight if the child exited just now
+                _drain(results_queue, results, wait_for=name)
+                if name not in results:
+                    results[name] = ScrapeResult(
+                        name, duration=round(elapsed, 2),
+                        errors=[f"Process exited with code {process.exitcode}"],
+                    )
+                del running[name]
+                _record(results[name])
+                print(_summary(results[name]))
+            elif elapsed > source_timeout(name, timeout):
+                process.terminate()
+                process.join(5)
+                if process.is_alive():
+                    process.kill()
+                results[name] = ScrapeResult(
+                    name, duration=round(elapsed, 2), timed_out=True,
+                    errors=[f"Timed out after {source_timeout(name, timeout):g}s"],
+                )
+                del running[name]
+                _record(results[name])
+                print(_summary(results[name]))
+        time.sleep(poll_interval)
+
+    drain_ingest_queue()
+    if any(result.ok for result in results.values()):
+        flag_duplicates()
+    metrics.flush()
+    print(f"🎉 All scrapers finished at {datetime.now()}")
+    return [results[name] for name in names]
+
+
+def drain_ingest_queue():
+    """Write what the sources left in the ingest queue (INGEST_MODE=queue)."""
+    from scrapers import ingest_queue
+
+    try:
+        result = ingest_queue.drain()
+    except Exception as e:
+        print(f"⚠️ Ingest queue drain failed: {e}")
+        return
+    if result.total:
+        print(f"📦 Ingest queue drained: {result}")
+
+
+def flag_duplicates():
+    """Mark opportunities that another source also lists (see database.dedup)."""
+    from database.dedup import flag_duplicates as flag
+
+    try:
+        with metrics.stage("opportunities", "dedup"):
+            print(f"🔗 Cross-source duplicates: {flag()}")
+    except Exception as e:
+        print(f"⚠️ Duplicate detection failed: {e}")
+
+
+def _summary(result: ScrapeResult) -> str:
+    if result.ok:
+        return (
+            f"✅ {result.source} finished ({result.items} items, {result.new} new, "
+            f"{result.changed} changed, {result.unchanged} unchanged"
+            f"{f', {result.queued} queued' if result.queued else ''} in {result.duration}s)"
+        )
+    return f"❌ {result.source} failed after {result.duration}s: {'; '.join(result.errors)}"
+
+
+if __name__ == "__main__":
+    import json
+    selected = sys.argv[1:] or None
+    print(json.dumps([r.as_dict() for r in run_sources(selected)], indent=2))
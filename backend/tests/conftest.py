@@ -0,0 +1,8 @@
+import os
+import sys
+
+# add backend/ to sys.path and keep the tests off the real database
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
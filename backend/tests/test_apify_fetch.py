@@ -0,0 +1,43 @@
+import json
+from types import SimpleNamespace
+
+from scrapers.internships.apify_fetch_internships import load_checkpoint, save_checkpoint, stream_dataset
+
+
+class Dataset:
+    def __init__(self, items):
+        self.items = items
+
+    def list_items(self, offset, limit):
+        return SimpleNamespace(items=self.items[offset:offset + limit])
+
+
+def items(n):
+    return [{"positionName": f"Intern {i}", "url": f"https://i/{i}"} for i in range(n)]
+
+
+def run(tmp_path, dataset):
+    output, checkpoint = tmp_path / "items.ndjson", tmp_path / "items.checkpoint"
+    saved = []
+    handled = stream_dataset(saved.extend, dataset, str(output), str(checkpoint))
+    return handled, saved, output, checkpoint
+
+
+def test_resumes_after_the_checkpoint(tmp_path):
+    handled, saved, output, checkpoint = run(tmp_path, Dataset(items(3)))
+    assert handled == 3
+    handled, saved, output, checkpoint = run(tmp_path, Dataset(items(5)))
+    assert [item["url"] for item in saved] == ["https://i/3", "https://i/4"]
+    assert [json.loads(line)["url"] for line in output.read_text().splitlines()] == [f"https://i/{i}" for i in range(5)]
+    assert load_checkpoint(str(checkpoint))["offset"] == 5
+
+
+def test_short_file_starts_over_instead_of_padding(tmp_path):
+    output, checkpoint = tmp_path / "items.ndjson", tmp_path / "items.checkpoint"
+    # The checkpoint outlived the NDJSON it describes
+    save_checkpoint(2, 10_000, str(checkpoint))
+    handled, saved, output, checkpoint = run(tmp_path, Dataset(items(3)))
+    assert handled == 3
+    data = output.read_bytes()
+    assert b"\0" not in data
+    assert len(data.splitlines()) == 3
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+import cache
+
+
+class Session:
+    async def execute(self, statement):
+        return [("hackathons", 1, None)]
+
+
+def request(query):
+    return Request({"type": "http", "method": "GET", "path": "/hackathons/devpost",
+                    "query_string": query.encode(), "headers": []})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    cache.response_cache.clear()
+    cache.invalidate_versions()
+    yield now
+    cache.response_cache.clear()
+
+
+def serve(query, builds, time_dependent=False):
+    async def build():
+        builds.append(query)
+        return {"n": len(builds)}
+    return asyncio.run(cache.cached_json(request(query), Session(), ["hackathons"], build, time_dependent))
+
+
+def test_status_requests_are_rebuilt_after_the_bucket(clock):
+    builds = []
+    first = serve("status=open", builds)
+    assert serve("status=open", builds).headers["etag"] == first.headers["etag"]
+    assert len(builds) == 1
+    clock[0] += cache.STATUS_BUCKET
+    assert serve("status=open", builds).headers["etag"] != first.headers["etag"]
+    assert len(builds) == 2
+    assert "last-modified" not in first.headers
+
+
+def test_other_requests_only_change_with_the_data(clock):
+    builds = []
+    serve("q=ai", builds)
+    clock[0] += cache.STATUS_BUCKET
+    serve("q=ai", builds)
+    assert len(builds) == 1
+    serve("q=ai", builds, time_dependent=True)
+    assert len(builds) == 2
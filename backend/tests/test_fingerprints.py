@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database import upsert
+from database.db import Base
+from database.models import ScrapeFingerprint
+from scrapers import fingerprints
+from scrapers.fingerprints import CHANGED, NEW, UNCHANGED, FingerprintTracker
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fingerprints.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(fingerprints, "SessionLocal", factory)
+    monkeypatch.setattr(upsert, "SessionLocal", factory)
+    monkeypatch.setattr(fingerprints.ingest_queue, "MODE", "direct")
+    yield factory
+    engine.dispose()
+
+
+def item(i, title=None, days_left="3 days left"):
+    return {"link": f"https://h/{i}", "title": title or f"Hack {i}", "days_left": days_left}
+
+
+def stored(sessions):
+    with sessions() as db:
+        return {row.link: row.change_count for row in db.scalars(select(ScrapeFingerprint))}
+
+
+def first_run(items):
+    tracker = FingerprintTracker("devpost")
+    assert tracker.filter_changed(items) == items
+    tracker.save()
+
+
+def test_new_changed_and_unchanged(sessions):
+    first_run([item(1), item(2)])
+
+    tracker = FingerprintTracker("devpost")
+    run = [item(1, days_left="1 day left"), item(2, title="Renamed"), item(3)]
+    assert [tracker.classify(i) for i in run] == [UNCHANGED, CHANGED, NEW]
+    assert tracker.filter_changed(run) == run[1:]
+    assert not tracker.page_is_known(run)
+    assert tracker.page_is_known(run[:1])
+    assert tracker.summary() == "new: 1, changed: 1, unchanged: 1"
+    tracker.save()
+    assert stored(sessions) == {"https://h/1": 0, "https://h/2": 1, "https://h/3": 0}
+
+
+def test_forget_after_a_failed_write(sessions):
+    first_run([item(1)])
+
+    tracker = FingerprintTracker("devpost")
+    run = [item(1, title="Renamed"), item(2)]
+    changed = tracker.filter_changed(run)
+    tracker.forget(changed)  # writing them failed
+    assert tracker.stats == {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+    tracker.save()
+    assert stored(sessions) == {"https://h/1": 0}
+
+    # The next run still sees them as changed and new
+    retry = FingerprintTracker("devpost")
+    assert [retry.classify(i) for i in run] == [CHANGED, NEW]
+
+
+def test_batched_tracker_loads_and_forgets_one_batch_at_a_time(sessions):
+    first_run([item(i) for i in range(4)])
+
+    tracker = FingerprintTracker("devpost", batched=True)
+    assert tracker.filter_changed([item(0), item(1, title="Renamed")]) == [item(1, title="Renamed")]
+    assert set(tracker.previous) == {"https://h/0", "https://h/1"}
+    tracker.save()
+    assert tracker.seen == {} and tracker.previous == {}
+
+    assert tracker.filter_changed([item(2), item(4)]) == [item(4)]
+    assert set(tracker.previous) == {"https://h/2"}
+    tracker.forget([item(4)])
+    tracker.save()
+    assert tracker.stats == {NEW: 0, CHANGED: 1, UNCHANGED: 2}
+    assert stored(sessions) == {f"https://h/{i}": int(i == 1) for i in range(4)}
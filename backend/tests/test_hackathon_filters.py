@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from database import models
+from database.db import Base
+from database.normalize import is_remote_location
+from routers.hackathons_router import filter_devpost
+
+LOCATIONS = ["Online", "online", "Virtual event", "Remote", "HACKATHON", "Berlin, Germany", "", None]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            models.Hackathon(title=title, link=f"https://h/{i}", location=location)
+            for i, (title, location) in enumerate(
+                [(f"Hack {i}", location) for i, location in enumerate(LOCATIONS)]
+                + [("100% remote", "Paris"), ("AI_Agents", "Paris"), ("AIxAgents", "Paris")],
+            )
+        )
+        session.commit()
+        yield session
+
+
+def devpost(db, q=None, remote=None):
+    query = filter_devpost(select(models.Hackathon), q, None, remote, None, None, None, None, None)
+    return {h.title for h in db.scalars(query)}
+
+
+def locations(db, remote):
+    query = filter_devpost(select(models.Hackathon), None, None, remote, None, None, None, None, None)
+    return [h.location for h in db.scalars(query) if h.location != "Paris"]
+
+
+@pytest.mark.parametrize("remote", [True, False])
+def test_remote_filter_matches_is_remote_location(db, remote):
+    assert sorted(locations(db, remote), key=str) == sorted(
+        (location for location in LOCATIONS if is_remote_location(location) == remote), key=str
+    )
+
+
+def test_search_treats_wildcards_literally(db):
+    assert devpost(db, q="100%") == {"100% remote"}
+    assert devpost(db, q="AI_") == {"AI_Agents"}
+    assert devpost(db, q="%") == {"100% remote"}
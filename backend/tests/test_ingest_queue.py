@@ -0,0 +1,90 @@
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+
+from database import models
+from database.db import Base, SessionLocal, engine
+from scrapers import ingest_queue
+from scrapers.ingest_queue import IngestQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return IngestQueue(tmp_path / "queue.sqlite3")
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as connection:
+        for table in (models.Internship, models.Opportunity, models.DataVersion):
+            connection.execute(delete(table))
+
+
+def internship(n, title="Intern"):
+    return {"title": f"{title} {n}", "link": f"https://i/{n}", "scraped_at": datetime(2026, 10, 18, 9, 0)}
+
+
+def test_put_and_claim_round_trip(queue):
+    assert queue.put("student_internships", [internship(1), internship(2)]) == 2
+    claimed = queue.claim()
+    assert [(c[1], c[2], c[3]) for c in claimed] == [("student_internships", "link", ("scraped_at",))] * 2
+    # Datetimes survive the JSON payload
+    assert claimed[0][4] == internship(1)
+    # Claimed rows are not handed out twice until their lease runs out
+    assert queue.claim() == []
+    queue.ack([c[0] for c in claimed])
+    assert queue.pending() == 0
+
+
+def test_failed_rows_back_off(queue):
+    queue.put("student_internships", [internship(1)])
+    claimed = queue.claim()
+    queue.fail([c[0] for c in claimed], attempts=1, error="database is down")
+    assert queue.claim() == []
+    assert queue.stats()["student_internships"]["max_attempts"] == 1
+    assert queue.pending() == 1
+
+
+def test_later_rows_wait_for_an_earlier_one_of_the_same_item(queue):
+    queue.put("student_internships", [internship(1, "Old")])
+    first = queue.claim()
+    queue.fail([c[0] for c in first], attempts=1, error="database is down")
+
+    queue.put("student_internships", [internship(1, "New"), internship(2)])
+    claimed = queue.claim()
+    # Only the other item; the newer row for link 1 must not overtake the old one
+    assert [c[4]["link"] for c in claimed] == ["https://i/2"]
+
+
+def test_drain_writes_in_order_after_a_failure(queue, db, monkeypatch):
+    write = ingest_queue.bulk_upsert
+    calls = []
+
+    def flaky(model, rows, **kwargs):
+        calls.append([row["title"] for row in rows])
+        if len(calls) == 1:
+            raise RuntimeError("database is down")
+        return write(model, rows, **kwargs)
+
+    monkeypatch.setattr(ingest_queue, "bulk_upsert", flaky)
+    monkeypatch.setattr(ingest_queue, "retry_delay", lambda attempts: 0.5)
+    queue.put("student_internships", [internship(1, "Old")])
+    assert queue.drain().total == 0
+
+    queue.put("student_internships", [internship(1, "New")])
+    # The old row is still backing off, so the new one is not written ahead of it
+    assert queue.drain().total == 0
+    assert db.scalar(select(models.Internship.title)) is None
+
+    time.sleep(0.6)
+    result = queue.drain()
+    assert result.created == 1
+    assert calls[1:] == [["Old 1", "New 1"]]
+    assert db.scalar(select(models.Internship.title)) == "New 1"
+    assert queue.pending() == 0
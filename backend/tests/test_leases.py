@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+import worker
+from database import leases
+from database.db import Base
+from database.models import WorkerLease
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    # A file, so the heartbeat thread sees the same database as the test
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(leases, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def owner(sessions, name="job"):
+    with sessions() as db:
+        return db.scalar(select(WorkerLease.owner).where(WorkerLease.name == name))
+
+
+def test_only_one_owner_acquires(sessions):
+    a, b = leases.Lease("job", "a"), leases.Lease("job", "b")
+    assert a.acquire()
+    assert not b.acquire()
+    assert a.acquire()  # holding it already just extends it
+    a.release()
+    assert owner(sessions) is None
+    assert b.acquire()
+    assert owner(sessions) == "b"
+
+
+def test_expired_lease_is_taken_over(sessions):
+    a, b = leases.Lease("job", "a", ttl=0.2), leases.Lease("job", "b")
+    assert a.acquire()
+    time.sleep(0.3)
+    assert b.acquire()
+    assert not a.renew()
+    assert owner(sessions) == "b"
+
+
+def test_heartbeat_keeps_the_lease_past_its_ttl(sessions):
+    a, b = leases.Lease("job", "a", ttl=0.3), leases.Lease("job", "b")
+    with a.hold() as held:
+        assert held
+        time.sleep(0.6)
+        assert not b.acquire()
+    assert owner(sessions) is None
+
+
+def test_heartbeat_reports_a_stolen_lease(sessions):
+    lost = threading.Event()
+    with leases.Lease("job", "a", ttl=0.3).hold(on_lost=lost.set) as held:
+        assert held
+        with sessions() as db:
+            db.execute(update(WorkerLease).values(owner="b"))
+            db.commit()
+        assert lost.wait(1)
+    assert owner(sessions) == "b"  # release only drops our own row
+
+
+def test_leader_keeps_the_lease_until_the_scheduler_is_down(sessions, monkeypatch):
+    seen = {}
+
+    class Scheduler:
+        def start(self, paused):
+            pass
+
+        def resume(self):
+            handlers[-1]()  # SIGTERM as soon as scheduling starts
+
+        def shutdown(self, wait):
+            seen["owner at shutdown"] = owner(sessions, worker.LEADER_LEASE)
+
+    handlers = []
+    monkeypatch.setattr(worker.signal, "signal", lambda signum, handler: handlers.append(handler))
+    monkeypatch.setattr(worker, "build_scheduler", Scheduler)
+    monkeypatch.setattr(worker, "wanted_jobs", dict)
+    monkeypatch.setattr(worker, "sync_jobs", lambda scheduler, wanted: None)
+    assert worker.serve("leader") == 0
+    assert seen == {"owner at shutdown": "leader"}
+    assert owner(sessions, worker.LEADER_LEASE) is None
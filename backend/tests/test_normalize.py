@@ -0,0 +1,66 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.orm import Session
+
+from database import models
+from database.crud import apply_status
+from database.db import Base
+from database.normalize import ENDED, compute_status, normalize_status, parse_period, status_label_sql
+
+TODAY = datetime(2026, 10, 18)
+LABLAB_JSON = os.path.join(os.path.dirname(__file__), "..", "scrapers", "hackathons", "lablab_hackathons.json")
+
+
+@pytest.fixture
+def finished():
+    """A LabLab event listed as "Finished" whose period has no year ("NOV 21 - 23")."""
+    with open(LABLAB_JSON, encoding="utf-8") as f:
+        rows = json.load(f)
+    row = next(r for r in rows if r["link"] == "https://lablab.ai/event/agentic-ai-hackathon-ibm-watsonx-orchestrate")
+    assert row["status"] == "Finished" and row["submission_period"] == "NOV 21 - 23"
+    return row
+
+
+def test_finished_period_is_in_the_past(finished):
+    start, end = parse_period(finished["submission_period"], today=TODAY, label=finished["status"])
+    assert (start.date(), end.date()) == (datetime(2025, 11, 21).date(), datetime(2025, 11, 23).date())
+    assert compute_status(finished["status"], start, end, now=TODAY) == ENDED
+
+
+def test_finished_label_beats_future_dates(finished):
+    # Rows saved before the fix carry the year rolled forward to 2026
+    start, end = (datetime.fromisoformat(finished[k]) for k in ("start_date", "end_date"))
+    assert end > TODAY
+    assert compute_status(finished["status"], start, end, now=TODAY) == ENDED
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[models.LablabHackathon.__table__])
+    with Session(engine) as db:
+        db.add(models.LablabHackathon(
+            title=finished["title"], link=finished["link"], status=finished["status"],
+            submission_period=finished["submission_period"], start_date=start, end_date=end,
+        ))
+        db.commit()
+        Lablab = models.LablabHackathon
+        for status in ("open", "upcoming", "ended"):
+            found = apply_status(db.query(Lablab), status, Lablab.status, Lablab.start_date, Lablab.end_date, TODAY)
+            assert [r.link for r in found] == ([finished["link"]] if status == ENDED else [])
+        assert db.scalar(select(Lablab.current_status)) == ENDED
+
+
+LABELS = [
+    None, "", "Open", " Register ", "Registration open", "5 days left", "about 1 month left",
+    "Upcoming", "Coming soon", "Starts soon", "Ended", "Finished", "Submissions closed",
+    "Live now", "Ongoing", "Judging", "Unknown", "FINISHED", "Closed for registration",
+]
+
+
+def test_sql_label_status_matches_python():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        for label in LABELS:
+            assert connection.scalar(select(status_label_sql(literal(label)))) == normalize_status(label), label
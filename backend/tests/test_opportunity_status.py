@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from database import models
+from database.db import Base
+from export import export_statement
+from routers.opportunities_router import OPPORTUNITY_SORTS, filter_opportunities, with_current_status
+
+NOW = datetime.now()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # Synced while both were still upcoming; one has started since, the other has ended
+        session.add_all([
+            models.Opportunity(type="hackathon", source="devpost", source_id=1, title="Started",
+                               link="https://o/1", status="upcoming",
+                               starts_at=NOW - timedelta(days=1), deadline=NOW + timedelta(days=5)),
+            models.Opportunity(type="hackathon", source="devpost", source_id=2, title="Over",
+                               link="https://o/2", status="upcoming",
+                               starts_at=NOW - timedelta(days=9), deadline=NOW - timedelta(days=2)),
+        ])
+        session.commit()
+        yield session
+
+
+def opportunities(db, status=None):
+    return filter_opportunities(select(models.Opportunity), None, None, None, None, status,
+                                None, None, None, None, None)
+
+
+def test_current_status_is_derived_from_the_dates(db):
+    rows = {o.title: o for o in db.scalars(opportunities(db))}
+    assert {title: o.current_status for title, o in rows.items()} == {"Started": "open", "Over": "ended"}
+    in_sql = dict(db.execute(select(models.Opportunity.title, models.Opportunity.current_status)).all())
+    assert in_sql == {"Started": "open", "Over": "ended"}
+
+
+def test_payload_and_export_report_the_current_status(db):
+    page = with_current_status({"items": list(db.scalars(opportunities(db))), "next_cursor": None})
+    assert {item["title"]: item["status"] for item in page["items"]} == {"Started": "open", "Over": "ended"}
+
+    stmt = export_statement(models.Opportunity, opportunities(db), "title", OPPORTUNITY_SORTS,
+                            overrides={"status": models.Opportunity.current_status})
+    assert [(row.title, row.status) for row in db.execute(stmt)] == [("Over", "ended"), ("Started", "open")]
+
+
+def test_status_filter_agrees_with_the_payload(db):
+    assert [o.title for o in db.scalars(opportunities(db, "open"))] == ["Started"]
+    assert [o.title for o in db.scalars(opportunities(db, "upcoming"))] == []
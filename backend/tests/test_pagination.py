@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from database import models
+from database.db import Base
+from database.pagination import paginate
+
+SORTS = {"scraped_at": models.Course.scraped_at, "title": models.Course.title}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[models.Course.__table__])
+    with Session(engine) as db:
+        # Leave scraped_at to the server default, as the scrapers do, with
+        # several rows per second so the id tiebreaker is exercised
+        for i in range(30):
+            db.execute(
+                text("INSERT INTO courses (title, link, scraped_at) VALUES (:title, :link, :scraped_at)"),
+                {"title": f"Course {i}", "link": f"https://example.com/{i}",
+                 "scraped_at": f"2026-10-18 08:49:{30 + i // 3:02d}"},
+            )
+        db.execute(text("INSERT INTO courses (title, link) VALUES ('Course now', 'https://example.com/now')"))
+        db.commit()
+        yield db
+
+
+def walk(db, sort, limit=4):
+    ids, cursor = [], None
+    for _ in range(100):
+        page = paginate(db.query(models.Course), sort, SORTS, models.Course.id, cursor, limit)
+        ids += [row.id for row in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+    pytest.fail(f"{sort}: next_cursor never ran out")
+
+
+@pytest.mark.parametrize("sort", ["-scraped_at", "scraped_at", "title", "-title"])
+def test_every_row_once(session, sort):
+    ids = walk(session, sort)
+    assert sorted(ids) == list(range(1, 32))
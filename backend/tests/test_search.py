@@ -0,0 +1,22 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from database import models
+from database.db import Base
+from database.search import search
+
+
+def test_fts_follows_tables_as_they_are_created():
+    engine = create_engine("sqlite://")
+    # Only some of the searched tables: the others get no triggers yet
+    Base.metadata.create_all(engine, tables=[models.Course.__table__])
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO courses (title, link) VALUES ('Python basics', 'https://c/1')"))
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO udemy_courses (title, link) VALUES ('Advanced Python', 'https://u/1')"))
+
+    with Session(engine) as db:
+        found = {(row["source"], row["title"]) for row in search(db, "python")}
+    assert found == {("coursera", "Python basics"), ("udemy", "Advanced Python")}
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from database import models
+from database.db import Base
+from database.upsert import bulk_upsert
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def version(db, table):
+    return db.scalar(select(models.DataVersion.version).where(models.DataVersion.table_name == table))
+
+
+def hackathons(db):
+    return {h.link: h for h in db.scalars(select(models.Hackathon))}
+
+
+def test_counts_created_updated_unchanged(db):
+    rows = [{"title": f"Hack {i}", "link": f"https://h/{i}", "status": "open"} for i in range(3)]
+    result = bulk_upsert(models.Hackathon, rows, session=db)
+    assert (result.created, result.updated, result.unchanged) == (3, 0, 0)
+
+    rows[1] = {**rows[1], "status": "ended"}
+    result = bulk_upsert(models.Hackathon, rows + [{"title": "Hack 3", "link": "https://h/3"}], session=db)
+    assert (result.created, result.updated, result.unchanged) == (1, 1, 2)
+    assert hackathons(db)["https://h/1"].status == "ended"
+
+
+def test_duplicate_keys_collapse_to_the_last_row(db):
+    rows = [
+        {"title": "First", "link": "https://h/1"},
+        {"title": "Second", "link": "https://h/1"},
+        {"title": "No link", "link": ""},
+    ]
+    result = bulk_upsert(models.Hackathon, rows, session=db)
+    assert result.created == 1
+    assert [h.title for h in hackathons(db).values()] == ["Second"]
+
+
+def test_rows_with_different_columns_are_written_together(db):
+    bulk_upsert(models.Hackathon, [{"title": "A", "link": "https://h/a", "status": "open", "participants": 5}],
+                session=db)
+    rows = [
+        # Only some columns: the others keep their stored values
+        {"title": "A", "link": "https://h/a", "status": "ended"},
+        {"title": "B", "link": "https://h/b", "location": "Online", "not_a_column": 1},
+        {"title": "C" * 600, "link": "https://h/c", "participants": 3},
+    ]
+    result = bulk_upsert(models.Hackathon, rows, chunk_size=2, session=db)
+    assert (result.created, result.updated) == (2, 1)
+    stored = hackathons(db)
+    assert (stored["https://h/a"].status, stored["https://h/a"].participants) == ("ended", 5)
+    assert stored["https://h/b"].location == "Online"
+    assert len(stored["https://h/c"].title) == 500
+
+
+def test_insert_only_columns_are_not_overwritten(db):
+    bulk_upsert(models.Internship, [{"title": "T", "link": "https://i/1", "company": "A"}], session=db)
+    first = db.scalar(select(models.Internship.scraped_at))
+    bulk_upsert(models.Internship, [{"title": "T", "link": "https://i/1", "company": "B", "scraped_at": None}],
+                session=db)
+    assert db.scalar(select(models.Internship.scraped_at)) == first
+    assert db.scalar(select(models.Internship.company)) == "B"
+
+
+def test_data_version_bumps_only_on_writes(db):
+    rows = [{"title": "Hack", "link": "https://h/1"}]
+    bulk_upsert(models.Hackathon, rows, session=db)
+    assert version(db, "hackathons") == 1
+    bulk_upsert(models.Hackathon, rows, session=db)
+    assert version(db, "hackathons") == 1
+    bulk_upsert(models.Hackathon, [{**rows[0], "title": "Renamed"}], session=db)
+    assert version(db, "hackathons") == 2
+    # Written rows are mirrored into the opportunities read model
+    assert db.scalar(select(models.Opportunity.title)) == "Renamed"
+    assert version(db, "opportunities") == 2
@@ -0,0 +1,244 @@
+"""
+Scrape worker: runs the scrapers on their schedules, outside the API.
+
+    python worker.py                      # run the schedule (one leader per database)
+    python worker.py --run devpost lablab # scrape now and exit
+    python worker.py --list               # show the plan or schedule and the last runs
+
+By default (SCRAPE_SCHEDULER=freshness) the freshness planner
+(scrapers.freshness) runs every SCRAPE_PLAN_INTERVAL_MINUTES and starts the
+sources whose items are most likely stale, within a daily budget of
+browser time. With SCRAPE_SCHEDULER=cron every source has its own cron
+expression instead (SCHEDULES, overridden with SCRAPE_CRON_<SOURCE>, e.g.
+SCRAPE_CRON_DEVPOST="0 */6 * * *"; "off" disables a source). Jobs live in
+APScheduler's SQLAlchemyJobStore in the application database, so a run
+missed while the worker was down still happens when it comes back, within
+SCRAPE_MISFIRE_GRACE_SECONDS.
+
+Any number of workers can be started: they elect a leader through the
+`scrape-worker` lease (database.leases) and only the leader schedules;
+the others wait and take over when its lease runs out. Each run of a
+source also holds a `scrape:<source>` lease, so a manual `--run` never
+overlaps a scheduled one. Every run is recorded in `scrape_runs`.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from database.db import DATABASE_URL, SessionLocal, engine
+from database.leases import LEASE_TTL, Lease, default_owner
+from database.models import ScrapeRun
+from database.schema import sync_schema
+from scrapers import freshness
+from scrapers.runner import SOURCES, default_max_workers, run_sources
+
+# Staggered so the browsers of different sources do not start together
+SCHEDULES = {
+    "udemy": "0 2 * * *",
+    "coursera": "20 2 * * *",
+    "devpost": "0 2,14 * * *",
+    "lablab": "40 2 * * *",
+}
+# "freshness": scrapers.freshness picks what to run every few minutes;
+# "cron": every source on its fixed schedule
+SCHEDULER = os.getenv("SCRAPE_SCHEDULER", "freshness")
+PLAN_INTERVAL_MINUTES = int(os.getenv("SCRAPE_PLAN_INTERVAL_MINUTES", "15"))
+TIMEZONE = os.getenv("SCRAPE_TIMEZONE", "UTC")
+MISFIRE_GRACE = int(os.getenv("SCRAPE_MISFIRE_GRACE_SECONDS", str(3 * 3600)))
+LEADER_LEASE = "scrape-worker"
+JOBS_TABLE = "apscheduler_jobs"
+JOB_PREFIX = "scrape:"
+PLAN_JOB = "plan:freshness"
+# Job functions are stored by reference, so name this module explicitly
+# instead of "__main__"
+JOB_FUNC = "worker:run_scheduled"
+PLAN_FUNC = "worker:plan_and_run"
+
+
+def schedules() -> dict:
+    """`{source: cron expression}` of the enabled sources."""
+    configured = {}
+    for name in SOURCES:
+        expression = os.getenv(f"SCRAPE_CRON_{name.upper()}", SCHEDULES.get(name, "")).strip()
+        if expression and expression.lower() != "off":
+            configured[name] = expression
+    return configured
+
+
+# -------- Runs --------
+
+def record_run(result, trigger: str, started_at: datetime):
+    db = SessionLocal()
+    try:
+        db.add(ScrapeRun(
+            source=result.source, trigger=trigger, started_at=started_at, finished_at=datetime.utcnow(),
+            ok=result.ok, timed_out=result.timed_out, items=result.items, new=result.new,
+            changed=result.changed, unchanged=result.unchanged, queued=result.queued,
+            error="; ".join(result.errors) or None,
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not record the {result.source} run: {e}")
+    finally:
+        db.close()
+
+
+def run_source(name: str, trigger: str = "manual"):
+    """Scrape `name` unless another worker is already scraping it; returns its ScrapeResult or None."""
+    with Lease(f"{JOB_PREFIX}{name}").hold() as held:
+        if not held:
+            print(f"⏭️  {name} is already being scraped by another worker")
+            return None
+        started_at = datetime.utcnow()
+        result = run_sources([name])[0]
+        record_run(result, trigger, started_at)
+        return result
+
+
+def run_scheduled(name: str):
+    return run_source(name, trigger="cron")
+
+
+def plan_and_run():
+    """Scrape the sources the freshness planner picks now; returns their ScrapeResults."""
+    chosen = [d for d in freshness.plan(list(SOURCES)) if d.run]
+    if not chosen:
+        return []
+    print(f"🧭 Refreshing {', '.join(f'{d.source} ({d.reason})' for d in chosen)}")
+    with ThreadPoolExecutor(default_max_workers(len(chosen))) as pool:
+        results = pool.map(lambda d: run_source(d.source, trigger="planner"), chosen)
+        return [result for result in results if result is not None]
+
+
+def scrape_all():
+    """Run every scraper now, in parallel; returns one ScrapeResult per source."""
+    started_at = datetime.utcnow()
+    results = run_sources()
+    for result in results:
+        record_run(result, "manual", started_at)
+    failed = [r.source for r in results if not r.ok]
+    if failed:
+        print(f"⚠️  Failed sources: {', '.join(failed)}")
+    return results
+
+
+# -------- Schedule --------
+
+def build_scheduler():
+    from apscheduler.executors.pool import ThreadPoolExecutor as JobExecutor
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    return BackgroundScheduler(
+        jobstores={"default": SQLAlchemyJobStore(url=DATABASE_URL, tablename=JOBS_TABLE)},
+        # Each job runs its source in a child process; cap how many browsers run at once
+        executors={"default": JobExecutor(default_max_workers(len(SOURCES)))},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": MISFIRE_GRACE},
+        timezone=TIMEZONE,
+    )
+
+
+def wanted_jobs() -> dict:
+    """`{job id: (function, trigger, args, name)}` for the current SCRAPE_SCHEDULER."""
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    if SCHEDULER == "freshness":
+        trigger = IntervalTrigger(minutes=PLAN_INTERVAL_MINUTES, timezone=TIMEZONE)
+        return {PLAN_JOB: (PLAN_FUNC, trigger, [], "freshness planner")}
+    return {
+        f"{JOB_PREFIX}{name}": (JOB_FUNC, CronTrigger.from_crontab(expression, timezone=TIMEZONE), [name], f"scrape {name}")
+        for name, expression in schedules().items()
+    }
+
+
+def sync_jobs(scheduler, wanted: dict):
+    """Make the stored jobs match `wanted`; unchanged jobs keep their next run time."""
+    for job in scheduler.get_jobs():
+        if job.id not in wanted:
+            job.remove()
+            print(f"🗑️  Removed job {job.name}")
+    for job_id, (func, trigger, args, name) in wanted.items():
+        job = scheduler.get_job(job_id)
+        if job is not None and str(job.trigger) == str(trigger):
+            continue
+        scheduler.add_job(func, trigger, args=args, id=job_id, name=name, replace_existing=True)
+    for job in scheduler.get_jobs():
+        print(f"📅 {job.name}: {job.trigger} (next {job.next_run_time})")
+
+
+def serve(owner: str | None = None, poll_interval: float = LEASE_TTL / 3):
+    """Wait to become leader, then run the schedule until the lease is lost or SIGTERM arrives."""
+    leader = Lease(LEADER_LEASE, owner or default_owner())
+    waiting = False
+    while not leader.acquire():
+        if not waiting:
+            print(f"⏳ Another worker is leader; standing by as {leader.owner}")
+            waiting = True
+        time.sleep(poll_interval)
+
+    lost = threading.Event()
+    stop = threading.Event()
+    # A redeploy sends SIGTERM: hand the lease back instead of letting it run out
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    scheduler = build_scheduler()
+    scheduler.start(paused=True)
+    with leader.hold(on_lost=lambda: (lost.set(), stop.set())) as held:
+        try:
+            if held:
+                sync_jobs(scheduler, wanted_jobs())
+                scheduler.resume()
+                print(f"👑 {leader.owner} is leader ({SCHEDULER} schedule)")
+                stop.wait()
+            else:
+                lost.set()
+        finally:
+            # Running scrapes finish while the lease is still renewed, so a
+            # standby cannot become leader and schedule them a second time
+            scheduler.shutdown(wait=True)
+    if lost.is_set():
+        print("⚠️ Leadership lost, stopping")
+        return 1
+    print("👋 Worker stopped")
+    return 0
+
+
+def show():
+    if SCHEDULER == "freshness":
+        print(freshness.describe(freshness.plan(list(SOURCES))))
+    else:
+        configured = schedules()
+        for name in SOURCES:
+            print(f"{name:10} {configured.get(name, 'off')}")
+    db = SessionLocal()
+    try:
+        runs = db.query(ScrapeRun).order_by(ScrapeRun.started_at.desc()).limit(10).all()
+    finally:
+        db.close()
+    for run in runs:
+        status = "ok" if run.ok else ("timed out" if run.timed_out else "failed")
+        print(f"{run.started_at:%Y-%m-%d %H:%M} {run.source:10} {run.trigger:7} {status:9} {run.items} items")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scrapers on their schedules")
+    parser.add_argument("--run", nargs="*", metavar="SOURCE", help="scrape these sources (default all) now and exit")
+    parser.add_argument("--list", action="store_true", help="show the schedule and recent runs")
+    args = parser.parse_args()
+
+    sync_schema(engine)
+    if args.list:
+        show()
+    elif args.run is not None:
+        names = args.run or list(SOURCES)
+        with ThreadPoolExecutor(default_max_workers(len(names))) as pool:
+            results = list(pool.map(run_source, names))
+        sys.exit(0 if all(r is None or r.ok for r in results) else 1)
+    else:
+        sys.exit(serve())
@@ -1,8 +1,11 @@
-import React, { useState, useMemo, useEffect } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import Navbar2 from './Navbar2';
 import axios from 'axios';
 
+const API_URL = 'http://localhost:8000';
+const PAGE_SIZE = 50;
+
 const Courses = () => {
   const [filters, setFilters] = useState({
     provider: 'all',
@@ -11,68 +14,53 @@ const Courses = () => {
   });
 
   const [courses, setCourses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [counts, setCounts] = useState({ coursera: 0, udemy: 0, total: 0 });
+  const [providers, setProviders] = useState(['all']);
+  const [debouncedQuery, setDebouncedQuery] = useState('');
 
-  // Fetch courses from backend
+  // Debounce the search box so typing does not fire a request per keystroke
   useEffect(() => {
-    let mounted = true;
-    const fetchCourses = async () => {
-      try {
-        const [cRes, uRes] = await Promise.all([
-          axios.get('http://localhost:8000/courses/coursera?limit=10000'),
-          axios.get('http://localhost:8000/courses/udemy?limit=10000')
-        ]);
-        const cData = Array.isArray(cRes.data) ? cRes.data : [];
-        const uData = Array.isArray(uRes.data) ? uRes.data : [];
-        if (mounted) {
-          const allCourses = [...cData, ...uData];
-          setCourses(allCourses);
-          // Calculate counts
-          setCounts({
-            coursera: cData.length,
-            udemy: uData.length,
-            total: allCourses.length
-          });
-        }
-      } catch (err) {
-        console.error('Failed to fetch courses from backend', err);
-        if (mounted) setCourses([]);
-      }
-    };
-    fetchCourses();
-    return () => { mounted = false };
-  }, []);
+    const timer = setTimeout(() => setDebouncedQuery(filters.searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [filters.searchQuery]);
 
-  // Compute filtered courses
-  const filteredCourses = useMemo(() => {
-    let results = [...courses];
-
-    // Search filter
-    if (filters.searchQuery) {
-      const query = filters.searchQuery.toLowerCase();
-      results = results.filter(item =>
-        (item.title && item.title.toLowerCase().includes(query)) ||
-        (item.provider && item.provider.toLowerCase().includes(query))
-      );
-    }
-
-    // Provider filter
-    if (filters.provider !== 'all') {
-      results = results.filter(item => (item.provider || 'Unknown') === filters.provider);
-    }
+  // Counts and provider list come from small dedicated endpoints
+  useEffect(() => {
+    Promise.all([
+      axios.get(`${API_URL}/courses/counts`),
+      axios.get(`${API_URL}/courses/providers`)
+    ]).then(([countRes, providerRes]) => {
+      setCounts(countRes.data);
+      const { coursera = [], udemy = [] } = providerRes.data || {};
+      setProviders(['all', ...new Set([...coursera, ...udemy])]);
+    }).catch(err => console.error('Failed to fetch course stats', err));
+  }, []);
 
-    // Sort
-    if (filters.sortBy === 'newest') {
-      results.sort((a, b) => (a.title || '').localeCompare(b.title || ''));
+  // One request per page: Coursera and Udemy rows both live in /opportunities
+  const fetchCourses = async (cursor = null) => {
+    const params = { type: 'course', limit: PAGE_SIZE, sort: 'title' };
+    if (debouncedQuery) params.q = debouncedQuery;
+    if (filters.provider === 'Udemy') params.source = 'udemy';
+    else if (filters.provider !== 'all') params.organizer = filters.provider;
+    if (cursor) params.cursor = cursor;
+    try {
+      const res = await axios.get(`${API_URL}/opportunities`, { params });
+      const items = (res.data?.items ?? []).map(item => ({ ...item, provider: item.organizer }));
+      setCourses(prev => (cursor ? [...prev, ...items] : items));
+      setNextCursor(res.data?.next_cursor ?? null);
+    } catch (err) {
+      console.error('Failed to fetch courses from backend', err);
+      if (!cursor) setCourses([]);
     }
+  };
 
-    return results;
-  }, [filters, courses]);
+  useEffect(() => {
+    fetchCourses();
+  }, [filters.provider, filters.sortBy, debouncedQuery]);
 
-  // Get unique providers for dropdown
-  const providers = useMemo(() => {
-    return ['all', ...new Set(courses.map(c => c.provider || 'Unknown'))];
-  }, [courses]);
+  // Already sorted by title on the server
+  const filteredCourses = courses;
 
   const handleFilterChange = (key, value) => {
     setFilters(prev => ({ ...prev, [key]: value }));
@@ -243,6 +231,17 @@ const Courses = () => {
                   </div>
                 ))}
               </div>
+
+              {nextCursor && (
+                <div className="text-center mt-8">
+                  <button
+                    onClick={() => fetchCourses(nextCursor)}
+                    className="px-6 py-2 bg-[#bf5b00] text-white rounded-full hover:bg-[#a04e00] transition-colors"
+                  >
+                    Charger plus
+                  </button>
+                </div>
+              )}
             </>
           )}
         </div>
@@ -251,4 +250,4 @@ const Courses = () => {
   );
 };
 
-export default Courses;
\ No newline at end of file
+export default Courses;
\ No newline at end of file
@@ -3,6 +3,29 @@ import { Link } from 'react-router-dom';
 import axios from 'axios';
 import Navbar2 from './Navbar2';
 
+const API_URL = 'http://localhost:8000';
+const PAGE_SIZE = 50;
+const PRIZE_RANGES = {
+  small: [undefined, 10000],
+  medium: [10000, 50000],
+  large: [50000, undefined],
+};
+
+function formatPeriod(start, end) {
+  const fmt = value => new Date(value).toLocaleDateString('fr-FR', { day: 'numeric', month: 'short' });
+  if (start && end) return `${fmt(start)} - ${fmt(end)}`;
+  return end ? fmt(end) : null;
+}
+
+// Computed from the deadline on every render, so it never goes stale
+function daysLeft(deadline) {
+  if (!deadline) return 'N/A';
+  const days = Math.ceil((new Date(deadline) - new Date()) / 86400000);
+  if (days < 0) return 'Terminé';
+  if (days === 0) return "Aujourd'hui";
+  return `${days} jour${days > 1 ? 's' : ''}`;
+}
+
 
 const Hackathons = () => {
   const [filters, setFilters] = useState({
@@ -13,108 +36,58 @@ const Hackathons = () => {
     prizeRange: 'all',
   });
 
-  const [lablabData, setLablabData] = useState([]);
-  const [devpostData, setDevpostData] = useState([]);
-
-  useEffect(() => {
-    const fetchAll = async () => {
-      try {
-        const [lRes, dRes] = await Promise.all([
-          axios.get('http://localhost:8000/hackathons/lablab?limit=10000'),
-          axios.get('http://localhost:8000/hackathons/devpost?limit=10000')
-        ]);
-        setLablabData(Array.isArray(lRes.data) ? lRes.data : []);
-        setDevpostData(Array.isArray(dRes.data) ? dRes.data : []);
-      } catch (err) {
-        console.error('Error fetching hackathons:', err);
-      }
-    };
-    fetchAll();
-  }, []);
-
-  // Fonction sécurisée pour extraire le montant du prix
-  function extractPrizeAmount(prizeString) {
-    if (!prizeString) return 0;
-    
-    // Gérer différentes formes de prix
-    const string = prizeString.toString();
-    
-    // Chercher des nombres (avec séparateurs décimaux)
-    const match = string.match(/(\d+[,.]?\d*)/);
-    if (match) {
-      // Convertir en nombre (remplacer les virgules par des points)
-      const num = parseFloat(match[1].replace(',', ''));
-      return isNaN(num) ? 0 : num;
-    }
-    
-    return 0;
-  }
+  const [hackathons, setHackathons] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [counts, setCounts] = useState({});
 
-  // Combiner toutes les données avec des valeurs par défaut
-  const allHackathons = React.useMemo(() => ([
-    ...lablabData.map(item => ({ 
-      ...item, 
-      source: 'lablab',
-      status: item.status || 'open',
-      participants: item.participants || 0,
-      host: item.host || 'LabLab.ai',
-      days_left: item.days_left || item.daysLeft || 'N/A',
-      prizeAmount: extractPrizeAmount(item.prize_amount || item.prizeAmount)
-    })),
-    ...devpostData.map(item => ({ 
-      ...item, 
-      source: 'devpost',
-      prizeAmount: extractPrizeAmount(item.prize_amount || item.prizeAmount),
-      participants: item.participants || 0,
-      host: item.host || 'Unknown',
-      days_left: item.days_left || item.daysLeft || 'N/A',
-      themes: item.themes || '',
-      submission_period: item.submission_period || item.submissionPeriod || 'N/A'
-    }))
-  ]), [lablabData, devpostData]);
+  const [debouncedQuery, setDebouncedQuery] = useState('');
 
-  // Appliquer les filtres (dérivé)
-  const filtered = React.useMemo(() => {
-    let results = [...allHackathons];
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(filters.searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [filters.searchQuery]);
 
-    if (filters.source !== 'all') results = results.filter(item => item.source === filters.source);
-    if (filters.status !== 'all') results = results.filter(item => item.status === filters.status);
+  useEffect(() => {
+    axios.get(`${API_URL}/opportunities/counts`)
+      .then(res => setCounts(res.data?.hackathon ?? {}))
+      .catch(err => console.error('Error fetching hackathon counts:', err));
+  }, []);
 
-    if (filters.searchQuery) {
-      const query = filters.searchQuery.toLowerCase();
-      results = results.filter(item =>
-        (item.title && item.title.toLowerCase().includes(query)) ||
-        (item.themes && item.themes.toLowerCase().includes(query)) ||
-        (item.host && item.host.toLowerCase().includes(query))
-      );
-    }
+  // Both sources come from /opportunities, already filtered and sorted by the backend
+  const fetchHackathons = async (cursor = null) => {
+    const params = { type: 'hackathon', limit: PAGE_SIZE };
+    if (debouncedQuery) params.q = debouncedQuery;
+    if (filters.source !== 'all') params.source = filters.source;
+    if (filters.status !== 'all') params.status = filters.status;
+    if (filters.sortBy === 'participants') params.sort = '-participants';
+    else if (filters.sortBy === 'prize') params.sort = '-prize_usd';
+    else params.sort = 'title';
+    const [minPrize, maxPrize] = PRIZE_RANGES[filters.prizeRange] || [];
+    if (minPrize !== undefined) params.min_prize = minPrize;
+    if (maxPrize !== undefined) params.max_prize = maxPrize;
+    if (cursor) params.cursor = cursor;
 
-    if (filters.prizeRange !== 'all') {
-      results = results.filter(item => {
-        const amount = item.prizeAmount || 0;
-        switch (filters.prizeRange) {
-          case 'small': return amount < 10000;
-          case 'medium': return amount >= 10000 && amount < 50000;
-          case 'large': return amount >= 50000;
-          default: return true;
-        }
-      });
+    try {
+      const res = await axios.get(`${API_URL}/opportunities`, { params });
+      const items = res.data?.items ?? [];
+      setHackathons(prev => (cursor ? [...prev, ...items] : items));
+      setNextCursor(res.data?.next_cursor ?? null);
+    } catch (err) {
+      console.error('Error fetching hackathons:', err);
     }
+  };
 
-    results.sort((a, b) => {
-      switch (filters.sortBy) {
-        case 'prize':
-          return (b.prizeAmount || 0) - (a.prizeAmount || 0);
-        case 'participants':
-          return (b.participants || 0) - (a.participants || 0);
-        case 'newest':
-        default:
-          return (a.title || '').localeCompare(b.title || '');
-      }
-    });
+  useEffect(() => {
+    fetchHackathons();
+  }, [filters.source, filters.status, filters.sortBy, filters.prizeRange, debouncedQuery]);
 
-    return results;
-  }, [allHackathons, filters]);
+  const filtered = React.useMemo(() => hackathons.map(item => ({
+    ...item,
+    host: item.organizer || (item.source === 'lablab' ? 'LabLab.ai' : 'Unknown'),
+    prizeAmount: item.prize_usd ? `$${Math.round(item.prize_usd).toLocaleString()}` : 0,
+    submission_period: formatPeriod(item.starts_at, item.deadline),
+    days_left: daysLeft(item.deadline),
+  })), [hackathons]);
 
   const handleFilterChange = (key, value) => {
     setFilters(prev => ({ ...prev, [key]: value }));
@@ -154,15 +127,15 @@ const Hackathons = () => {
         <div className="flex flex-wrap justify-center gap-4 mb-8">
           <div className="bg-white rounded-full px-4 py-2 shadow-sm">
             <span className="text-gray-600">Total: </span>
-            <span className="font-bold text-[#bf5b00]">{allHackathons.length}</span>
+            <span className="font-bold text-[#bf5b00]">{(counts.lablab || 0) + (counts.devpost || 0)}</span>
           </div>
           <div className="bg-white rounded-full px-4 py-2 shadow-sm">
             <span className="text-gray-600">LabLab.ai: </span>
-            <span className="font-bold text-blue-600">{lablabData.length}</span>
+            <span className="font-bold text-blue-600">{counts.lablab || 0}</span>
           </div>
           <div className="bg-white rounded-full px-4 py-2 shadow-sm">
             <span className="text-gray-600">Devpost: </span>
-            <span className="font-bold text-green-600">{devpostData.length}</span>
+            <span className="font-bold text-green-600">{counts.devpost || 0}</span>
           </div>
         </div>
       </div>
@@ -254,7 +227,7 @@ const Hackathons = () => {
             {/* Grille des hackathons */}
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
               {filtered.map((item, index) => (
-                <div key={index} className="bg-white rounded-[30px] p-6 shadow-sm hover:shadow-md transition-shadow flex flex-col h-full">
+                <div key={item.id || index} className="bg-white rounded-[30px] p-6 shadow-sm hover:shadow-md transition-shadow flex flex-col h-full">
                   {/* Badge source */}
                   <div className="mb-4">
                     <span className={`px-3 py-1 rounded-full text-xs font-bold ${item.source === 'lablab' ? 'bg-blue-100 text-blue-800' : 'bg-green-100 text-green-800'}`}>
@@ -299,6 +272,17 @@ const Hackathons = () => {
                 </div>
               ))}
             </div>
+
+            {nextCursor && (
+              <div className="text-center mt-8">
+                <button
+                  onClick={() => fetchHackathons(nextCursor)}
+                  className="px-6 py-2 bg-[#bf5b00] text-white rounded-full hover:bg-[#a34c00] transition-colors"
+                >
+                  Charger plus
+                </button>
+              </div>
+            )}
           </>
         )}
       </div>
@@ -3,6 +3,9 @@ import { Link } from 'react-router-dom';
 import axios from 'axios';
 import Navbar2 from './Navbar2';
 
+const API_URL = 'http://localhost:8000';
+const PAGE_SIZE = 50;
+
 const Internships = () => {
   const [filters, setFilters] = useState({
     jobType: 'all',
@@ -13,19 +16,36 @@ const Internships = () => {
   });
 
   const [internshipsData, setInternshipsData] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [expandedDescriptions, setExpandedDescriptions] = useState({});
 
+  const [debouncedQuery, setDebouncedQuery] = useState('');
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(filters.searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [filters.searchQuery]);
+
+  // Search and location are applied by the backend; only one page is fetched
+  const fetchInternships = async (cursor = null) => {
+    const params = { limit: PAGE_SIZE };
+    if (debouncedQuery) params.q = debouncedQuery;
+    if (filters.location !== 'all') params.location = filters.location;
+    if (cursor) params.cursor = cursor;
+    try {
+      const res = await axios.get(`${API_URL}/internships/`, { params });
+      const items = res.data?.items ?? [];
+      setInternshipsData(prev => (cursor ? [...prev, ...items] : items));
+      setNextCursor(res.data?.next_cursor ?? null);
+    } catch (err) {
+      console.error('Error fetching internships:', err);
+    }
+  };
+
   useEffect(() => {
-    const fetchInternships = async () => {
-      try {
-        const res = await axios.get('http://localhost:8000/internships/');
-        setInternshipsData(Array.isArray(res.data) ? res.data : []);
-      } catch (err) {
-        console.error('Error fetching internships:', err);
-      }
-    };
     fetchInternships();
-  }, []);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [filters.location, debouncedQuery]);
 
   const extractMinSalary = (salaryString) => {
     if (!salaryString) return 0;
@@ -44,15 +64,6 @@ const Internships = () => {
       results = results.filter(item => item.jobType && item.jobType.includes(filters.jobType));
     }
 
-    if (filters.searchQuery) {
-      const q = filters.searchQuery.toLowerCase();
-      results = results.filter(item =>
-        (item.positionName && item.positionName.toLowerCase().includes(q)) ||
-        (item.company && item.company.toLowerCase().includes(q)) ||
-        (item.description && item.description.toLowerCase().includes(q))
-      );
-    }
-
     if (filters.salaryRange !== 'all') {
       results = results.filter(item => {
         const minSalary = extractMinSalary(item.salary);
@@ -333,6 +344,17 @@ const Internships = () => {
               ))
             )}
           </div>
+
+          {nextCursor && (
+            <div className="text-center mt-8">
+              <button
+                onClick={() => fetchInternships(nextCursor)}
+                className="px-6 py-3 bg-[#d97706] hover:bg-[#b45309] text-white font-semibold rounded-xl transition-colors"
+              >
+                Charger plus
+              </button>
+            </div>
+          )}
         </div>
       </section>
     </>